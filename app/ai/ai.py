@@ -1,84 +1,69 @@
-import pandas as pd
 import numpy as np
-import pymysql
 import json
-from app.ai.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, client
+from app.ai.resilience import AIUnavailableError, mark_degraded
+from app.ai.scheduler import chat_completion
+from app.ai.db import fetch_one, fetch_all, parse_vector, vector_matrix, float_column
+from app.core.cache import cached
+
+USER_INFO_SQL = "SELECT * FROM user WHERE user_id = %s"
+ETF_DATA_SQL = "SELECT ticker, category, trailing_pe, trailing_annual_dividend_yield, three_year_average_return, mbti_vector FROM etf"
+MBTI_RECOMMENDATION_SQL = """
+    SELECT etf1, etf2, etf3, etf4, etf5
+    FROM mbti
+    WHERE mbti_code = %s
+"""
 
 # 사용자 정보 조회 함수
 def fetch_user_info(user_id):
     """
-    user 테이블에서 사용자 정보를 조회하고, mbti_vector를 numpy 배열로 변환.
+    user 테이블에서 사용자 정보를 조회하고, mbti_vector를 리스트로 변환.
     """
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    query = "SELECT * FROM user WHERE user_id = %s"
-    user_data = pd.read_sql(query, connection, params=[user_id])
-    connection.close()
-    if user_data.empty:
+    row = fetch_one(USER_INFO_SQL, (user_id,))
+    if not row:
         return {}
-    row = user_data.iloc[0].to_dict()
-    row["mbti_vector"] = np.fromstring(row["mbti_vector"].strip("[]"), sep=',').tolist()
+    row["mbti_vector"] = parse_vector(row["mbti_vector"], 4).tolist()
     return row
 
 # ETF 데이터 조회 함수
 def fetch_etf_data():
     """
-    MySQL에서 ETF 데이터를 로드 (티커 및 mbti_vector 포함)
+    MySQL에서 ETF 데이터를 컬럼별 배열로 로드 (티커 리스트, 숫자 컬럼은 float64 배열, mbti_vector는 (N, 4) 행렬)
     """
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    query = "SELECT ticker, category, trailing_pe, trailing_annual_dividend_yield, three_year_average_return, mbti_vector FROM etf"
-    etf_data = pd.read_sql(query, connection)
-    connection.close()
-    etf_data["mbti_vector"] = etf_data["mbti_vector"].apply(
-        lambda x: np.fromstring(x.strip("[]"), sep=',') if x else np.zeros(4)
-    )
-    return etf_data
+    rows = fetch_all(ETF_DATA_SQL)
+    return {
+        "ticker": [row["ticker"] for row in rows],
+        "category": [row["category"] for row in rows],
+        "trailing_pe": float_column(rows, "trailing_pe"),
+        "trailing_annual_dividend_yield": float_column(rows, "trailing_annual_dividend_yield"),
+        "three_year_average_return": float_column(rows, "three_year_average_return"),
+        "mbti_vector": vector_matrix(rows, "mbti_vector", 4),
+    }
 
 # MBTI 추천 ETF 조회 함수
+@cached("mbti_recommendation", tables=("mbti",))
 def fetch_mbti_recommendation(mbti_code):
     """
     mbti 테이블에서 해당 mbti_code에 따른 추천 ETF 목록 조회.
     """
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    query = """
-        SELECT etf1, etf2, etf3, etf4, etf5
-        FROM mbti
-        WHERE mbti_code = %s
-    """
-    df = pd.read_sql(query, connection, params=[mbti_code])
-    connection.close()
-    if df.empty:
+    row = fetch_one(MBTI_RECOMMENDATION_SQL, (mbti_code,))
+    if not row:
         return []
-    row = df.iloc[0]
-    recommended = [row[col] for col in ["etf1", "etf2", "etf3", "etf4", "etf5"] if pd.notnull(row[col])]
+    recommended = [row[col] for col in ["etf1", "etf2", "etf3", "etf4", "etf5"] if row[col] is not None]
     return recommended
 
 # 유클리드 거리 기반 ETF 추천 함수
 def euclid_etfs(target_vector, etf_data, nums=5, mode="target"):
     """
-    유저의 target_vector와 etf_data의 mbti_vector 간의 유클리드 거리를 계산하여,
-    가장 유사한 ETF를 상위 nums개 추천.
+    유저의 target_vector와 etf_data의 mbti_vector 행렬 간의 유클리드 거리를 한 번에 계산하여,
+    가장 유사한 ETF를 상위 nums개 추천. {"ticker": [...], "distance": [...]} 형태로 반환.
     """
-    def euclidean_distance(vec):
-        return np.linalg.norm(vec - target_vector)
-    etf_data = etf_data.copy()
-    etf_data["distance"] = etf_data["mbti_vector"].apply(euclidean_distance)
-    recommended = etf_data.sort_values(by="distance").head(nums)
-    return recommended
+    vectors = np.asarray(etf_data["mbti_vector"], dtype=np.float64)
+    distances = np.linalg.norm(vectors - np.asarray(target_vector, dtype=np.float64), axis=1)
+    top = np.argsort(distances, kind="stable")[:nums]
+    return {
+        "ticker": [etf_data["ticker"][i] for i in top],
+        "distance": distances[top].tolist(),
+    }
 
 # AI 기반 ETF 추천 함수
 def ai_recommend_etfs(user_info, etf_data, market_conditions, mbti_recommendation):
@@ -93,20 +78,25 @@ def ai_recommend_etfs(user_info, etf_data, market_conditions, mbti_recommendatio
       - Investment Style: {user_info.get('mbti_vector')}
     and current market conditions: {json.dumps(market_conditions)},
     as well as MBTI recommendations: {mbti_recommendation},
-    please recommend a list of 3 ETFs from the following options: {etf_data['ticker'].tolist()}.
+    please recommend a list of 3 ETFs from the following options: {list(etf_data['ticker'])}.
     Consider diversification, risk management, and growth potential.
     Return your response strictly as a plain list of tickers, like this:
     [VOO, QQQ, ARKK]
     Do NOT return JSON or any other format.
     Do NOT include explanations, just the plain list.
     """
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "You are a financial strategist AI."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+    try:
+        response = chat_completion(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": "You are a financial strategist AI."},
+                {"role": "user", "content": prompt}
+            ]
+        )
+    except AIUnavailableError as e:
+        # AI 백엔드 장애 시 사용자 성향 벡터와 가장 가까운 ETF 3개로 대체
+        mark_degraded(f"ai_recommend_etfs: {e}")
+        return euclid_etfs(user_info.get("mbti_vector"), etf_data, 3)["ticker"]
     print("AI recommend_etfs response:", response)
     content = response.choices[0].message.content.strip()
     if not content:
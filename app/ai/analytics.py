@@ -0,0 +1,184 @@
+"""포트폴리오 분석 - 가중 평균 지표, 카테고리 비중, 집중도 (일괄: python -m app.ai.analytics --out analytics.jsonl)"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.ai.db import fetch_all, fetch_one, float_column
+from app.core.cache import cached
+
+METRIC_COLUMNS = [
+    "trailing_pe", "trailing_annual_dividend_yield", "beta_3year",
+    "three_year_average_return", "five_year_average_return", "total_assets",
+]
+BATCH_REVISIONS = 10_000
+
+METRIC_CATALOG_SQL = f"SELECT ticker, category, {', '.join(METRIC_COLUMNS)} FROM etf ORDER BY ticker"
+# (portfolio_id, revision_id) 인덱스 - 최신 1행은 역순 탐색
+LATEST_REVISION_SQL = "SELECT revision_id, etfs FROM revision WHERE portfolio_id = %s ORDER BY revision_id DESC LIMIT 1"
+REVISION_SQL = "SELECT revision_id, etfs FROM revision WHERE portfolio_id = %s AND revision_id = %s"
+# 기본키 키셋 배치
+REVISION_BATCH_SQL = "SELECT revision_id, portfolio_id, etfs FROM revision WHERE revision_id > %s ORDER BY revision_id ASC LIMIT %s"
+
+class EtfMetricCatalog:
+    """ETF 지표 행렬 (행 i는 tickers[i]), 카테고리는 정수 코드로 보관"""
+    def __init__(self, tickers, categories, metrics):
+        self.tickers = tickers
+        self.index = {ticker: i for i, ticker in enumerate(tickers)}
+        self.category_names, self.category_codes = np.unique(
+            np.array([category or "Unknown" for category in categories], dtype=object), return_inverse=True
+        )
+        self.metrics = metrics
+
+@cached("etf_metrics", tables=("etf",))
+def get_metric_catalog() -> EtfMetricCatalog:
+    rows = fetch_all(METRIC_CATALOG_SQL)
+    metrics = np.column_stack([float_column(rows, column) for column in METRIC_COLUMNS]) if rows \
+        else np.zeros((0, len(METRIC_COLUMNS)))
+    return EtfMetricCatalog([row["ticker"] for row in rows], [row["category"] for row in rows], metrics)
+
+def parse_allocations(etfs) -> list:
+    """
+    revision.etfs 를 [(ticker, allocation), ...] 로 변환
+    저장 형식: {"etfs": [{"ticker": ..., "allocation": ...}]} (커스텀), {ticker: "allocation"} (etfs 업데이트), JSON 문자열
+    """
+    if isinstance(etfs, (str, bytes)):
+        etfs = json.loads(etfs or "{}")
+    if isinstance(etfs, dict) and isinstance(etfs.get("etfs"), list):
+        etfs = etfs["etfs"]
+
+    pairs = []
+    if isinstance(etfs, list):
+        for item in etfs:
+            if isinstance(item, dict) and item.get("ticker"):
+                pairs.append((item["ticker"], item.get("allocation")))
+    elif isinstance(etfs, dict):
+        pairs = list(etfs.items())
+
+    allocations = []
+    for ticker, allocation in pairs:
+        try:
+            allocation = float(allocation)
+        except (TypeError, ValueError):
+            continue
+        if allocation > 0:
+            allocations.append((ticker, allocation))
+    return allocations
+
+def allocation_matrix(portfolios, catalog: EtfMetricCatalog):
+    """
+    포트폴리오별 배분 리스트를 COO 희소 행렬 (rows, cols, weights) 로 변환 (포트폴리오별 합 1로 정규화)
+    카탈로그에 없는 ticker는 제외하고 (포트폴리오 번호, ticker) 목록으로 반환
+    """
+    rows, cols, weights, unmatched = [], [], [], []
+    for p, allocations in enumerate(portfolios):
+        for ticker, allocation in allocations:
+            col = catalog.index.get(ticker)
+            if col is None:
+                unmatched.append((p, ticker))
+                continue
+            rows.append(p)
+            cols.append(col)
+            weights.append(allocation)
+
+    rows = np.array(rows, dtype=np.int64)
+    cols = np.array(cols, dtype=np.int64)
+    weights = np.array(weights, dtype=np.float64)
+    totals = np.bincount(rows, weights=weights, minlength=len(portfolios))
+    if len(weights):
+        weights = weights / totals[rows]
+    return rows, cols, weights, unmatched
+
+def analyze(portfolios, catalog: EtfMetricCatalog = None) -> list:
+    """포트폴리오 배분 리스트들을 한 번에 분석해 포트폴리오별 결과 dict 리스트 반환"""
+    catalog = catalog or get_metric_catalog()
+    count = len(portfolios)
+    rows, cols, weights, unmatched = allocation_matrix(portfolios, catalog)
+
+    # 지표: (P x N 희소) @ (N x M) - NULL 지표는 분자/분모 모두에서 제외
+    values = catalog.metrics[cols]
+    known = np.isfinite(values)
+    metric_sums = np.empty((count, len(METRIC_COLUMNS)))
+    coverage = np.empty((count, len(METRIC_COLUMNS)))
+    for m in range(len(METRIC_COLUMNS)):
+        metric_sums[:, m] = np.bincount(rows, weights=weights * np.where(known[:, m], values[:, m], 0.0),
+                                        minlength=count)
+        coverage[:, m] = np.bincount(rows, weights=weights * known[:, m], minlength=count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        metric_values = np.where(coverage > 0, metric_sums / coverage, np.nan)
+
+    # 카테고리 비중: (P x N) @ (N x C one-hot)
+    category_count = len(catalog.category_names)
+    exposure = np.bincount(rows * category_count + catalog.category_codes[cols], weights=weights,
+                           minlength=count * category_count).reshape(count, category_count)
+
+    # 집중도
+    hhi = np.bincount(rows, weights=weights ** 2, minlength=count)
+    max_weight = np.zeros(count)
+    np.maximum.at(max_weight, rows, weights)
+    holdings = np.bincount(rows, minlength=count)
+
+    unmatched_by_portfolio = {}
+    for p, ticker in unmatched:
+        unmatched_by_portfolio.setdefault(p, []).append(ticker)
+
+    results = []
+    for p in range(count):
+        categories = np.flatnonzero(exposure[p])
+        results.append({
+            "holdings": int(holdings[p]),
+            "metrics": {column: (None if np.isnan(value) else round(float(value), 6))
+                        for column, value in zip(METRIC_COLUMNS, metric_values[p])},
+            "coverage": {column: round(float(value), 6) for column, value in zip(METRIC_COLUMNS, coverage[p])},
+            "category_exposure": {catalog.category_names[c]: round(float(exposure[p, c]), 6)
+                                  for c in categories[np.argsort(-exposure[p, categories], kind="stable")]},
+            "hhi": round(float(hhi[p]), 6),
+            "effective_holdings": round(float(1 / hhi[p]), 4) if hhi[p] > 0 else 0.0,
+            "max_weight": round(float(max_weight[p]), 6),
+            "unmatched_tickers": unmatched_by_portfolio.get(p, []),
+        })
+    return results
+
+def analyze_portfolio(portfolio_id: int, revision_id: int = None):
+    """portfolio의 최신(또는 지정) revision 분석 - revision이 없으면 None"""
+    if revision_id is None:
+        revision = fetch_one(LATEST_REVISION_SQL, (portfolio_id,))
+    else:
+        revision = fetch_one(REVISION_SQL, (portfolio_id, revision_id))
+    if revision is None:
+        return None
+    result = analyze([parse_allocations(revision["etfs"])])[0]
+    return {"portfolio_id": portfolio_id, "revision_id": revision["revision_id"], **result}
+
+def iter_revision_batches(batch_size: int = BATCH_REVISIONS):
+    """모든 revision을 revision_id 키셋으로 batch_size개씩 조회"""
+    after = 0
+    while True:
+        rows = fetch_all(REVISION_BATCH_SQL, (after, batch_size))
+        if not rows:
+            return
+        yield rows
+        after = rows[-1]["revision_id"]
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 revision 포트폴리오 분석 (JSON Lines 출력)")
+    parser.add_argument("--out", required=True, help="출력 파일 (.jsonl)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_REVISIONS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    catalog = get_metric_catalog()
+    total = 0
+    with open(args.out, "w", encoding="utf-8") as f:
+        for rows in iter_revision_batches(args.batch_size):
+            results = analyze([parse_allocations(row["etfs"]) for row in rows], catalog)
+            for row, result in zip(rows, results):
+                f.write(json.dumps({"portfolio_id": row["portfolio_id"], "revision_id": row["revision_id"], **result},
+                                   ensure_ascii=False) + "\n")
+            total += len(rows)
+            print(f"  ... {total:,} revisions ({time.perf_counter() - started:.1f}s)")
+    print(f"분석 완료: {total:,} revisions, {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
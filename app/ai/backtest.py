@@ -0,0 +1,280 @@
+"""PRICE_DATA_DIR 가격 데이터로 포트폴리오 백테스트 (일괄: python -m app.ai.backtest --out backtest.jsonl)"""
+import argparse
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.ai.analytics import parse_allocations
+from app.ai.db import fetch_all, fetch_one
+from app.core.config import settings
+
+PRICE_DATA_DIR = settings.price_data_dir
+TRADING_DAYS = 252
+DEFAULT_YEARS = 10
+CHUNK_PORTFOLIOS = 250  # buy & hold 10년 기준 청크당 (2520 x 250 x K) 배열
+PRICE_COLUMNS = ("adj_close", "close")
+RESULT_METRICS = ("total_return", "cagr", "volatility", "max_drawdown", "sharpe")
+
+class PriceMatrix:
+    """거래일 x ticker 가격 행렬 (상장 전/결측은 NaN)"""
+    def __init__(self, dates, tickers, prices):
+        self.dates = dates
+        self.tickers = tickers
+        self.index = {ticker: i for i, ticker in enumerate(tickers)}
+        self.prices = prices
+
+    def window(self, years: float):
+        """최근 years년 구간"""
+        start = max(0, len(self.dates) - int(round(years * TRADING_DAYS)) - 1)
+        return PriceMatrix(self.dates[start:], self.tickers, self.prices[start:])
+
+def _read_frame(path):
+    import pandas as pd  # 백테스트 시에만 로드
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def read_price_matrix(directory: str) -> PriceMatrix:
+    import pandas as pd
+
+    wide = [path for path in (os.path.join(directory, "prices.parquet"), os.path.join(directory, "prices.csv"))
+            if os.path.exists(path)]
+    if wide:
+        frame = _read_frame(wide[0])
+        frame = frame.set_index(pd.to_datetime(frame.pop("date")))
+    else:
+        series = {}
+        paths = glob.glob(os.path.join(directory, "*.csv")) + glob.glob(os.path.join(directory, "*.parquet"))
+        for path in sorted(paths):
+            ticker = os.path.splitext(os.path.basename(path))[0]
+            frame = _read_frame(path)
+            column = next((column for column in PRICE_COLUMNS if column in frame.columns), None)
+            if column is None:
+                print(f"[backtest] 가격 컬럼이 없어 건너뜀: {path}")
+                continue
+            series[ticker] = pd.Series(frame[column].to_numpy(dtype=np.float64), index=pd.to_datetime(frame["date"]))
+        frame = pd.DataFrame(series)
+
+    frame = frame.sort_index().ffill()
+    return PriceMatrix(
+        dates=frame.index.to_numpy(dtype="datetime64[D]"),
+        tickers=[str(column) for column in frame.columns],
+        prices=frame.to_numpy(dtype=np.float64),
+    )
+
+_price_cache = {}
+_price_lock = threading.Lock()
+
+def get_price_matrix(directory: str = None) -> PriceMatrix:
+    """가격 파일이 바뀌었을 때만 다시 읽음 (디렉터리 내 최신 mtime 기준)"""
+    directory = directory or PRICE_DATA_DIR
+    if not directory or not os.path.isdir(directory):
+        raise FileNotFoundError("PRICE_DATA_DIR 가 설정되지 않았거나 존재하지 않습니다.")
+    mtime = max((entry.stat().st_mtime for entry in os.scandir(directory)), default=0)
+    with _price_lock:
+        cached = _price_cache.get(directory)
+        if cached is None or cached[0] != mtime:
+            cached = _price_cache[directory] = (mtime, read_price_matrix(directory))
+        return cached[1]
+
+def cumulative_growth(prices: np.ndarray) -> np.ndarray:
+    """(D x N) 가격 -> 첫날 1로 시작하는 누적 성장 (결측 구간은 수익률 0)"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = prices[1:] / prices[:-1] - 1
+    returns = np.where(np.isfinite(returns), returns, 0.0)
+    growth = np.ones_like(prices)
+    np.cumprod(1 + returns, axis=0, out=growth[1:])
+    return growth
+
+def rebalance_points(dates: np.ndarray, months: int) -> np.ndarray:
+    """리밸런싱 구간 경계 인덱스 (시작 0, 끝 len-1 포함) - months개월마다 그 달 첫 거래일"""
+    last = len(dates) - 1
+    if not months or months <= 0:
+        return np.array([0, last])
+    month_ids = dates.astype("datetime64[M]").astype(np.int64)
+    starts = np.flatnonzero(np.diff(month_ids)) + 1
+    starts = starts[(month_ids[starts] - month_ids[0]) % months == 0]
+    return np.unique(np.concatenate([[0], starts, [last]]))
+
+def simulate(growth: np.ndarray, indices: np.ndarray, weights: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    growth: (D x N) 누적 성장, indices/weights: (P x K) 보유 종목과 목표 비중 (빈 칸은 weight 0)
+    리밸런싱 경계 points 마다 목표 비중으로 되돌림 - (D x P) 평가금액 곡선 (시작 1)
+    비중 합이 1 미만이면 나머지는 현금 (가격 데이터가 없는 포트폴리오는 1 유지)
+    """
+    equity = np.empty((growth.shape[0], indices.shape[0]))
+    value = np.ones(indices.shape[0])
+    cash = 1 - weights.sum(axis=1)
+    equity[0] = value
+    for a, b in zip(points[:-1], points[1:]):
+        segment = growth[a:b + 1][:, indices] / growth[a][indices]
+        values = value * (np.einsum("tpk,pk->tp", segment, weights) + cash)
+        equity[a + 1:b + 1] = values[1:]
+        value = values[-1]
+    return equity
+
+def summarize(equity: np.ndarray) -> dict:
+    """(D x P) 평가금액 곡선 -> 포트폴리오별 성과 지표 배열"""
+    days = equity.shape[0] - 1
+    daily = equity[1:] / equity[:-1] - 1
+    volatility = daily.std(axis=0) * np.sqrt(TRADING_DAYS)
+    total_return = equity[-1] - 1
+    cagr = np.power(equity[-1], TRADING_DAYS / max(days, 1)) - 1
+    drawdown = (equity / np.maximum.accumulate(equity, axis=0) - 1).min(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(volatility > 0, (daily.mean(axis=0) * TRADING_DAYS) / volatility, 0.0)
+    return {"total_return": total_return, "cagr": cagr, "volatility": volatility,
+            "max_drawdown": drawdown, "sharpe": sharpe}
+
+def portfolio_arrays(portfolios, matrix: PriceMatrix):
+    """[(ticker, allocation), ...] 리스트들을 (P x K) indices/weights 로 변환 (가격 없는 ticker 제외 후 정규화)"""
+    width = max((len(allocations) for allocations in portfolios), default=0) or 1
+    indices = np.zeros((len(portfolios), width), dtype=np.int64)
+    weights = np.zeros((len(portfolios), width))
+    unmatched = []
+    for p, allocations in enumerate(portfolios):
+        missing = []
+        k = 0
+        for ticker, allocation in allocations:
+            column = matrix.index.get(ticker)
+            if column is None:
+                missing.append(ticker)
+                continue
+            indices[p, k], weights[p, k] = column, allocation
+            k += 1
+        unmatched.append(missing)
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+    return indices, weights, unmatched
+
+# --- 프로세스 풀 워커 ---
+
+_worker_state = {}
+
+def _init_worker(directory):
+    _worker_state["growth"] = np.load(os.path.join(directory, "growth.npy"), mmap_mode="r")
+    _worker_state["dates"] = np.load(os.path.join(directory, "dates.npy"))
+
+def run_chunk(task, growth=None, dates=None):
+    """(indices, weights, months) 청크 -> 성과 지표 dict (리밸런싱 주기별로 묶어 시뮬레이션)"""
+    growth = _worker_state["growth"] if growth is None else growth
+    dates = _worker_state["dates"] if dates is None else dates
+    indices, weights, months = task
+    results = {key: np.empty(len(indices)) for key in RESULT_METRICS}
+    for frequency in np.unique(months):
+        selected = np.flatnonzero(months == frequency)
+        equity = simulate(growth, indices[selected], weights[selected], rebalance_points(dates, int(frequency)))
+        for key, values in summarize(equity).items():
+            results[key][selected] = values
+    return results
+
+def backtest_many(portfolios, months, matrix: PriceMatrix, workers: int = 1, chunk: int = CHUNK_PORTFOLIOS):
+    """여러 포트폴리오를 청크 단위로 (workers > 1 이면 프로세스 병렬) 백테스트"""
+    growth = cumulative_growth(matrix.prices)
+    indices, weights, unmatched = portfolio_arrays(portfolios, matrix)
+    months = np.asarray([int(m or 0) for m in months], dtype=np.int64)
+    tasks = [(indices[s:s + chunk], weights[s:s + chunk], months[s:s + chunk]) for s in range(0, len(portfolios), chunk)]
+
+    if workers <= 1 or len(tasks) <= 1:
+        outputs = [run_chunk(task, growth, matrix.dates) for task in tasks]
+    else:
+        with tempfile.TemporaryDirectory(prefix="backtest-") as directory:
+            np.save(os.path.join(directory, "growth.npy"), growth)
+            np.save(os.path.join(directory, "dates.npy"), matrix.dates)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(directory,)) as executor:
+                outputs = list(executor.map(run_chunk, tasks))
+
+    metrics = {key: np.concatenate([output[key] for output in outputs]) if outputs else np.empty(0)
+               for key in RESULT_METRICS}
+    return metrics, unmatched
+
+# --- 단건 / 일괄 실행 ---
+
+# revision (portfolio_id, revision_id) 인덱스 역순 탐색 1행 + 기본키 조인
+PORTFOLIO_BACKTEST_SQL = """
+    SELECT r.revision_id, r.etfs, u.rebalancing_frequency, u.investment_period
+    FROM revision r
+    JOIN portfolio p ON p.portfolio_id = r.portfolio_id
+    JOIN context c ON c.context_id = p.context_id
+    JOIN user u ON u.user_id = c.user_id
+    WHERE r.portfolio_id = %s
+    ORDER BY r.revision_id DESC
+    LIMIT 1
+"""
+
+ALL_PORTFOLIOS_BACKTEST_SQL = """
+    SELECT r.portfolio_id, r.revision_id, r.etfs, u.rebalancing_frequency
+    FROM revision r
+    JOIN (SELECT portfolio_id, MAX(revision_id) AS revision_id FROM revision GROUP BY portfolio_id) latest
+      ON latest.revision_id = r.revision_id
+    JOIN portfolio p ON p.portfolio_id = r.portfolio_id
+    JOIN context c ON c.context_id = p.context_id
+    JOIN user u ON u.user_id = c.user_id
+"""
+
+def backtest_portfolio(portfolio_id: int, years: float = None, rebalancing_months: int = None):
+    """
+    portfolio 최신 revision의 etfs를 사용자의 rebalancing_frequency(개월)로 백테스트
+    기간은 years (없으면 사용자의 investment_period 개월, 그것도 없으면 10년)
+    revision이 없으면 None
+    """
+    row = fetch_one(PORTFOLIO_BACKTEST_SQL, (portfolio_id,))
+    if row is None:
+        return None
+
+    if years is None:
+        years = row["investment_period"] / 12 if row["investment_period"] else DEFAULT_YEARS
+    months = rebalancing_months if rebalancing_months is not None else (row["rebalancing_frequency"] or 0)
+
+    matrix = get_price_matrix().window(years)
+    growth = cumulative_growth(matrix.prices)
+    indices, weights, unmatched = portfolio_arrays([parse_allocations(row["etfs"])], matrix)
+    equity = simulate(growth, indices, weights, rebalance_points(matrix.dates, months))
+    metrics = summarize(equity)
+
+    # 곡선은 월말 기준으로 축약
+    month_ids = matrix.dates.astype("datetime64[M]")
+    month_ends = np.append(np.flatnonzero(month_ids[1:] != month_ids[:-1]), len(month_ids) - 1)
+    return {
+        "portfolio_id": portfolio_id,
+        "revision_id": row["revision_id"],
+        "start_date": str(matrix.dates[0]),
+        "end_date": str(matrix.dates[-1]),
+        "rebalancing_months": months,
+        **{key: round(float(values[0]), 6) for key, values in metrics.items()},
+        "equity_curve": [{"date": str(matrix.dates[i]), "value": round(float(equity[i, 0]), 6)} for i in month_ends],
+        "unmatched_tickers": unmatched[0],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 포트폴리오(최신 revision) 백테스트 (JSON Lines 출력)")
+    parser.add_argument("--out", required=True, help="출력 파일 (.jsonl)")
+    parser.add_argument("--years", type=float, default=DEFAULT_YEARS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--prices", default=PRICE_DATA_DIR, help="가격 데이터 디렉터리 (기본: PRICE_DATA_DIR)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    matrix = get_price_matrix(args.prices).window(args.years)
+    rows = fetch_all(ALL_PORTFOLIOS_BACKTEST_SQL)
+    metrics, unmatched = backtest_many(
+        [parse_allocations(row["etfs"]) for row in rows], [row["rebalancing_frequency"] for row in rows],
+        matrix, args.workers
+    )
+    with open(args.out, "w", encoding="utf-8") as f:
+        for i, row in enumerate(rows):
+            f.write(json.dumps({
+                "portfolio_id": row["portfolio_id"], "revision_id": row["revision_id"],
+                **{key: round(float(values[i]), 6) for key, values in metrics.items()},
+                "unmatched_tickers": unmatched[i],
+            }, ensure_ascii=False) + "\n")
+    print(f"백테스트 완료: {len(rows):,} portfolios, {len(matrix.dates)} days, {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,23 @@
-import os
-from pathlib import Path
-from dotenv import load_dotenv
-import openai
+import threading
+from app.core.config import settings
 
-# .env 파일 경로 설정 (필요에 따라 수정)
-env_path = Path(__file__).resolve().parents[2] / ".env"
-load_dotenv(dotenv_path=env_path)
+# 환경변수는 app.core.config.settings에서 일괄 로드
+DB_HOST = settings.db_host
+DB_USER = settings.db_user
+DB_PASSWORD = settings.db_password
+DB_NAME = settings.db_name
+GPT_API_KEY = settings.gpt_api_key
 
-# 환경변수 로드
-DB_HOST = os.getenv('DB_HOST')
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
-DB_NAME = os.getenv('DB_NAME')
-GPT_API_KEY = os.getenv('GPT_API_KEY')
+_client = None
+_client_lock = threading.Lock()
 
-# OpenAI 설정
-openai.api_key = GPT_API_KEY
-client = openai.OpenAI(api_key=GPT_API_KEY)
\ No newline at end of file
+# OpenAI 클라이언트는 처음 사용할 때 생성 (openai 패키지 import 비용을 기동 시점에서 제외)
+# 재시도/백오프는 app.ai.scheduler 가 모델 한도와 함께 관리하므로 클라이언트 자체 재시도는 끔
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import openai
+                _client = openai.OpenAI(api_key=GPT_API_KEY, max_retries=0)
+    return _client
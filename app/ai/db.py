@@ -0,0 +1,42 @@
+import numpy as np
+from app.db.connection import get_connection
+
+# --- AI 모듈용 경량 로더 (pandas 없이 커서 결과를 dict / NumPy 배열로 바로 변환) ---
+
+def fetch_one(query, params=None):
+    """단일 행을 dict로 조회 (없으면 None)"""
+    connection = get_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchone()
+    finally:
+        connection.close()
+
+def fetch_all(query, params=None):
+    """여러 행을 dict 리스트로 조회"""
+    connection = get_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    finally:
+        connection.close()
+
+def parse_vector(value, dim, dtype=np.float64):
+    """'[0.1, 0.2, ...]' 형태의 문자열 벡터를 NumPy 배열로 변환 (비어 있으면 0 벡터)"""
+    if not value:
+        return np.zeros(dim, dtype=dtype)
+    return np.fromstring(value.strip("[]"), sep=',', dtype=dtype)
+
+def vector_matrix(rows, column, dim, dtype=np.float64):
+    """행 리스트의 문자열 벡터 컬럼을 (행 수 x dim) 행렬로 변환"""
+    matrix = np.zeros((len(rows), dim), dtype=dtype)
+    for i, row in enumerate(rows):
+        if row[column]:
+            matrix[i] = parse_vector(row[column], dim, dtype)
+    return matrix
+
+def float_column(rows, column):
+    """숫자(Decimal 포함) 컬럼을 float64 배열로 변환 (NULL은 NaN)"""
+    return np.array([np.nan if row[column] is None else float(row[column]) for row in rows], dtype=np.float64)
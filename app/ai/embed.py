@@ -2,10 +2,11 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 #시스템 경로설정 끝
-from app.ai.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, client
-import pymysql
-import pandas as pd
+from app.ai.resilience import AIUnavailableError, mark_degraded
+from app.ai.scheduler import chat_completion, create_embedding
+from app.ai.db import fetch_all, vector_matrix
 import numpy as np
+from app.ai.snapshot import TEXT_VECTOR_DIM, get_snapshot
 # --- 유저 자연어 쿼리 임베딩 기반 ETF 추천 함수 ---
 #1. 유저쿼리 임베드 벡터화
 def get_embedding(text, model="text-embedding-3-small"):
@@ -13,29 +14,21 @@ def get_embedding(text, model="text-embedding-3-small"):
     OpenAI의 text-embedding-3-small 모델을 사용하여 텍스트를 임베딩하는 함수.
     """
     text = text.replace("\n", " ")
-    response = client.embeddings.create(input=[text], model=model)
+    response = create_embedding(input=[text], model=model)
     return response.data[0].embedding
 
 #2. etf 텍스트 벡터 및 설명데이터 조회
+ETF_TEXT_VECTORS_SQL = "SELECT ticker, category, long_business_summary, text_vector FROM etf"
+
 def fetch_etf_text_vectors():
-    """ETF 테이블에서 text_vector 컬럼을 조회하여 반환하는 함수"""
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-
-    query = "SELECT ticker, category, long_business_summary, text_vector FROM etf"
-    etf_data = pd.read_sql(query, connection)
-    connection.close()
-
-    # 문자열 형태의 벡터를 NumPy 배열로 변환
-    etf_data["text_vector"] = etf_data["text_vector"].apply(
-        lambda x: np.fromstring(x.strip("[]"), sep=',') if x else np.zeros(1536)
-    )
-
-    return etf_data
+    """ETF 테이블에서 text_vector 컬럼을 조회하여 컬럼별로 반환 (text_vector는 (N, 1536) 행렬)"""
+    rows = fetch_all(ETF_TEXT_VECTORS_SQL)
+    return {
+        "ticker": [row["ticker"] for row in rows],
+        "category": [row["category"] for row in rows],
+        "long_business_summary": [row["long_business_summary"] for row in rows],
+        "text_vector": vector_matrix(rows, "text_vector", TEXT_VECTOR_DIM, np.float32),
+    }
 #3. 코사인 유사도 계산함수
 def cosine_similarity(vec1, vec2):
     """
@@ -55,6 +48,7 @@ def truncate_text(text, max_length=150):
     """
     긴 ETF 설명을 적절한 길이로 줄이는 함수 (기본: 150자)
     """
+    text = text or ""
     if len(text) <= max_length:
         return text
     return text[:max_length].rsplit(" ", 1)[0] + "..."  # 문장이 끊기지 않도록 마지막 공백 기준으로 자름
@@ -74,43 +68,123 @@ def summarize_text(text, category):
     투자자가 이해하기 쉽도록 2~3문장으로 요약해 주세요.
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "system", "content": "당신은 금융 데이터 요약 전문가입니다."},
-                  {"role": "user", "content": prompt}]
-    )
+    try:
+        response = chat_completion(
+            model="gpt-4o",
+            messages=[{"role": "system", "content": "당신은 금융 데이터 요약 전문가입니다."},
+                      {"role": "user", "content": prompt}]
+        )
+    except AIUnavailableError as e:
+        # AI 백엔드 장애 시 단순 절삭 요약으로 대체
+        mark_degraded(f"summarize_text: {e}")
+        return truncate_text(text)
 
     summary = response.choices[0].message.content.strip()
     return summary
 #5. 자연어쿼리 기반 ai 추천함수
-def query_recommend_etfs(user_query, top_k=4, use_gpt_summary=True):
+def query_recommend_etfs(user_query, top_k=4, use_gpt_summary=True, mode="auto", filters=None):
     """
     사용자 자연어 쿼리를 임베딩하고, ETF 테이블의 text_vector와 코사인 유사도를 비교하여 상위 ETF 추천.
+    키워드 점수(BM25)와 벡터 점수는 순위 융합(RRF)으로 합침.
+    mode: auto(ticker·따옴표 구절·지수 이름·드문 단어만으로 된 짧은 쿼리는 lexical, 그 외 hybrid) / hybrid / lexical(임베딩 생략) / vector
+    filters: {"categories": [...], "ranges": {지표 컬럼: (최소, 최대)}} - 조건에 맞는 ETF 안에서만 순위를 매김
+    같은 조건의 같은/비슷한 쿼리(임베딩 코사인 threshold 이상)는 결과 캐시에서 재사용.
     추천 결과를 JSON 형식으로 반환.
     """
-    # 1. 사용자 쿼리 임베딩
-    query_embedding = get_embedding(user_query)
-
-    # 2. ETF 데이터 로드 (text_vector 포함)
-    etf_data = fetch_etf_text_vectors()
-
-    # 3. 각 ETF와의 코사인 유사도 계산
-    scores = []
-    for _, row in etf_data.iterrows():
-        etf_vector = row["text_vector"]
-        sim = cosine_similarity(query_embedding, etf_vector)
-        scores.append((row, sim))
-
-    # 4. 유사도 기준 정렬 후 상위 ETF 추천
-    scores.sort(key=lambda x: x[1], reverse=True)
-    top_etfs = scores[:top_k]
+    from app.ai.lexical import get_lexical_index
+    from app.ai.resilience import track_degradation
+    from app.ai.semantic_cache import cache_key, get_semantic_cache
+
+    # 1. ETF 벡터 스냅샷 (멀티 워커 모드에서는 공유 mmap) + 스냅샷 세대별 키워드 색인
+    snapshot = get_snapshot()
+    lexical = get_lexical_index(snapshot)
+    if mode == "auto":
+        mode = "lexical" if lexical.is_keyword_query(user_query) else "hybrid"
+
+    # 2. 결과 캐시 - 같은 쿼리 문자열이면 임베딩 없이 재사용
+    cache = get_semantic_cache()
+    # hybrid/lexical 결과는 키워드 토큰에 따라 달라지므로 색인에 있는 질의 토큰을 키에 포함
+    terms = lexical.matched_terms(user_query) if mode != "vector" else ()
+    key = cache_key(snapshot, mode, top_k, use_gpt_summary, filters, terms) if cache else None
+    if cache:
+        cached_recommendations = cache.get_exact(key, user_query)
+        if cached_recommendations is not None:
+            return cached_recommendations
+
+    with track_degradation() as degraded:
+        # 3. 사용자 쿼리 임베딩 (lexical 모드는 생략) - AI 백엔드 장애 시 키워드 점수만 사용
+        query_embedding = None
+        if mode != "lexical":
+            try:
+                query_embedding = np.asarray(get_embedding(user_query), dtype=np.float32)
+            except AIUnavailableError as e:
+                mark_degraded(f"get_embedding: {e}")
+
+        # 4. 결과 캐시 - 임베딩이 가까운 쿼리의 결과 재사용
+        if cache and query_embedding is not None:
+            cached_recommendations = cache.get_similar(key, query_embedding)
+            if cached_recommendations is not None:
+                return cached_recommendations
+        elif cache:
+            cache.count_miss()
+
+        recommendations = rank_etfs(snapshot, lexical, user_query, query_embedding, mode, top_k, use_gpt_summary,
+                                    filters)
+
+    # 대체 결과(키워드 점수, 절삭 요약)는 캐시하지 않음
+    if cache and not degraded:
+        cache.put(key, user_query, query_embedding, recommendations)
+    return recommendations
+
+def rank_etfs(snapshot, lexical, user_query, query_embedding, mode, top_k, use_gpt_summary, filters):
+    """키워드/벡터 점수 계산 -> 필터 -> 순위 융합 -> 상위 top_k 포맷팅 (query_embedding 이 None 이면 키워드 점수만)"""
+    from app.ai.filters import get_catalog_filter
+    from app.ai.lexical import ranks, reciprocal_rank_fusion
+    from app.ai.quantize import approximate_search_enabled, get_approximate_index
+
+    # 1. 키워드 점수 (vector 모드는 임베딩이 없을 때만)
+    lexical_scores = lexical.score(user_query) if mode != "vector" or query_embedding is None else None
+
+    # 2. 메타데이터 필터 (사전 계산 마스크) - 제외된 ETF는 -inf 로 두어 순위/top-k 에서 빠짐
+    mask = get_catalog_filter(snapshot).mask(**filters) if filters else None
+
+    # 3. 벡터 점수
+    vector_scores = None
+    if query_embedding is not None:
+        if approximate_search_enabled():
+            # 3-1. 축소/양자화 행렬로 후보를 고른 뒤 후보만 정확한 코사인으로 재정렬 (후보 밖은 -inf)
+            vector_scores = get_approximate_index(snapshot).scores(query_embedding, top_k, mask=mask)
+        else:
+            # 3-2. 전체 ETF와의 코사인 유사도를 행렬 곱 한 번으로 계산 (벡터가 없는 ETF는 0점)
+            query_norm = np.linalg.norm(query_embedding)
+            norms = np.asarray(snapshot.text_norms) * query_norm
+            dots = snapshot.text_vectors @ query_embedding
+            vector_scores = np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
+
+    if mask is not None:
+        lexical_scores = None if lexical_scores is None else np.where(mask, lexical_scores, -np.inf)
+        vector_scores = None if vector_scores is None else np.where(mask, vector_scores, -np.inf)
+
+    # 4. 점수 결합 후 상위 ETF 추천 (키워드 점수가 0인 ETF는 키워드 순위 없음)
+    if vector_scores is None:
+        scores = lexical_scores
+    elif lexical_scores is None:
+        scores = vector_scores
+    else:
+        scores = reciprocal_rank_fusion(ranks(vector_scores), ranks(lexical_scores, only_positive=True))
+    top_indices = np.argsort(-scores, kind="stable")[:top_k]
+    if mask is not None:
+        top_indices = top_indices[mask[top_indices]]
+    if vector_scores is None:
+        # 키워드 점수만 있으면 (lexical 모드, 임베딩 실패) 0점 ETF는 빼서 스냅샷 순서의 임의 ETF를 추천하지 않음
+        top_indices = top_indices[scores[top_indices] > 0]
 
     # 5. 추천 ETF 포맷팅 (JSON 형식으로 리턴)
     formatted_recommendations = []
-    for etf, _ in top_etfs:
-        ticker = etf["ticker"]
-        category = etf["category"]
-        description = etf["long_business_summary"]
+    for i in top_indices:
+        ticker = snapshot.tickers[i]
+        category = snapshot.categories[i]
+        description = snapshot.summaries[i]
 
         # 설명 요약 (GPT 사용 여부 선택)
         summary = summarize_text(description,category) if use_gpt_summary else truncate_text(description)
@@ -0,0 +1,172 @@
+"""etf.text_vector 증분 임베딩 (python -m app.ai.embedding_pipeline report|run)"""
+import argparse
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.ai.db import fetch_all
+from app.ai.scheduler import BATCH, create_embedding, estimate_tokens, openai_priority
+from app.ai.snapshot import TEXT_VECTOR_DIM
+from app.core.cache import invalidate_tables
+from app.db.connection import get_connection
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+MAX_INPUT_CHARS = 16_000     # 입력 하나의 토큰 한도(8191) 안쪽으로 절단
+BATCH_INPUTS = 256           # 요청 하나당 입력 수 (API 상한 2048)
+BATCH_TOKENS = 100_000       # 요청 하나당 추정 토큰 수 (API 상한 300k, 스케줄러 버킷 용량 이하로)
+WRITE_BATCH = 100            # UPDATE 한 문장에 담는 행 수 (1536차원 벡터 문자열이라 작게)
+DEFAULT_WORKERS = 4
+
+def embedding_input(summary) -> str:
+    """get_embedding 과 같은 전처리 (줄바꿈 제거) + 길이 절단"""
+    return (summary or "").replace("\n", " ").strip()[:MAX_INPUT_CHARS]
+
+def content_hash(text: str, model: str = EMBEDDING_MODEL) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+def vector_text(vector) -> str:
+    """DB 저장 형식 '[0.1,0.2,...]' (app.ai.db.parse_vector 로 읽힘)"""
+    return "[" + ",".join(f"{value:.8g}" for value in vector) + "]"
+
+SCAN_SQL = (
+    "SELECT ticker, long_business_summary, text_vector_hash, "
+    "(text_vector IS NULL OR text_vector = '') AS missing_vector FROM etf ORDER BY ticker"
+)
+# 행 수만큼 CASE 절과 IN 자리표시자를 채움 (write_vectors_sql)
+WRITE_VECTORS_SQL = (
+    "UPDATE etf SET text_vector = CASE ticker {vector_cases} END, "
+    "text_vector_hash = CASE ticker {hash_cases} END WHERE ticker IN ({placeholders})"
+)
+
+def write_vectors_sql(count: int) -> str:
+    return WRITE_VECTORS_SQL.format(
+        vector_cases=" ".join(["WHEN %s THEN COALESCE(%s, text_vector)"] * count),
+        hash_cases=" ".join(["WHEN %s THEN %s"] * count),
+        placeholders=", ".join(["%s"] * count),
+    )
+
+def scan(model: str = EMBEDDING_MODEL):
+    """ETF 전체를 훑어 상태별로 분류 (벡터 본문은 읽지 않음)"""
+    rows = fetch_all(SCAN_SQL)
+    plan = {"up_to_date": [], "missing_vector": [], "changed_text": [], "unhashed": [], "no_text": []}
+    for row in rows:
+        text = embedding_input(row["long_business_summary"])
+        if not text:
+            plan["no_text"].append(row["ticker"])
+            continue
+        item = (row["ticker"], text, content_hash(text, model))
+        if row["missing_vector"]:
+            plan["missing_vector"].append(item)
+        elif row["text_vector_hash"] is None:
+            plan["unhashed"].append(item)
+        elif row["text_vector_hash"] != item[2]:
+            plan["changed_text"].append(item)
+        else:
+            plan["up_to_date"].append(item)
+    return plan
+
+def report(plan: dict) -> dict:
+    counts = {status: len(items) for status, items in plan.items()}
+    counts["total"] = sum(counts.values())
+    counts["stale"] = counts["missing_vector"] + counts["changed_text"] + counts["unhashed"]
+    return counts
+
+def make_batches(items, max_inputs: int = BATCH_INPUTS, max_tokens: int = BATCH_TOKENS):
+    """입력 수와 추정 토큰 수 한도를 넘지 않도록 순서대로 묶음"""
+    batch, tokens = [], 0
+    for item in items:
+        cost = estimate_tokens(item[1])
+        if batch and (len(batch) >= max_inputs or tokens + cost > max_tokens):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(item)
+        tokens += cost
+    if batch:
+        yield batch
+
+def embed_batch(batch, model: str = EMBEDDING_MODEL) -> np.ndarray:
+    """배치 입력을 한 번의 요청으로 임베딩 -> (len(batch) x dim) 행렬 (응답 index 순서로 정렬)"""
+    with openai_priority(BATCH):
+        response = create_embedding(input=[text for _, text, _ in batch], model=model)
+    vectors = np.zeros((len(batch), TEXT_VECTOR_DIM), dtype=np.float32)
+    for item in response.data:
+        vectors[item.index] = item.embedding
+    return vectors
+
+def write_vectors(rows):
+    """[(ticker, vector_text 또는 None, hash)] 를 WRITE_BATCH 행씩 UPDATE ... CASE 한 문장으로 갱신"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            for start in range(0, len(rows), WRITE_BATCH):
+                chunk = rows[start:start + WRITE_BATCH]
+                params = [value for ticker, vector, _ in chunk for value in (ticker, vector)]
+                params += [value for ticker, _, digest in chunk for value in (ticker, digest)]
+                params += [ticker for ticker, _, _ in chunk]
+                cursor.execute(write_vectors_sql(len(chunk)), params)
+        conn.commit()
+    finally:
+        conn.close()
+    invalidate_tables("etf")
+
+def adopt_hashes(items):
+    """기존 벡터를 그대로 두고 해시만 기록 (vector=None 이면 COALESCE 로 기존 값 유지)"""
+    write_vectors([(ticker, None, digest) for ticker, _, digest in items])
+
+def run(workers: int = DEFAULT_WORKERS, batch_inputs: int = BATCH_INPUTS, adopt_existing: bool = False,
+        dry_run: bool = False, model: str = EMBEDDING_MODEL) -> dict:
+    started = time.perf_counter()
+    plan = scan(model)
+    counts = report(plan)
+    targets = plan["missing_vector"] + plan["changed_text"] + ([] if adopt_existing else plan["unhashed"])
+    batches = list(make_batches(targets, batch_inputs))
+    stats = {**counts, "to_embed": len(targets), "batches": len(batches), "embedded": 0, "adopted": 0,
+             "failed_batches": 0}
+    if dry_run:
+        return stats
+
+    if adopt_existing and plan["unhashed"]:
+        adopt_hashes(plan["unhashed"])
+        stats["adopted"] = len(plan["unhashed"])
+
+    def process(batch):
+        vectors = embed_batch(batch, model)
+        write_vectors([(ticker, vector_text(vector), digest) for (ticker, _, digest), vector in zip(batch, vectors)])
+        return len(batch)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(process, batch) for batch in batches]
+        for done, future in enumerate(futures, start=1):
+            try:
+                stats["embedded"] += future.result()
+            except Exception as e:
+                # 실패한 배치는 해시가 갱신되지 않으므로 다음 실행에서 다시 대상이 됨
+                stats["failed_batches"] += 1
+                print("임베딩 배치 실패:", e)
+            print(f"  ... {done}/{len(batches)} batches, {stats['embedded']:,} rows "
+                  f"({time.perf_counter() - started:.1f}s)")
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="etf.text_vector 증분 임베딩")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("report", help="다시 임베딩해야 하는 행 수 보고")
+    run_parser = commands.add_parser("run", help="대상 행 임베딩 후 저장")
+    run_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시에 보내는 배치 수")
+    run_parser.add_argument("--batch-size", type=int, default=BATCH_INPUTS, help="요청 하나당 입력 수")
+    run_parser.add_argument("--adopt-existing", action="store_true",
+                            help="해시 없이 벡터만 있는 행은 다시 임베딩하지 않고 현재 해시만 기록")
+    run_parser.add_argument("--dry-run", action="store_true", help="대상만 집계")
+    args = parser.parse_args()
+
+    if args.command == "report":
+        print(f"text_vector 상태: {report(scan())}")
+        return
+    stats = run(args.workers, args.batch_size, args.adopt_existing, args.dry_run)
+    print(f"임베딩 {'계획' if args.dry_run else '완료'}: {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""시장 지표 변경 후 revision.ai_feedback 일괄 재생성 작업 (python -m app.ai.feedback_job create|resume|status)"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from app.ai.db import fetch_all, fetch_one
+from app.ai.resilience import AIUnavailableError, track_degradation
+from app.ai.scheduler import BATCH, openai_priority
+from app.core.response import json_default
+from app.db.connection import get_connection
+
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 32
+CHECKPOINT_INTERVAL = 5.0
+LEASE_SECONDS = 120
+SELECT_BATCH = 500
+RECENT_FAILURES = 20
+RESUMABLE_STATUSES = ("pending", "interrupted", "failed")
+
+# {} 자리에는 selection_filter 의 WHERE 절 조각을 AND 로 이어 넣음
+COUNT_TARGETS_SQL = "SELECT COUNT(*) AS total FROM portfolio p JOIN context c ON c.context_id = p.context_id WHERE {}"
+# portfolio 기본키 키셋 배치
+TARGETS_SQL = (
+    "SELECT p.portfolio_id, c.user_id FROM portfolio p JOIN context c ON c.context_id = p.context_id "
+    "WHERE p.portfolio_id > %s AND {} ORDER BY p.portfolio_id ASC LIMIT %s"
+)
+JOB_SQL = (
+    "SELECT job_id, status, selection, market_data, concurrency, total, processed, failed, last_portfolio_id, "
+    "stats, error, heartbeat_at, started_at, finished_at, created_at, updated_at FROM feedback_job WHERE job_id = %s"
+)
+JOB_FAILURES_SQL = (
+    "SELECT portfolio_id, error, updated_at FROM feedback_job_failure WHERE job_id = %s "
+    "ORDER BY updated_at DESC LIMIT %s"
+)
+CLAIM_JOB_SQL = (
+    "UPDATE feedback_job SET status = 'running', error = NULL, finished_at = NULL, heartbeat_at = NOW(), "
+    "started_at = COALESCE(started_at, NOW()) WHERE job_id = %s AND (status IN (%s, %s, %s) "
+    "OR (status = 'running' AND heartbeat_at < NOW() - INTERVAL %s SECOND))"
+)
+CHECKPOINT_SQL = (
+    "UPDATE feedback_job SET processed = %s, failed = %s, last_portfolio_id = %s, stats = %s, "
+    "heartbeat_at = NOW(), status = COALESCE(%s, status), error = %s, "
+    "finished_at = IF(%s IS NULL, finished_at, NOW()) WHERE job_id = %s"
+)
+
+def selection_filter(selection: dict):
+    """대상 조건 -> (WHERE 절 조각 목록, 파라미터) - portfolio p, context c 기준"""
+    clauses, params = [], []
+    if selection.get("user_id") is not None:
+        clauses.append("c.user_id = %s")
+        params.append(selection["user_id"])
+    if selection.get("portfolio_ids"):
+        clauses.append(f"p.portfolio_id IN ({', '.join(['%s'] * len(selection['portfolio_ids']))})")
+        params.extend(selection["portfolio_ids"])
+    if selection.get("stale_before"):
+        # 최신 revision이 기준 시각 이전에 갱신된 포트폴리오 (revision이 없으면 NULL 이라 제외)
+        clauses.append("(SELECT r.updated_at FROM revision r WHERE r.portfolio_id = p.portfolio_id "
+                       "ORDER BY r.revision_id DESC LIMIT 1) < %s")
+        params.append(selection["stale_before"])
+    else:
+        clauses.append("EXISTS (SELECT 1 FROM revision r WHERE r.portfolio_id = p.portfolio_id)")
+    return clauses, params
+
+def count_targets(selection: dict) -> int:
+    clauses, params = selection_filter(selection)
+    row = fetch_one(COUNT_TARGETS_SQL.format(" AND ".join(clauses)), params)
+    return row["total"]
+
+def iter_targets(selection: dict, after_portfolio_id: int = 0, batch_size: int = SELECT_BATCH):
+    """대상 (portfolio_id, user_id) 를 portfolio_id 키셋으로 batch_size개씩 조회"""
+    clauses, params = selection_filter(selection)
+    sql = TARGETS_SQL.format(" AND ".join(clauses))
+    after = after_portfolio_id
+    while True:
+        rows = fetch_all(sql, [after, *params, batch_size])
+        for row in rows:
+            yield row["portfolio_id"], row["user_id"]
+        if len(rows) < batch_size:
+            return
+        after = rows[-1]["portfolio_id"]
+
+def market_data_from_indicator(name: str):
+    """
+    market_indicator 이름 -> (generate_feedback 용 시장 데이터 dict, 지표 갱신 시각) - 없으면 None
+    지표가 막 바뀐 직후에 작업을 만들 수 있으므로 참조 데이터 캐시를 거치지 않고 DB에서 바로 읽음
+    """
+    from app.crud.market_indicator import MARKET_INDICATOR_BY_NAME_SQL
+    indicator = fetch_one(MARKET_INDICATOR_BY_NAME_SQL, (name,))
+    if indicator is None:
+        return None
+    market_data = {
+        "market_condition": indicator["name"],
+        **{key: float(indicator[key]) if indicator[key] is not None else None
+           for key in ("interest_rate", "inflation_rate", "exchange_rate")},
+    }
+    return market_data, indicator["updated_at"]
+
+def _execute(sql, params=None) -> int:
+    """쓰기 문장 하나를 실행하고 커밋 (영향받은 행 수 반환)"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            affected = cursor.execute(sql, params)
+        conn.commit()
+        return affected
+    finally:
+        conn.close()
+
+def _decode(job):
+    for key in ("selection", "market_data", "stats"):
+        if isinstance(job.get(key), (str, bytes)):
+            job[key] = json.loads(job[key])
+    return job
+
+def create_job(selection: dict, market_data: dict, concurrency: int = DEFAULT_CONCURRENCY) -> dict:
+    """대상 수를 세어 pending 상태의 작업을 만들고 작업 행 반환"""
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+    total = count_targets(selection)
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO feedback_job (status, selection, market_data, concurrency, total) "
+                "VALUES ('pending', %s, %s, %s, %s)",
+                (json.dumps(selection, ensure_ascii=False, default=json_default),
+                 json.dumps(market_data, ensure_ascii=False, default=json_default), concurrency, total)
+            )
+            job_id = cursor.lastrowid
+        conn.commit()
+    finally:
+        conn.close()
+    return get_job(job_id)
+
+def get_job(job_id: int, failures: int = RECENT_FAILURES):
+    """작업 행 + 진행률 + 최근 실패 목록 (없으면 None)"""
+    job = fetch_one(JOB_SQL, (job_id,))
+    if job is None:
+        return None
+    job = _decode(job)
+    done = job["processed"] + job["failed"]
+    job["progress"] = round(min(done / job["total"], 1.0), 4) if job["total"] else 1.0
+    job["recent_failures"] = fetch_all(JOB_FAILURES_SQL, (job_id, failures)) if job["failed"] else []
+    return job
+
+def claim_job(job_id: int):
+    """
+    작업을 running 으로 가져감 (pending/interrupted/failed, 또는 heartbeat가 끊긴 running)
+    다른 프로세스가 실행 중이거나 이미 끝난 작업이면 None
+    """
+    claimed = _execute(CLAIM_JOB_SQL, (job_id, *RESUMABLE_STATUSES, LEASE_SECONDS))
+    return get_job(job_id, failures=0) if claimed else None
+
+class JobStats:
+    """이번 실행의 처리량/지연 시간 (누적 처리 수는 작업 행 기준으로 이어감)"""
+    def __init__(self, processed: int, failed: int):
+        self.processed = processed
+        self.failed = failed
+        self.latencies = []
+        self.started = time.perf_counter()
+
+    def record(self, latency: float, ok: bool):
+        self.latencies.append(latency)
+        if ok:
+            self.processed += 1
+        else:
+            self.failed += 1
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1) if latencies else None
+
+        return {
+            "run_seconds": round(elapsed, 1),
+            "run_completed": len(latencies),
+            "throughput_per_minute": round(len(latencies) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1] * 1000, 1) if latencies else None,
+            },
+        }
+
+def _checkpoint(job, watermark: int, stats: JobStats, failures: list, status: str = None, error: str = None):
+    """진행 상황과 실패 목록을 한 트랜잭션으로 기록 (status 를 주면 종료 처리)"""
+    summary = stats.summary()
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            if failures:
+                cursor.executemany(
+                    "INSERT INTO feedback_job_failure (job_id, portfolio_id, error) VALUES (%s, %s, %s) "
+                    "ON DUPLICATE KEY UPDATE error = VALUES(error)",
+                    [(job["job_id"], portfolio_id, message) for portfolio_id, message in failures]
+                )
+            cursor.execute(
+                CHECKPOINT_SQL,
+                (stats.processed, stats.failed, watermark, json.dumps(summary), status, error, status, job["job_id"])
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    failures.clear()
+
+    done = stats.processed + stats.failed
+    print(f"feedback job {job['job_id']}: {done:,}/{job['total']:,} (failed {stats.failed:,}), "
+          f"{summary['throughput_per_minute']}/min, p95 {summary['latency_ms']['p95']}ms"
+          + (f" -> {status}" if status else ""))
+
+def _regenerate(generate, portfolio_id, user_id, market_data):
+    """포트폴리오 하나의 피드백 재생성 -> ("ok" / "failed" / "unavailable", 소요 시간, 오류 메시지)"""
+    started = time.perf_counter()
+    try:
+        with openai_priority(BATCH), track_degradation() as degraded:  # API 요청의 OpenAI 호출이 먼저 나가도록
+            result = generate(portfolio_id, user_id, market_data)
+        if degraded:
+            # 대체 결과는 저장되지 않음 - 포트폴리오 실패가 아니라 AI 백엔드 장애
+            return "unavailable", time.perf_counter() - started, f"AI 백엔드 사용 불가: {degraded[0]}"
+        # generate_feedback 은 실패 시 예외 대신 (메시지, []) 또는 오류 JSON 문자열을 반환
+        if not isinstance(result, tuple) or not result[1]:
+            raise RuntimeError(result[0] if isinstance(result, tuple) else result)
+        return "ok", time.perf_counter() - started, None
+    except AIUnavailableError as e:
+        return "unavailable", time.perf_counter() - started, f"AI 백엔드 사용 불가: {e}"
+    except Exception as e:
+        return "failed", time.perf_counter() - started, str(e)[:1000]
+
+def run_claimed(job, generate=None) -> dict:
+    """claim_job 으로 가져온 작업을 체크포인트부터 실행하고 마지막 상태 반환"""
+    from app.schemas.portfolio import MarketData
+    if generate is None:
+        from app.ai.revision import generate_feedback as generate
+
+    market_data = MarketData(**job["market_data"])
+    concurrency = job["concurrency"]
+    stats = JobStats(job["processed"], job["failed"])
+    watermark = job["last_portfolio_id"]
+    failures = []
+    pending = {}        # future -> portfolio_id
+    submitted = deque() # 제출 순서 (portfolio_id 오름차순)
+    finished = set()
+    targets = iter_targets(job["selection"], watermark)
+    exhausted = False
+    outage = None       # AI 백엔드 장애 사유 - 새 대상 제출을 멈추고 실행 중인 것만 마무리
+    last_checkpoint = time.monotonic()
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"feedback-job-{job['job_id']}")
+    try:
+        while True:
+            while outage is None and not exhausted and len(pending) < concurrency:
+                target = next(targets, None)
+                if target is None:
+                    exhausted = True
+                    break
+                portfolio_id, user_id = target
+                pending[pool.submit(_regenerate, generate, portfolio_id, user_id, market_data)] = portfolio_id
+                submitted.append(portfolio_id)
+            if not pending:
+                break
+
+            completed, _ = wait(pending, timeout=CHECKPOINT_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in completed:
+                portfolio_id = pending.pop(future)
+                outcome, latency, error = future.result()
+                if outcome == "unavailable":
+                    # 완료로 표시하지 않으므로 체크포인트는 이 포트폴리오 앞에 머물고 resume 때 다시 처리
+                    outage = outage or error
+                    continue
+                stats.record(latency, outcome == "ok")
+                if outcome == "failed":
+                    failures.append((portfolio_id, error))
+                finished.add(portfolio_id)
+            # 체크포인트는 앞선 포트폴리오가 모두 끝난 지점까지만 전진
+            while submitted and submitted[0] in finished:
+                watermark = submitted.popleft()
+                finished.discard(watermark)
+
+            if time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                _checkpoint(job, watermark, stats, failures)
+                last_checkpoint = time.monotonic()
+    except BaseException as e:
+        pool.shutdown(wait=False, cancel_futures=True)
+        status = "interrupted" if isinstance(e, KeyboardInterrupt) else "failed"
+        _checkpoint(job, watermark, stats, failures, status, repr(e)[:1000])
+        raise
+    pool.shutdown()
+    if outage:
+        _checkpoint(job, watermark, stats, failures, "interrupted", outage)
+    else:
+        _checkpoint(job, watermark, stats, failures, "completed")
+    return get_job(job["job_id"])
+
+def run_job(job_id: int, generate=None):
+    """작업을 가져와 실행 (가져올 수 없으면 None)"""
+    job = claim_job(job_id)
+    if job is None:
+        return None
+    return run_claimed(job, generate)
+
+def start_in_background(job) -> threading.Thread:
+    """API 요청에서 작업을 데몬 스레드로 실행 (오류는 작업 행에 기록되므로 로그만 남김)"""
+    def target():
+        try:
+            run_claimed(job)
+        except Exception as e:
+            print(f"feedback job {job['job_id']} 실패:", e)
+
+    thread = threading.Thread(target=target, name=f"feedback-job-{job['job_id']}", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="포트폴리오 피드백 일괄 재생성")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="작업 생성 후 실행")
+    create.add_argument("--market-indicator", required=True, help="사용할 market_indicator 이름")
+    create.add_argument("--user-id", type=int)
+    create.add_argument("--portfolio-ids", help="쉼표로 구분한 portfolio_id 목록")
+    create.add_argument("--all", action="store_true", help="지표 갱신 이후 이미 갱신된 포트폴리오도 포함")
+    create.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+
+    resume = commands.add_parser("resume", help="중단된 작업을 체크포인트부터 이어서 실행")
+    resume.add_argument("job_id", type=int)
+
+    status = commands.add_parser("status", help="작업 진행 상황 조회")
+    status.add_argument("job_id", type=int)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        job = get_job(args.job_id)
+        print(json.dumps(job, ensure_ascii=False, indent=2, default=json_default) if job else "작업이 없습니다.")
+        return
+
+    if args.command == "create":
+        resolved = market_data_from_indicator(args.market_indicator)
+        if resolved is None:
+            raise SystemExit(f"market_indicator '{args.market_indicator}' 가 없습니다.")
+        market_data, indicator_updated_at = resolved
+        selection = {
+            "user_id": args.user_id,
+            "portfolio_ids": [int(value) for value in args.portfolio_ids.split(",")] if args.portfolio_ids else None,
+            "stale_before": None if args.all else indicator_updated_at,
+        }
+        job = create_job(selection, market_data, args.concurrency)
+        print(f"feedback job {job['job_id']} 생성: 대상 {job['total']:,}개, 동시 실행 {job['concurrency']}")
+        job_id = job["job_id"]
+    else:
+        job_id = args.job_id
+
+    job = run_job(job_id)
+    if job is None:
+        raise SystemExit(f"feedback job {job_id} 을(를) 실행할 수 없습니다 (없음, 완료됨 또는 다른 프로세스에서 실행 중).")
+    print(json.dumps({key: job[key] for key in ("job_id", "status", "total", "processed", "failed", "stats")},
+                     ensure_ascii=False, default=json_default))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""추천 검색용 ETF 카테고리/지표 범위 필터 마스크"""
+
+import numpy as np
+
+from app.ai.analytics import METRIC_COLUMNS, get_metric_catalog
+from app.ai.snapshot import per_generation
+
+class CatalogFilter:
+    """스냅샷 행 순서(tickers[i])에 맞춘 카테고리 마스크와 지표 정렬 색인"""
+    def __init__(self, snapshot, catalog):
+        self.size = len(snapshot.tickers)
+        rows = np.array([catalog.index.get(ticker, -1) for ticker in snapshot.tickers], dtype=np.int64)
+        metrics = np.full((self.size, len(METRIC_COLUMNS)), np.nan)
+        matched = rows >= 0
+        metrics[matched] = catalog.metrics[rows[matched]]
+        self.order = np.argsort(metrics, axis=0, kind="stable")
+        self.sorted = np.take_along_axis(metrics, self.order, axis=0)
+        self.finite_counts = np.isfinite(metrics).sum(axis=0)
+
+        self.category_masks = {}
+        for i, category in enumerate(snapshot.categories):
+            key = (category or "Unknown").lower()
+            if key not in self.category_masks:
+                self.category_masks[key] = np.zeros(self.size, dtype=bool)
+            self.category_masks[key][i] = True
+
+    def range_mask(self, column: str, low=None, high=None) -> np.ndarray:
+        j = METRIC_COLUMNS.index(column)
+        values = self.sorted[:self.finite_counts[j], j]
+        start = np.searchsorted(values, low, side="left") if low is not None else 0
+        end = np.searchsorted(values, high, side="right") if high is not None else len(values)
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.order[start:end, j]] = True
+        return mask
+
+    def mask(self, categories=None, ranges=None):
+        """조건을 모두 만족하는 행 마스크 (조건이 없으면 None)"""
+        ranges = {column: bounds for column, bounds in (ranges or {}).items() if bounds != (None, None)}
+        if not categories and not ranges:
+            return None
+        mask = np.ones(self.size, dtype=bool)
+        if categories:
+            selected = np.zeros(self.size, dtype=bool)
+            for category in categories:
+                category_mask = self.category_masks.get(category.lower())
+                if category_mask is not None:
+                    selected |= category_mask
+            mask &= selected
+        for column, (low, high) in ranges.items():
+            mask &= self.range_mask(column, low, high)
+        return mask
+
+def get_catalog_filter(snapshot) -> CatalogFilter:
+    """스냅샷 세대 + 지표 카탈로그별 필터 색인 (둘 중 하나가 바뀌면 다시 생성)"""
+    catalog = get_metric_catalog()
+    return per_generation(snapshot, "catalog_filter", lambda snapshot: CatalogFilter(snapshot, catalog), catalog)
+    with _cache_lock:
+        generation, cached_catalog, catalog_filter = _cache
+        if generation != snapshot.generation or cached_catalog is not catalog:
+            catalog_filter = CatalogFilter(snapshot, catalog)
+            _cache = (snapshot.generation, catalog, catalog_filter)
+        return catalog_filter
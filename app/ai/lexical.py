@@ -0,0 +1,119 @@
+"""ETF 키워드 검색 (BM25 역색인) 및 벡터 점수와의 순위 융합 (RRF)"""
+import re
+
+import numpy as np
+
+from app.ai.snapshot import per_generation
+
+FIELD_WEIGHTS = (("ticker", 3.0), ("category", 2.0), ("summary", 1.0))
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+KEYWORD_MAX_TOKENS = 3  # 키워드 질의로 볼 수 있는 최대 토큰 수
+KEYWORD_MAX_DOCUMENT_RATIO = 0.02  # 모든 토큰이 이 비율 이하의 ETF에만 나오는 드문(idf 높은) 단어면 키워드 질의
+# 질의 전체가 지수 이름이면 키워드 질의 (tokenize 결과 기준)
+INDEX_NAMES = {
+    ("s&p", "500"), ("kospi",), ("kospi", "200"), ("kosdaq",), ("kosdaq", "150"), ("nasdaq",), ("nasdaq", "100"),
+    ("dow", "jones"), ("russell", "2000"), ("msci",), ("msci", "world"), ("msci", "eafe"),
+}
+QUOTED_PATTERN = re.compile(r"[\"“‘]([^\"“”‘’]+)[\"”’]")  # 곧은 작은따옴표는 축약형(don't)과 겹쳐 제외
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z가-힣&]+")
+
+def tokenize(text) -> list:
+    return [token.strip("&") for token in TOKEN_PATTERN.findall((text or "").lower()) if token.strip("&")]
+
+class LexicalIndex:
+    """BM25 역색인 (CSR: term t 의 포스팅은 docs/weights[offsets[t]:offsets[t + 1]])"""
+    def __init__(self, tickers, categories, summaries):
+        self.size = len(tickers)
+        self.tickers = {ticker.lower(): i for i, ticker in enumerate(tickers)}
+        fields = {"ticker": tickers, "category": categories, "summary": summaries}
+
+        doc_terms = [{} for _ in range(self.size)]
+        lengths = np.zeros(self.size, dtype=np.float64)
+        for name, weight in FIELD_WEIGHTS:
+            for doc, text in enumerate(fields[name]):
+                tokens = tokenize(text)
+                lengths[doc] += weight * len(tokens)
+                terms = doc_terms[doc]
+                for token in tokens:
+                    terms[token] = terms.get(token, 0.0) + weight
+
+        self.vocabulary = {}
+        postings = []
+        for doc, terms in enumerate(doc_terms):
+            for token, tf in terms.items():
+                postings.append((self.vocabulary.setdefault(token, len(self.vocabulary)), doc, tf))
+        postings.sort()
+        terms = np.array([term for term, _, _ in postings], dtype=np.int64)
+        self.docs = np.array([doc for _, doc, _ in postings], dtype=np.int64)
+        tf = np.array([value for _, _, value in postings], dtype=np.float64)
+        self.offsets = np.searchsorted(terms, np.arange(len(self.vocabulary) + 1))
+
+        # 포스팅별 idf * tf 포화 항 (질의와 무관하므로 미리 계산)
+        self.document_frequency = document_frequency = np.diff(self.offsets)
+        idf = np.log1p((self.size - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[self.docs] / average_length)
+        self.weights = idf[terms] * tf * (BM25_K1 + 1) / (tf + norm) if len(postings) else np.zeros(0)
+
+    def matched_terms(self, query: str) -> tuple:
+        """색인에 있는 질의 토큰 (정렬) - 키워드 점수는 이 집합으로만 정해짐"""
+        return tuple(sorted(token for token in set(tokenize(query)) if token in self.vocabulary))
+
+    def score(self, query: str) -> np.ndarray:
+        """질의 토큰의 포스팅을 합산한 ETF별 BM25 점수 (N,)"""
+        term_ids = [self.vocabulary[token] for token in set(tokenize(query)) if token in self.vocabulary]
+        if not term_ids:
+            return np.zeros(self.size, dtype=np.float64)
+        spans = [np.arange(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+        positions = np.concatenate(spans)
+        return np.bincount(self.docs[positions], weights=self.weights[positions], minlength=self.size)
+
+    def is_keyword_query(self, query: str) -> bool:
+        """
+        임베딩 없이 키워드 점수만 써도 되는 질의 - 그 외('high dividend income', 'long term growth' 등)는 hybrid
+        - 짧은 질의에 ticker 가 있음 ('SPY', 'QQQ vs VOO')
+        - 따옴표로 묶은 구절의 토큰이 모두 색인에 있음 ('"clean energy"')
+        - 질의 전체가 지수 이름 ('KOSPI 200', 'S&P 500')
+        - 짧은 질의의 모든 토큰이 일부 ETF에만 나오는 드문 단어
+        """
+        for phrase in QUOTED_PATTERN.findall(query or ""):
+            phrase_tokens = tokenize(phrase)
+            if phrase_tokens and all(token in self.vocabulary for token in phrase_tokens):
+                return True
+        tokens = tokenize(query)
+        if not tokens or len(tokens) > KEYWORD_MAX_TOKENS:
+            return False
+        if any(token in self.tickers for token in tokens) or tuple(tokens) in INDEX_NAMES:
+            return True
+        if not all(token in self.vocabulary for token in tokens):
+            return False
+        max_frequency = max(1, int(self.size * KEYWORD_MAX_DOCUMENT_RATIO))
+        return all(self.document_frequency[self.vocabulary[token]] <= max_frequency for token in tokens)
+
+def ranks(scores: np.ndarray, only_positive: bool = False) -> np.ndarray:
+    """점수 내림차순 순위 (1부터, 동점은 스냅샷 순서) - only_positive 면 0점 이하 ETF는 순위 없음(inf)"""
+    order = np.argsort(-scores, kind="stable")
+    rank = np.empty(len(scores), dtype=np.float64)
+    rank[order] = np.arange(1, len(scores) + 1)
+    if only_positive:
+        rank[scores <= 0] = np.inf
+    return rank
+
+def reciprocal_rank_fusion(*rank_lists, k: int = RRF_K) -> np.ndarray:
+    return sum(1.0 / (k + rank) for rank in rank_lists)
+
+def get_lexical_index(snapshot) -> LexicalIndex:
+    """스냅샷 세대별 색인 (세대가 바뀌면 다시 생성)"""
+    return per_generation(
+        snapshot, "lexical_index",
+        lambda snapshot: LexicalIndex(snapshot.tickers, snapshot.categories, snapshot.summaries),
+    )
+    with _cache_lock:
+        generation, index = _cache
+        if generation != snapshot.generation:
+            index = LexicalIndex(snapshot.tickers, snapshot.categories, snapshot.summaries)
+            _cache = (snapshot.generation, index)
+        return index
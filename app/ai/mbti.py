@@ -1,92 +1,54 @@
-from app.ai.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, client
 from app.ai.revision import fetch_revision_by_portfolio  # 기존 ai.py가 아닌 revision.py에서 임포트
 from app.ai.ai import euclid_etfs
-import pandas as pd
+from app.ai.db import fetch_all, fetch_one, parse_vector
+from app.core.cache import cached
+from app.ai.snapshot import get_snapshot
 import numpy as np
-import pymysql
 import json
 
+USER_MBTI_SQL = "SELECT mbti_vector, mbti_code FROM user WHERE user_id = %s"
+USER_MBTI_VECTOR_SQL = "SELECT mbti_vector FROM user WHERE user_id = %s"
+DEFAULT_PORTFOLIO_SQL = """
+    SELECT etf1, etf2, etf3, etf4, etf5,
+           allocation1, allocation2, allocation3, allocation4, allocation5
+    FROM mbti
+    WHERE mbti_code = %s
+"""
+
 #0.사용자 정보 가져오기 (mbti_vector와 mbti_code)
 def fetch_user_info(user_id):
     """user 테이블에서 mbti_vector와 mbti_code를 불러와 반환"""
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    query = "SELECT mbti_vector, mbti_code FROM user WHERE user_id = %s"
-    df = pd.read_sql(query, connection, params=[user_id])
-    connection.close()
-
-    if df.empty:
+    row = fetch_one(USER_MBTI_SQL, (user_id,))
+
+    if not row:
         return {"mbti_vector": np.zeros(4), "mbti_code": ""}
 
-    vector_str = df.iloc[0]["mbti_vector"]
-    mbti_vector = np.fromstring(vector_str.strip("[]"), sep=',')
-    mbti_code = df.iloc[0]["mbti_code"]
-    return {"mbti_vector": mbti_vector, "mbti_code": mbti_code}
+    return {"mbti_vector": parse_vector(row["mbti_vector"], 4), "mbti_code": row["mbti_code"]}
 
 #1. mbti_code로 최초 포트폴리오 강제
+@cached("default_portfolio", tables=("mbti",))
 def fetch_default_portfolio(mbti_code):
     """
     mbti 테이블에서 해당 성향코드의 기본 ETF 포트폴리오 구성을 가져옵니다.
-    반환값은 etf1~etf5와 allocation1~allocation5를 포함하는 Series입니다.
-    """
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    query = """
-        SELECT etf1, etf2, etf3, etf4, etf5, 
-               allocation1, allocation2, allocation3, allocation4, allocation5 
-        FROM mbti 
-        WHERE mbti_code = %s
+    반환값은 etf1~etf5와 allocation1~allocation5를 포함하는 dict입니다.
     """
-    df = pd.read_sql(query, connection, params=[mbti_code])
-    connection.close()
-
-    if df.empty:
-        return None
-    return df.iloc[0]
+    return fetch_one(DEFAULT_PORTFOLIO_SQL, (mbti_code,))
 
 
 #1. u_id로 mbti벡터 찾기
 def fetch_user_target_vector(user_id):
     """user 테이블에서 mbti_vector를 불러와 NumPy 배열로 변환"""
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    query = "SELECT mbti_vector FROM user WHERE user_id = %s"
-    target_data = pd.read_sql(query, connection, params=[user_id])
-    connection.close()
-
-    if target_data.empty:
+    row = fetch_one(USER_MBTI_VECTOR_SQL, (user_id,))
+
+    if not row:
         return np.zeros(4)
-    vector_str = target_data.iloc[0]["mbti_vector"]
-    return np.fromstring(vector_str.strip("[]"), sep=',')
+    return parse_vector(row["mbti_vector"], 4)
 
 #2. 티커와 etf_mbti 반환
 def fetch_etf_mbti():
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    query = "SELECT ticker,mbti_vector FROM etf"
-    etf_data = pd.read_sql(query, connection)
-    connection.close()
-
-    etf_data["mbti_vector"] = etf_data["mbti_vector"].apply(
-        lambda x: np.fromstring(x.strip("[]"), sep=',') if x else np.zeros(4)
-    )
-    return etf_data
+    """ETF 벡터 스냅샷에서 ticker 리스트와 (N, 4) mbti_vector 행렬 반환 (DB 조회 없음)"""
+    snapshot = get_snapshot()
+    return {"ticker": snapshot.tickers, "mbti_vector": snapshot.mbti_vectors}
 #3. 성향지향 추천
 def recommend_etfs_adjusted_for_user(user_id, etf_data, portfolio_id, alpha=0.7, top_n=4):
     """
@@ -100,7 +62,7 @@ def recommend_etfs_adjusted_for_user(user_id, etf_data, portfolio_id, alpha=0.7,
 
     매개변수:
       user_id (int): 사용자 ID.
-      etf_data (DataFrame): ETF 데이터 (ticker, mbti_vector 컬럼 포함).
+      etf_data (dict): ETF 데이터 (ticker 리스트, mbti_vector 행렬).
       portfolio_id: 포트폴리오 ID.
       alpha (float): 사용자 벡터에 부여할 가중치 (0~1, 기본값 0.7).
       top_n (int): 추천할 ETF 수 (기본값 4).
@@ -128,30 +90,30 @@ def recommend_etfs_adjusted_for_user(user_id, etf_data, portfolio_id, alpha=0.7,
 
     # 4. etfs 필드가 비어있다면, 기본 포트폴리오를 user_mbti_code를 사용해 가져옵니다.
     if not default_portfolio or default_portfolio == {}:
-        default_pf_series = fetch_default_portfolio(user_mbti_code)
-        if default_pf_series is None:
+        default_pf = fetch_default_portfolio(user_mbti_code)
+        if default_pf is None:
             print("기본 포트폴리오 정보를 가져올 수 없습니다.")
             return []
         default_portfolio = {
             "etfs": [
-                {"ticker": default_pf_series["etf1"], "allocation": default_pf_series["allocation1"]},
-                {"ticker": default_pf_series["etf2"], "allocation": default_pf_series["allocation2"]},
-                {"ticker": default_pf_series["etf3"], "allocation": default_pf_series["allocation3"]},
-                {"ticker": default_pf_series["etf4"], "allocation": default_pf_series["allocation4"]},
-                {"ticker": default_pf_series["etf5"], "allocation": default_pf_series["allocation5"]},
+                {"ticker": default_pf["etf1"], "allocation": default_pf["allocation1"]},
+                {"ticker": default_pf["etf2"], "allocation": default_pf["allocation2"]},
+                {"ticker": default_pf["etf3"], "allocation": default_pf["allocation3"]},
+                {"ticker": default_pf["etf4"], "allocation": default_pf["allocation4"]},
+                {"ticker": default_pf["etf5"], "allocation": default_pf["allocation5"]},
             ]
         }
 
     # 5. 기본 포트폴리오의 ETF 벡터로 가중평균 벡터 계산 (allocation 총합은 100)
     total_alloc = 0
     weighted_sum = np.zeros_like(user_vector)
+    ticker_index = {ticker: i for i, ticker in enumerate(etf_data["ticker"])}
     for etf in default_portfolio["etfs"]:
         ticker = etf["ticker"]
         allocation = etf["allocation"]
         total_alloc += allocation
-        etf_row = etf_data[etf_data["ticker"] == ticker]
-        if not etf_row.empty:
-            etf_vector = etf_row.iloc[0]["mbti_vector"]
+        if ticker in ticker_index:
+            etf_vector = etf_data["mbti_vector"][ticker_index[ticker]]
         else:
             etf_vector = np.zeros_like(user_vector)
         weighted_sum += allocation * etf_vector
@@ -162,10 +124,129 @@ def recommend_etfs_adjusted_for_user(user_id, etf_data, portfolio_id, alpha=0.7,
 
     # 7. 유클리드 거리를 계산해 추천 ETF 도출 (euclid_etfs 함수 사용)
     # euclid_etfs 함수는 target_vector와 etf_data, top_n (예: 4)를 인자로 받습니다.
-    recommendations_df = euclid_etfs(adjusted_vector, etf_data, top_n)
+    recommendations = euclid_etfs(adjusted_vector, etf_data, top_n)
+
+    return recommendations["ticker"]
+
+#4. 여러 사용자 일괄 성향지향 추천 (온보딩 캠페인)
+BATCH_QUERY_CHUNK = 1_000   # IN (...) 한 번에 담는 id 수
+BATCH_USER_CHUNK = 256      # 거리 계산 한 번에 처리하는 사용자 수 (사용자 x ETF x 4 행렬 메모리 상한)
+
+# IN (...) 자리표시자는 청크 크기만큼 채움 - in_placeholders(len(chunk))
+USERS_INFO_SQL = "SELECT user_id, mbti_vector, mbti_code FROM user WHERE user_id IN ({})"
+LATEST_REVISION_ETFS_SQL = (
+    "SELECT r.portfolio_id, r.etfs FROM revision r "
+    "JOIN (SELECT portfolio_id, MAX(revision_id) AS revision_id FROM revision "
+    "WHERE portfolio_id IN ({}) GROUP BY portfolio_id) latest "
+    "ON latest.revision_id = r.revision_id"
+)
+DEFAULT_PORTFOLIOS_SQL = (
+    "SELECT mbti_code, etf1, etf2, etf3, etf4, etf5, allocation1, allocation2, allocation3, allocation4, "
+    "allocation5 FROM mbti WHERE mbti_code IN ({})"
+)
+
+def in_placeholders(count: int) -> str:
+    return ", ".join(["%s"] * count)
+
+def _chunks(values, size=BATCH_QUERY_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def fetch_users_info(user_ids) -> dict:
+    """user_id -> {"mbti_vector", "mbti_code"} (IN 조회, 없는 사용자는 빠짐)"""
+    users = {}
+    for chunk in _chunks(set(user_ids)):
+        rows = fetch_all(USERS_INFO_SQL.format(in_placeholders(len(chunk))), chunk)
+        for row in rows:
+            users[row["user_id"]] = {"mbti_vector": parse_vector(row["mbti_vector"], 4), "mbti_code": row["mbti_code"]}
+    return users
+
+def fetch_latest_revision_etfs(portfolio_ids) -> dict:
+    """portfolio_id -> 최신 revision 의 etfs (포트폴리오별 MAX(revision_id) 조인)"""
+    revisions = {}
+    for chunk in _chunks(set(portfolio_ids)):
+        rows = fetch_all(LATEST_REVISION_ETFS_SQL.format(in_placeholders(len(chunk))), chunk)
+        for row in rows:
+            revisions[row["portfolio_id"]] = row["etfs"]
+    return revisions
+
+def fetch_default_portfolios(mbti_codes) -> dict:
+    """mbti_code -> [(ticker, allocation), ...] (IN 조회)"""
+    portfolios = {}
+    for chunk in _chunks({code for code in mbti_codes if code}):
+        rows = fetch_all(DEFAULT_PORTFOLIOS_SQL.format(in_placeholders(len(chunk))), chunk)
+        for row in rows:
+            portfolios[row["mbti_code"]] = [(row[f"etf{i}"], row[f"allocation{i}"]) for i in range(1, 6)]
+    return portfolios
+
+def recommend_etfs_adjusted_for_users(targets, alpha=0.7, top_n=4, etf_data=None):
+    """
+    recommend_etfs_adjusted_for_user 의 일괄 버전 - targets: [(user_id, portfolio_id), ...], 결과는 같은 순서의 티커 리스트
+    1. 사용자/최신 revision/기본 포트폴리오를 각각 IN 조회 한 번(청크 단위)으로 로드
+    2. 포트폴리오 가중평균 벡터를 (사용자 x ETF) 희소 가중치로 한 번에 계산 (allocation 합 기준, 스냅샷에 없는 ETF는 0 벡터)
+    3. adjusted 행렬 (사용자 x 4) 과 ETF mbti_vector 행렬의 유클리드 거리를 사용자 청크 단위로 계산해 사용자별 상위 top_n
+    기본 포트폴리오도 없는 사용자는 빈 리스트
+    """
+    from app.ai.analytics import parse_allocations
+
+    etf_data = etf_data or fetch_etf_mbti()
+    etf_vectors = np.asarray(etf_data["mbti_vector"], dtype=np.float64)
+    ticker_index = {ticker: i for i, ticker in enumerate(etf_data["ticker"])}
+
+    users = fetch_users_info(user_id for user_id, _ in targets)
+    revisions = fetch_latest_revision_etfs(portfolio_id for _, portfolio_id in targets)
+    missing_user = {"mbti_vector": np.zeros(4), "mbti_code": ""}
+
+    # revision 의 etfs 가 비어 있거나 배분을 읽을 수 없으면 mbti_code 기본 포트폴리오 사용
+    allocations = [parse_allocations(revisions.get(portfolio_id) or {}) for _, portfolio_id in targets]
+    needs_default = {users.get(user_id, missing_user)["mbti_code"]
+                     for (user_id, _), allocation in zip(targets, allocations) if not allocation}
+    defaults = fetch_default_portfolios(needs_default) if needs_default else {}
+
+    rows, cols, weights = [], [], []
+    user_vectors = np.zeros((len(targets), 4))
+    valid = np.ones(len(targets), dtype=bool)
+    for t, ((user_id, _), allocation) in enumerate(zip(targets, allocations)):
+        user = users.get(user_id, missing_user)
+        user_vectors[t] = user["mbti_vector"]
+        if not allocation:
+            allocation = [(ticker, float(value or 0)) for ticker, value in defaults.get(user["mbti_code"], [])]
+            if not allocation:
+                valid[t] = False
+                continue
+        total = sum(value for _, value in allocation)
+        if total == 0:
+            continue
+        for ticker, value in allocation:
+            if ticker in ticker_index:
+                rows.append(t)
+                cols.append(ticker_index[ticker])
+                weights.append(value / total)
 
-    return recommendations_df["ticker"].tolist()
+    portfolio_vectors = np.zeros((len(targets), 4))
+    if rows:
+        np.add.at(portfolio_vectors, np.array(rows), np.array(weights)[:, None] * etf_vectors[np.array(cols)])
+    adjusted = alpha * user_vectors + (1 - alpha) * portfolio_vectors
 
+    results = [[] for _ in targets]
+    top_n = min(top_n, len(etf_vectors))
+    if top_n == 0:
+        return results
+    for start in range(0, len(targets), BATCH_USER_CHUNK):
+        block = adjusted[start:start + BATCH_USER_CHUNK]
+        distances = np.linalg.norm(etf_vectors[None, :, :] - block[:, None, :], axis=2)
+        # 사용자별 상위 top_n 만 부분 정렬 (거리, 스냅샷 순서) - 경계에 동점이 있는 행만 euclid_etfs 와 같은 전체 안정 정렬
+        top = np.argpartition(distances, top_n - 1, axis=1)[:, :top_n]
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        top = np.take_along_axis(top, np.lexsort((top, top_distances)), axis=1)
+        tied = np.count_nonzero(distances <= top_distances.max(axis=1, keepdims=True), axis=1) > top_n
+        if tied.any():
+            top[tied] = np.argsort(distances[tied], axis=1, kind="stable")[:, :top_n]
+        for offset, indices in enumerate(top):
+            if valid[start + offset]:
+                results[start + offset] = [etf_data["ticker"][i] for i in indices]
+    return results
 
 if __name__ == "__main__":
     user_id = input("사용자 ID를 입력하세요: ")
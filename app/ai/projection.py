@@ -0,0 +1,237 @@
+"""목표 달성 몬테카를로 시뮬레이션 (일괄: python -m app.ai.projection --out projection.jsonl)"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.ai.analytics import METRIC_COLUMNS, allocation_matrix, get_metric_catalog, parse_allocations
+from app.ai.db import fetch_all, fetch_one
+
+DEFAULT_RETURN = 0.06
+MARKET_VOLATILITY = 0.16
+IDIOSYNCRATIC_VOLATILITY = 0.10
+DEFAULT_PATHS = 20_000
+PATH_CHUNK = 5_000
+PORTFOLIO_CHUNK = 64
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def portfolio_factors(portfolios, catalog=None):
+    """배분 리스트들 -> 포트폴리오별 (기대수익률, 베타, 개별 변동성), 매칭 안 된 ticker 목록"""
+    catalog = catalog or get_metric_catalog()
+    count = len(portfolios)
+    rows, cols, weights, unmatched = allocation_matrix(portfolios, catalog)
+
+    metrics = catalog.metrics[cols]
+    five_year = metrics[:, METRIC_COLUMNS.index("five_year_average_return")]
+    three_year = metrics[:, METRIC_COLUMNS.index("three_year_average_return")]
+    beta = metrics[:, METRIC_COLUMNS.index("beta_3year")]
+    mu = np.where(np.isfinite(five_year), five_year, np.where(np.isfinite(three_year), three_year, DEFAULT_RETURN))
+    beta = np.where(np.isfinite(beta), beta, 1.0)
+
+    invested = np.bincount(rows, weights=weights, minlength=count)
+    portfolio_mu = np.bincount(rows, weights=weights * mu, minlength=count)
+    portfolio_beta = np.bincount(rows, weights=weights * beta, minlength=count)
+    portfolio_idio = np.sqrt(np.bincount(rows, weights=(weights * IDIOSYNCRATIC_VOLATILITY) ** 2, minlength=count))
+
+    # 매칭된 ETF가 없는 포트폴리오는 기본 기대수익률/시장 베타로 가정
+    empty = invested == 0
+    portfolio_mu[empty], portfolio_beta[empty], portfolio_idio[empty] = DEFAULT_RETURN, 1.0, IDIOSYNCRATIC_VOLATILITY
+
+    unmatched_by_portfolio = [[] for _ in range(count)]
+    for p, ticker in unmatched:
+        unmatched_by_portfolio[p].append(ticker)
+    return portfolio_mu, portfolio_beta, portfolio_idio, unmatched_by_portfolio
+
+def simulate_paths(mu, beta, idio, initial, contribution, months, paths: int, rng, checkpoints=()):
+    """
+    (P,) 파라미터 배열 -> 만기 평가금액 (P x paths), 체크포인트 월별 평가금액 {month: (P x paths)}
+    포트폴리오별 기간(months)이 지나면 값 고정
+    """
+    variance = beta ** 2 * MARKET_VOLATILITY ** 2 + idio ** 2
+    drift = ((mu - 0.5 * variance) / 12)[:, None]
+    market_scale = (beta * MARKET_VOLATILITY / np.sqrt(12))[:, None]
+    idio_scale = (idio / np.sqrt(12))[:, None]
+    contribution = contribution[:, None]
+
+    value = np.repeat(initial[:, None].astype(np.float64), paths, axis=1)
+    snapshots = {}
+    for t in range(int(months.max(initial=0))):
+        market = rng.standard_normal(paths)
+        shock = rng.standard_normal(value.shape)
+        growth = np.exp(drift + market_scale * market + idio_scale * shock)
+        active = (t < months)[:, None]
+        value = np.where(active, (value + contribution) * growth, value)
+        if t + 1 in checkpoints:
+            snapshots[t + 1] = value.copy()
+    return value, snapshots
+
+def summarize_terminal(terminal: np.ndarray, goal) -> dict:
+    """(P x paths) 만기 평가금액 -> 포트폴리오별 백분위, 평균, 목표 달성 확률"""
+    percentiles = np.percentile(terminal, PERCENTILES, axis=1)
+    probability = np.full(terminal.shape[0], np.nan)
+    has_goal = np.isfinite(goal)
+    if has_goal.any():
+        probability[has_goal] = (terminal[has_goal] >= goal[has_goal, None]).mean(axis=1)
+    return {
+        "mean": terminal.mean(axis=1),
+        "probability": probability,
+        **{f"p{q}": percentiles[i] for i, q in enumerate(PERCENTILES)},
+    }
+
+# --- 청크 실행 (일괄 실행에서는 프로세스 풀 워커에서 실행) ---
+
+def run_path_chunk(task):
+    """단일 요청용: 같은 포트폴리오의 경로 일부 -> (만기 값, 체크포인트 값)"""
+    params, paths, seed, checkpoints = task
+    return simulate_paths(*params, paths, np.random.default_rng(seed), checkpoints)
+
+def run_portfolio_chunk(task):
+    """일괄용: 포트폴리오 청크의 모든 경로를 PATH_CHUNK 단위로 생성하고 요약 통계만 반환"""
+    params, goal, paths, seed = task
+    seeds = seed.spawn(-(-paths // PATH_CHUNK))
+    terminal = np.concatenate([
+        simulate_paths(*params, min(PATH_CHUNK, paths - i * PATH_CHUNK), np.random.default_rng(chunk_seed))[0]
+        for i, chunk_seed in enumerate(seeds)
+    ], axis=1)
+    return summarize_terminal(terminal, goal)
+
+# --- 단건 / 일괄 ---
+
+# revision (portfolio_id, revision_id) 인덱스 역순 탐색 1행 + 기본키 조인
+PORTFOLIO_PROJECTION_SQL = """
+    SELECT r.revision_id, r.etfs, u.investment_amount, u.investment_period, u.investment_goal
+    FROM revision r
+    JOIN portfolio p ON p.portfolio_id = r.portfolio_id
+    JOIN context c ON c.context_id = p.context_id
+    JOIN user u ON u.user_id = c.user_id
+    WHERE r.portfolio_id = %s
+    ORDER BY r.revision_id DESC
+    LIMIT 1
+"""
+
+ALL_PORTFOLIOS_PROJECTION_SQL = """
+    SELECT r.portfolio_id, r.revision_id, r.etfs, u.investment_amount, u.investment_period, u.investment_goal
+    FROM revision r
+    JOIN (SELECT portfolio_id, MAX(revision_id) AS revision_id FROM revision GROUP BY portfolio_id) latest
+      ON latest.revision_id = r.revision_id
+    JOIN portfolio p ON p.portfolio_id = r.portfolio_id
+    JOIN context c ON c.context_id = p.context_id
+    JOIN user u ON u.user_id = c.user_id
+"""
+
+# 쉼표/공백/통화 표기를 지운 뒤 문자열 전체가 "[N억][N만][N]" 형태일 때만 금액으로 인정
+GOAL_IGNORED = re.compile(r"[,\s]|krw|원|₩|\$", re.IGNORECASE)
+GOAL_AMOUNT = re.compile(r"(?:(\d+(?:\.\d+)?)억)?(?:(\d+(?:\.\d+)?)만)?(\d+(?:\.\d+)?)?")
+
+def parse_goal(goal) -> float:
+    """
+    investment_goal 문자열을 금액으로 변환 (예: "100000000", "1억", "1억 5000만원", "₩50,000,000")
+    숫자가 아닌 내용이 섞인 목표("은퇴 자금 마련", "3년 안에 2배")는 NaN - 응답에서 goal: null
+    """
+    match = GOAL_AMOUNT.fullmatch(GOAL_IGNORED.sub("", str(goal or "")))
+    if match is None or not any(match.groups()):
+        return float("nan")
+    hundred_millions, ten_thousands, units = (float(value or 0) for value in match.groups())
+    return hundred_millions * 100_000_000 + ten_thousands * 10_000 + units
+
+def project_portfolio(portfolio_id: int, paths: int = DEFAULT_PATHS, monthly_contribution: float = 0.0,
+                      seed: int = None):
+    """
+    portfolio 최신 revision을 사용자의 투자 금액/기간/목표로 시뮬레이션 - revision이 없으면 None
+    API 요청 처리 프로세스에서 경로 청크를 차례로 실행 (프로세스 풀은 일괄 실행에서만 사용)
+    """
+    row = fetch_one(PORTFOLIO_PROJECTION_SQL, (portfolio_id,))
+    if row is None:
+        return None
+
+    months = int(row["investment_period"] or 12)
+    initial = float(row["investment_amount"] or 0)
+    goal = parse_goal(row["investment_goal"])
+    mu, beta, idio, unmatched = portfolio_factors([parse_allocations(row["etfs"])])
+    params = (mu, beta, idio, np.array([initial]), np.array([float(monthly_contribution)]), np.array([months]))
+
+    checkpoints = tuple(range(12, months, 12)) + (months,)
+    seeds = np.random.SeedSequence(seed).spawn(-(-paths // PATH_CHUNK))
+    tasks = [(params, min(PATH_CHUNK, paths - i * PATH_CHUNK), chunk_seed, checkpoints)
+             for i, chunk_seed in enumerate(seeds)]
+    outputs = [run_path_chunk(task) for task in tasks]
+
+    terminal = np.concatenate([output[0] for output in outputs], axis=1)
+    summary = summarize_terminal(terminal, np.array([goal]))
+    probability = summary["probability"][0]
+    timeline = []
+    for month in checkpoints:
+        values = np.concatenate([output[1][month] for output in outputs], axis=1)[0]
+        p5, p50, p95 = np.percentile(values, (5, 50, 95))
+        timeline.append({"month": month, "p5": round(float(p5), 2), "p50": round(float(p50), 2),
+                         "p95": round(float(p95), 2)})
+
+    return {
+        "portfolio_id": portfolio_id,
+        "revision_id": row["revision_id"],
+        "paths": paths,
+        "months": months,
+        "initial_amount": initial,
+        "monthly_contribution": float(monthly_contribution),
+        "goal": None if np.isnan(goal) else goal,
+        "probability_of_goal": None if np.isnan(probability) else round(float(probability), 4),
+        "expected_value": round(float(summary["mean"][0]), 2),
+        "percentiles": {f"p{q}": round(float(summary[f"p{q}"][0]), 2) for q in PERCENTILES},
+        "timeline": timeline,
+        "assumptions": {
+            "expected_return": round(float(mu[0]), 6),
+            "beta": round(float(beta[0]), 6),
+            "volatility": round(float(np.sqrt(beta[0] ** 2 * MARKET_VOLATILITY ** 2 + idio[0] ** 2)), 6),
+        },
+        "unmatched_tickers": unmatched[0],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 포트폴리오(최신 revision) 목표 달성 시뮬레이션 (JSON Lines 출력)")
+    parser.add_argument("--out", required=True, help="출력 파일 (.jsonl)")
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = fetch_all(ALL_PORTFOLIOS_PROJECTION_SQL)
+    mu, beta, idio, unmatched = portfolio_factors([parse_allocations(row["etfs"]) for row in rows])
+    initial = np.array([float(row["investment_amount"] or 0) for row in rows])
+    months = np.array([int(row["investment_period"] or 12) for row in rows])
+    goal = np.array([parse_goal(row["investment_goal"]) for row in rows])
+    contribution = np.zeros(len(rows))
+
+    seeds = np.random.SeedSequence(args.seed).spawn(-(-len(rows) // PORTFOLIO_CHUNK))
+    tasks = []
+    for i, chunk_seed in enumerate(seeds):
+        part = slice(i * PORTFOLIO_CHUNK, (i + 1) * PORTFOLIO_CHUNK)
+        params = (mu[part], beta[part], idio[part], initial[part], contribution[part], months[part])
+        tasks.append((params, goal[part], args.paths, chunk_seed))
+
+    if args.workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            outputs = list(executor.map(run_portfolio_chunk, tasks))
+    else:
+        outputs = [run_portfolio_chunk(task) for task in tasks]
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        for i, row in enumerate(rows):
+            output = outputs[i // PORTFOLIO_CHUNK]
+            j = i % PORTFOLIO_CHUNK
+            probability = output["probability"][j]
+            f.write(json.dumps({
+                "portfolio_id": row["portfolio_id"], "revision_id": row["revision_id"],
+                "probability_of_goal": None if np.isnan(probability) else round(float(probability), 4),
+                "expected_value": round(float(output["mean"][j]), 2),
+                **{f"p{q}": round(float(output[f"p{q}"][j]), 2) for q in PERCENTILES},
+                "unmatched_tickers": unmatched[i],
+            }, ensure_ascii=False) + "\n")
+    print(f"시뮬레이션 완료: {len(rows):,} portfolios x {args.paths:,} paths, {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
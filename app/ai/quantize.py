@@ -0,0 +1,106 @@
+"""ETF text_vector 근사 검색 (차원 축소 + int8 양자화) 후 상위 후보만 정확 재정렬"""
+
+import numpy as np
+
+from app.ai.snapshot import per_generation
+from app.core.config import settings
+
+PCA_SAMPLE = 5_000
+SCORE_CHUNK = 8_192
+RERANK_FACTOR = 10
+
+def normalize_rows(matrix) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms != 0)
+
+def pca_components(vectors, dims: int, sample: int = PCA_SAMPLE, seed: int = 0) -> np.ndarray:
+    """(원래 차원 x dims) 사영 행렬 - 표본 행의 X^T X 고유값 상위 dims 개 고유벡터"""
+    rows = np.arange(len(vectors))
+    if len(rows) > sample:
+        rows = np.sort(np.random.default_rng(seed).choice(rows, sample, replace=False))
+    x = normalize_rows(vectors[rows]).astype(np.float64)
+    eigenvalues, eigenvectors = np.linalg.eigh(x.T @ x)
+    return np.ascontiguousarray(eigenvectors[:, ::-1][:, :dims], dtype=np.float32)
+
+class ApproximateVectorIndex:
+    """축소/양자화한 카탈로그 행렬 (행 i는 원래 행렬의 행 i)"""
+    def __init__(self, vectors, dims: int = 0, method: str = "matryoshka", int8: bool = False):
+        self.vectors = vectors
+        self.full_dims = vectors.shape[1]
+        self.dims = dims if 0 < dims < self.full_dims else self.full_dims
+        self.method = method if self.dims < self.full_dims else "none"
+        self.components = pca_components(vectors, self.dims) if self.method == "pca" else None
+
+        reduced = np.empty((len(vectors), self.dims), dtype=np.float32)
+        for start in range(0, len(vectors), SCORE_CHUNK):
+            reduced[start:start + SCORE_CHUNK] = self.reduce(vectors[start:start + SCORE_CHUNK])
+        if int8:
+            scale = np.abs(reduced).max(axis=0) / 127
+            self.scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+            self.codes = np.round(reduced / self.scale).astype(np.int8)
+        else:
+            self.scale = None
+            self.codes = reduced
+        self.full_norms = np.linalg.norm(vectors, axis=1)
+
+    def reduce(self, vectors) -> np.ndarray:
+        """원래 벡터(들) -> 축소 후 정규화한 벡터"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.method == "pca":
+            vectors = vectors @ self.components
+        elif self.method == "matryoshka":
+            vectors = vectors[..., :self.dims]
+        return normalize_rows(vectors)
+
+    @property
+    def nbytes(self) -> int:
+        extra = (self.components.nbytes if self.components is not None else 0) + \
+                (self.scale.nbytes if self.scale is not None else 0)
+        return self.codes.nbytes + extra
+
+    def approximate_scores(self, query) -> np.ndarray:
+        """전체 ETF의 근사 코사인 (N,)"""
+        q = self.reduce(query)
+        if self.scale is None:
+            return self.codes @ q
+        q = q * self.scale
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_CHUNK):
+            scores[start:start + SCORE_CHUNK] = self.codes[start:start + SCORE_CHUNK].astype(np.float32) @ q
+        return scores
+
+    def scores(self, query, top_k: int, rerank: int = None, mask=None) -> np.ndarray:
+        """근사 점수 상위 후보만 원래 벡터로 정확히 재계산한 코사인 (후보 밖은 -inf), mask 밖 ETF는 후보에서 제외"""
+        query = np.asarray(query, dtype=np.float32)
+        approximate = self.approximate_scores(query)
+        if mask is not None:
+            approximate = np.where(mask, approximate, -np.inf)
+        count = min(len(approximate), max(rerank or settings.vector_search_rerank, top_k * RERANK_FACTOR))
+        candidates = np.argpartition(-approximate, count - 1)[:count] if count < len(approximate) \
+            else np.arange(len(approximate))
+        candidates = candidates[np.isfinite(approximate[candidates])]
+
+        norms = self.full_norms[candidates] * np.linalg.norm(query)
+        dots = np.asarray(self.vectors[candidates], dtype=np.float32) @ query
+        scores = np.full(len(approximate), -np.inf, dtype=np.float32)
+        scores[candidates] = np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
+        return scores
+
+def approximate_search_enabled() -> bool:
+    return settings.vector_search_dims > 0 or settings.vector_search_int8
+
+def get_approximate_index(snapshot) -> ApproximateVectorIndex:
+    """스냅샷 세대별 근사 색인 (세대가 바뀌면 다시 생성)"""
+    return per_generation(snapshot, "approximate_index", lambda snapshot: ApproximateVectorIndex(
+        snapshot.text_vectors, settings.vector_search_dims, settings.vector_search_method, settings.vector_search_int8,
+    ))
+    with _cache_lock:
+        generation, index = _cache
+        if generation != snapshot.generation:
+            index = ApproximateVectorIndex(
+                snapshot.text_vectors, settings.vector_search_dims, settings.vector_search_method,
+                settings.vector_search_int8,
+            )
+            _cache = (snapshot.generation, index)
+        return index
@@ -0,0 +1,101 @@
+"""AI 백엔드 장애 대응 - 호출 기한, 서킷 브레이커, degraded 표시"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core.config import settings
+
+class AIUnavailableError(Exception):
+    """AI 백엔드를 기한 안에 사용할 수 없음 (브레이커 열림, 기한 초과, 재시도 소진)"""
+
+_deadline = ContextVar("openai_deadline", default=None)
+_degraded = ContextVar("ai_degraded", default=None)
+
+@contextmanager
+def openai_deadline(seconds: float):
+    """블록 안의 OpenAI 호출이 지금부터 seconds 안에 끝나도록 제한 (중첩되면 더 이른 기한 적용)"""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def current_deadline():
+    return _deadline.get()
+
+@contextmanager
+def track_degradation():
+    """블록 안에서 대체 결과가 쓰였으면 사유 목록이 채워짐 (바깥 블록에도 전달)"""
+    outer = _degraded.get()
+    reasons = []
+    token = _degraded.set(reasons)
+    try:
+        yield reasons
+    finally:
+        _degraded.reset(token)
+        if outer is not None:
+            outer.extend(reasons)
+
+def mark_degraded(reason: str):
+    print("AI 대체 결과 사용:", reason)
+    reasons = _degraded.get()
+    if reasons is not None:
+        reasons.append(reason)
+
+class CircuitBreaker:
+    """closed -> (연속 실패) open -> (쿨다운) half_open -> 시험 호출 결과에 따라 closed / open"""
+    def __init__(self, failures: int = None, cooldown: float = None):
+        self.threshold = failures or settings.openai_breaker_failures
+        self.cooldown = cooldown or settings.openai_breaker_cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.opened_count = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "closed" or (self.state == "half_open" and not self.probing):
+                self.probing = self.state == "half_open"
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.threshold:
+                if self.state != "open":
+                    self.opened_count += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def abandon(self):
+        """허용받은 호출이 공급자까지 가지 못함 (큐 기한 초과 등) - 상태 변화 없이 시험 호출 자리만 반납"""
+        with self.lock:
+            self.probing = False
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            remaining = self.cooldown - (time.monotonic() - self.opened_at) if self.state == "open" else 0.0
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened_count": self.opened_count,
+                "rejected": self.rejected,
+                "retry_in_seconds": round(max(0.0, remaining), 2),
+            }
@@ -1,10 +1,29 @@
 import json
-import datetime
-import decimal
 import numpy as np
-import pandas as pd
 import pymysql
-from app.ai.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, client
+from app.ai.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME
+from app.ai.db import fetch_one
+from app.ai.resilience import AIUnavailableError, mark_degraded, track_degradation
+from app.ai.scheduler import chat_completion
+from app.core.response import json_default
+
+# (portfolio_id, revision_id) 인덱스 역순 탐색 1행
+LATEST_REVISION_SQL = """
+    SELECT etfs, market_indicators, user_indicators, ai_feedback
+    FROM revision
+    WHERE portfolio_id = %s
+    ORDER BY revision_id DESC
+    LIMIT 1
+"""
+LATEST_REVISION_ID_SQL = "SELECT revision_id FROM revision WHERE portfolio_id = %s ORDER BY revision_id DESC LIMIT 1"
+# etfs 컬럼은 덮어쓰지 않음
+UPDATE_REVISION_FEEDBACK_SQL = """
+    UPDATE revision
+    SET market_indicators = %s,
+        user_indicators = %s,
+        ai_feedback = %s
+    WHERE portfolio_id = %s AND revision_id = %s
+"""
 
 # revision 데이터를 조회하는 함수
 def fetch_revision_by_portfolio(portfolio_id):
@@ -12,25 +31,10 @@ def fetch_revision_by_portfolio(portfolio_id):
     MySQL에서 특정 portfolio_id에 해당하는 revision 데이터를 조회.
     (포트폴리오와 revision은 1:1 대응 관계)
     """
-    connection = pymysql.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
-    query = """
-        SELECT etfs, market_indicators, user_indicators, ai_feedback
-        FROM revision
-        WHERE portfolio_id = %s
-        ORDER BY revision_id DESC
-        LIMIT 1
-    """
-    revision_data = pd.read_sql(query, connection, params=[portfolio_id])
-    connection.close()
+    row = fetch_one(LATEST_REVISION_SQL, (portfolio_id,))
 
-    if revision_data.empty:
+    if not row:
         return {}
-    row = revision_data.iloc[0]
     return {
         "etfs": row["etfs"],
         "market_indicators": row["market_indicators"],
@@ -69,17 +73,6 @@ def normalize_allocation(allocation_list):
     return [{"ticker": item["ticker"], "allocation": round(item["allocation"] / total * 100, 2)}
             for item in allocation_list]
 
-# JSON 직렬화 헬퍼 함수
-def json_serial(obj):
-    """JSON 직렬화가 불가능한 타입을 변환하는 함수"""
-    if isinstance(obj, (datetime.date, datetime.datetime)):
-        return obj.isoformat()
-    if isinstance(obj, decimal.Decimal):
-        return float(obj)
-    if isinstance(obj, (np.float32, np.float64, np.float16, np.int32, np.int64)):
-        return float(obj)
-    raise TypeError("Type not serializable")
-
 # AI를 호출하여 ETF 리스트의 할당비율을 생성하는 함수
 import ast
 
@@ -105,13 +98,22 @@ def get_allocation_for_etfs(etfs):
     ]
     Do not include any explanations or additional text.
     """
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "You are a financial portfolio optimizer."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+    try:
+        response = chat_completion(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": "You are a financial portfolio optimizer."},
+                {"role": "user", "content": prompt}
+            ]
+        )
+    except AIUnavailableError as e:
+        # AI 백엔드 장애 시 주어진 비중(없으면 동일 비중)을 100%로 정규화해 대체
+        mark_degraded(f"get_allocation_for_etfs: {e}")
+        return normalize_allocation([
+            {"ticker": etf["ticker"] if isinstance(etf, dict) else str(etf),
+             "allocation": float(etf.get("allocation") or 1) if isinstance(etf, dict) else 1.0}
+            for etf in etfs
+        ])
     content = response.choices[0].message.content.strip()
 
     # 코드 블록 제거 처리
@@ -217,10 +219,7 @@ def update_revision_data(portfolio_id, merged_allocations, market_indicators, us
         cursor = connection.cursor()
 
         # 최신 revision_id 조회
-        cursor.execute(
-            "SELECT revision_id FROM revision WHERE portfolio_id = %s ORDER BY revision_id DESC LIMIT 1",
-            (portfolio_id,)
-        )
+        cursor.execute(LATEST_REVISION_ID_SQL, (portfolio_id,))
         result = cursor.fetchone()
 
         if result:
@@ -234,20 +233,12 @@ def update_revision_data(portfolio_id, merged_allocations, market_indicators, us
             else:
                 # ai_feedback이 문자열인 경우
                 ai_feedback_obj = {"feedback": str(ai_feedback), "ai_etfs": merged_allocations}
-            ai_feedback_json = json.dumps(ai_feedback_obj, ensure_ascii=False, default=json_serial)
-            market_indicators_json = json.dumps(market_indicators, ensure_ascii=False, default=json_serial)
-            user_indicators_json = json.dumps(user_indicators, ensure_ascii=False, default=json_serial)
-
-            # etfs 컬럼은 업데이트하지 않도록 쿼리 수정
-            query = """
-                UPDATE revision
-                SET market_indicators = %s,
-                    user_indicators = %s,
-                    ai_feedback = %s
-                WHERE portfolio_id = %s AND revision_id = %s
-            """
+            ai_feedback_json = json.dumps(ai_feedback_obj, ensure_ascii=False, default=json_default)
+            market_indicators_json = json.dumps(market_indicators, ensure_ascii=False, default=json_default)
+            user_indicators_json = json.dumps(user_indicators, ensure_ascii=False, default=json_default)
+
             print('R데이터 쿼리 실행.')
-            cursor.execute(query, (
+            cursor.execute(UPDATE_REVISION_FEEDBACK_SQL, (
                 market_indicators_json,
                 user_indicators_json,
                 ai_feedback_json,
@@ -264,60 +255,83 @@ def update_revision_data(portfolio_id, merged_allocations, market_indicators, us
         print("Error updating revision data:", e)
 
 
-# revision 데이터를 기반으로 AI 피드백을 생성하고 DB를 업데이트하는 함수
-def generate_feedback(portfolio_id, user_id, market_data=None):
-    if market_data is None:
-        market_data = {"market_condition": "default"}
-    from app.ai.ai import fetch_user_info, fetch_etf_data, fetch_mbti_recommendation, ai_recommend_etfs, euclid_etfs
-
-    # 사용자 정보 및 revision 데이터 조회
-    user_info = fetch_user_info(user_id)
-    if not user_info:
-        return "사용자 정보를 찾을 수 없습니다.", []
-    revision_data = fetch_revision_by_portfolio(portfolio_id)
-    if not revision_data:
-        return "포트폴리오 데이터가 없습니다.", []
-    etf_data = fetch_etf_data()
-
-    portfolio_pc_vector = get_portfolio_pc_vector(revision_data)
-    target_vector = np.array(user_info.get("mbti_vector"))
-    preference_etfs = euclid_etfs(target_vector, etf_data)
-    market_conditions = market_data.dict()
-    print("사용할 시장 지표:", market_conditions)
-    mbti_recommendation = fetch_mbti_recommendation(user_info.get("mbti_code"))
-
-    ai_etf_recommendation = ai_recommend_etfs(user_info, etf_data, market_conditions, mbti_recommendation)
-    if not ai_etf_recommendation:
-        return json.dumps({"error": "AI 추천 ETF를 생성할 수 없습니다."}, ensure_ascii=False)
-
-    current_etfs = revision_data.get("etfs", {})
-    if isinstance(current_etfs, dict):
-        current_etfs = current_etfs.get("etfs", [])
-
-    rebalanced_allocation = get_allocation_with_revision_rebalance(
-        recommended_etfs=ai_etf_recommendation,
-        revision_etfs=revision_data.get("etfs", {})
+# AI 백엔드 장애 시 사용하는 정형 피드백
+def fallback_feedback_text(allocations, preference_tickers, market_conditions):
+    """추천 비중, 성향 기반 ETF, 시장 지표만으로 만드는 결정적 피드백 (AI 분석 없음)"""
+    holdings = ", ".join(f"{item['ticker']} {item['allocation']}%" for item in allocations) or "없음"
+    market = ", ".join(
+        f"{label} {market_conditions[key]}" for key, label in
+        (("interest_rate", "금리"), ("inflation_rate", "물가상승률"), ("exchange_rate", "환율"))
+        if market_conditions.get(key) is not None
+    ) or "정보 없음"
+    return (
+        "현재 AI 분석을 사용할 수 없어 기본 분석 결과를 제공합니다.\n"
+        f"1. 추천 비중: {holdings}\n"
+        f"2. 투자 성향과 가까운 ETF: {', '.join(preference_tickers[:5]) or '없음'}\n"
+        f"3. 반영한 시장 지표: {market}\n"
+        "4. 조언: 잠시 후 다시 피드백을 요청하시면 AI 분석 결과를 받아보실 수 있습니다."
     )
 
-    function_payload = {
-        "portfolio_pc_vector": portfolio_pc_vector.tolist(),
-        "target_pc_vector": target_vector.tolist(),
-        "preference_etfs": preference_etfs[["ticker"]].to_dict(orient="list"),
-        "ai_recommendation_etfs": rebalanced_allocation,
-        "mbti_recommendation_etfs": mbti_recommendation,
-        "current_etfs": current_etfs,
-        "user_info": {
-            "name": user_info.get("name"),
-            "age": user_info.get("age"),
-            "investment_period": user_info.get("investment_period"),
-            "investment_amount": user_info.get("investment_amount"),
-            "investment_goal": user_info.get("investment_goal"),
-            "rebalancing_frequency": user_info.get("rebalancing_frequency")
-        },
-        "market_conditions": market_conditions
-    }
+# revision 데이터를 기반으로 AI 피드백을 생성하고 DB를 업데이트하는 함수
+def generate_feedback(portfolio_id, user_id, market_data=None):
+    """
+    revision 데이터를 기반으로 AI 피드백을 생성하고 revision을 갱신
+    AI 백엔드 장애로 대체 결과가 쓰였으면 응답만 하고 revision은 갱신하지 않음 (피드백 일괄 재생성 작업이 다시 처리)
+    """
+    with track_degradation() as degraded:
+        if market_data is None:
+            market_data = {"market_condition": "default"}
+        from app.ai.ai import fetch_user_info, fetch_etf_data, fetch_mbti_recommendation, ai_recommend_etfs, euclid_etfs
+
+        # 사용자 정보 및 revision 데이터 조회
+        user_info = fetch_user_info(user_id)
+        if not user_info:
+            return "사용자 정보를 찾을 수 없습니다.", []
+        revision_data = fetch_revision_by_portfolio(portfolio_id)
+        if not revision_data:
+            return "포트폴리오 데이터가 없습니다.", []
+        etf_data = fetch_etf_data()
+
+        portfolio_pc_vector = get_portfolio_pc_vector(revision_data)
+        target_vector = np.array(user_info.get("mbti_vector"))
+        preference_etfs = euclid_etfs(target_vector, etf_data)
+        market_conditions = market_data.dict()
+        print("사용할 시장 지표:", market_conditions)
+        mbti_recommendation = fetch_mbti_recommendation(user_info.get("mbti_code"))
+
+        ai_etf_recommendation = ai_recommend_etfs(user_info, etf_data, market_conditions, mbti_recommendation)
+        if not ai_etf_recommendation:
+            mark_degraded("ai_recommend_etfs: 빈 응답")
+            ai_etf_recommendation = preference_etfs["ticker"][:3]
+
+        current_etfs = revision_data.get("etfs", {})
+        if isinstance(current_etfs, dict):
+            current_etfs = current_etfs.get("etfs", [])
+
+        rebalanced_allocation = get_allocation_with_revision_rebalance(
+            recommended_etfs=ai_etf_recommendation,
+            revision_etfs=revision_data.get("etfs", {})
+        )
 
-    prompt = """
+        function_payload = {
+            "portfolio_pc_vector": portfolio_pc_vector.tolist(),
+            "target_pc_vector": target_vector.tolist(),
+            "preference_etfs": {"ticker": preference_etfs["ticker"]},
+            "ai_recommendation_etfs": rebalanced_allocation,
+            "mbti_recommendation_etfs": mbti_recommendation,
+            "current_etfs": current_etfs,
+            "user_info": {
+                "name": user_info.get("name"),
+                "age": user_info.get("age"),
+                "investment_period": user_info.get("investment_period"),
+                "investment_amount": user_info.get("investment_amount"),
+                "investment_goal": user_info.get("investment_goal"),
+                "rebalancing_frequency": user_info.get("rebalancing_frequency")
+            },
+            "market_conditions": market_conditions
+        }
+
+        prompt = """
     You are WISE (Wealth Investment Strategic Expert), an AI investment advisor specializing in ETF portfolio analysis and optimization.
     Please analyze the following aspects:
     1. Overall asset allocation strategy
@@ -331,90 +345,102 @@ def generate_feedback(portfolio_id, user_id, market_data=None):
     4. 조언 (단기/장기)
     5. 추천 ETF
     """
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "당신은 투자 분석 전문가입니다. 모든 요청에 대해 반드시 analyze_portfolio 펑션을 호출하여야 합니다."},
-            {"role": "user", "content": prompt},
-            {"role": "assistant",
-             "function_call": {"name": "analyze_portfolio", "arguments": json.dumps(function_payload)}}
-        ],
-        functions=[  # analyze_portfolio 함수 스키마 (생략 가능)
-            {
-                "name": "analyze_portfolio",
-                "description": "Analyze ETF portfolio data and generate feedback including ETF recommendations.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "portfolio_pc_vector": {"type": "array", "items": {"type": "number"}},
-                        "target_pc_vector": {"type": "array", "items": {"type": "number"}},
-                        "preference_etfs": {"type": "object",
-                                            "properties": {"ticker": {"type": "array", "items": {"type": "string"}}}},
-                        "ai_recommendation_etfs": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "ticker": {"type": "string"},
-                                    "allocation": {"type": "number"}
-                                },
-                                "required": ["ticker", "allocation"]
-                            }
-                        },
-                        "mbti_recommendation_etfs": {"type": "array", "items": {"type": "string"}},
-                        "current_etfs": {"type": "array", "items": {"type": "object",
-                                                                    "properties": {"ticker": {"type": "string"},
-                                                                                   "allocation": {"type": "number"}},
-                                                                    "required": ["ticker", "allocation"]}},
-                        "user_info": {
+        try:
+            response = chat_completion(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": "당신은 투자 분석 전문가입니다. 모든 요청에 대해 반드시 analyze_portfolio 펑션을 호출하여야 합니다."},
+                    {"role": "user", "content": prompt},
+                    {"role": "assistant",
+                     "function_call": {"name": "analyze_portfolio", "arguments": json.dumps(function_payload)}}
+                ],
+                functions=[  # analyze_portfolio 함수 스키마 (생략 가능)
+                    {
+                        "name": "analyze_portfolio",
+                        "description": "Analyze ETF portfolio data and generate feedback including ETF recommendations.",
+                        "parameters": {
                             "type": "object",
                             "properties": {
-                                "name": {"type": "string"},
-                                "age": {"type": "number"},
-                                "investment_period": {"type": "number"},
-                                "investment_amount": {"type": "number"},
-                                "investment_goal": {"type": "string"},
-                                "rebalancing_frequency": {"type": "number"}
-                            }
-                        },
-                        "market_conditions": {"type": "object", "properties": {"interest_rate": {"type": "number"},
-                                                                               "inflation_rate": {"type": "number"},
-                                                                               "exchange_rate": {"type": "number"}}}
-                    },
-                    "required": ["portfolio_pc_vector", "target_pc_vector", "preference_etfs", "user_info",
-                                 "market_conditions"]
-                }
-            }
-        ],
-        function_call="auto"
-    )
-    print("generate_feedback - 전체 응답:", response)
-    message = response.choices[0].message
-    print("generate_feedback - 메시지:", message)
-
-    # 피드백 텍스트 추출 로직 개선
-    feedback_text = message.content
-    if not feedback_text:
-        if "function_call" in message and "arguments" in message["function_call"]:
-            try:
-                func_args = json.loads(message["function_call"]["arguments"])
-                print("function_call arguments:", func_args)
-                feedback_text = func_args.get("feedback")
-                if not feedback_text:
-                    print("function_call 응답에 'feedback' 키가 없습니다.")
-                    feedback_text = "피드백 정보가 제공되지 않았습니다."
-            except Exception as e:
-                print("function_call arguments 파싱 에러:", e)
-                feedback_text = "피드백 정보를 파싱할 수 없습니다."
+                                "portfolio_pc_vector": {"type": "array", "items": {"type": "number"}},
+                                "target_pc_vector": {"type": "array", "items": {"type": "number"}},
+                                "preference_etfs": {"type": "object",
+                                                    "properties": {"ticker": {"type": "array", "items": {"type": "string"}}}},
+                                "ai_recommendation_etfs": {
+                                    "type": "array",
+                                    "items": {
+                                        "type": "object",
+                                        "properties": {
+                                            "ticker": {"type": "string"},
+                                            "allocation": {"type": "number"}
+                                        },
+                                        "required": ["ticker", "allocation"]
+                                    }
+                                },
+                                "mbti_recommendation_etfs": {"type": "array", "items": {"type": "string"}},
+                                "current_etfs": {"type": "array", "items": {"type": "object",
+                                                                            "properties": {"ticker": {"type": "string"},
+                                                                                           "allocation": {"type": "number"}},
+                                                                            "required": ["ticker", "allocation"]}},
+                                "user_info": {
+                                    "type": "object",
+                                    "properties": {
+                                        "name": {"type": "string"},
+                                        "age": {"type": "number"},
+                                        "investment_period": {"type": "number"},
+                                        "investment_amount": {"type": "number"},
+                                        "investment_goal": {"type": "string"},
+                                        "rebalancing_frequency": {"type": "number"}
+                                    }
+                                },
+                                "market_conditions": {"type": "object", "properties": {"interest_rate": {"type": "number"},
+                                                                                       "inflation_rate": {"type": "number"},
+                                                                                       "exchange_rate": {"type": "number"}}}
+                            },
+                            "required": ["portfolio_pc_vector", "target_pc_vector", "preference_etfs", "user_info",
+                                         "market_conditions"]
+                        }
+                    }
+                ],
+                function_call="auto"
+            )
+        except AIUnavailableError as e:
+            # AI 백엔드 장애 시 계산된 추천/비중으로 정형화된 피드백 작성
+            mark_degraded(f"generate_feedback: {e}")
+            response = None
+
+        if response is None:
+            feedback_text = fallback_feedback_text(rebalanced_allocation, preference_etfs["ticker"], market_conditions)
         else:
-            print("message에 function_call 정보가 없습니다.")
-            feedback_text = "피드백 생성에 실패했습니다."
-
-    update_revision_data(
-        portfolio_id,
-        rebalanced_allocation,
-        market_conditions,
-        user_info,
-        feedback_text
-    )
-    return feedback_text, rebalanced_allocation
+            print("generate_feedback - 전체 응답:", response)
+            message = response.choices[0].message
+            print("generate_feedback - 메시지:", message)
+
+            # 피드백 텍스트 추출 로직 개선
+            feedback_text = message.content
+            if not feedback_text:
+                if "function_call" in message and "arguments" in message["function_call"]:
+                    try:
+                        func_args = json.loads(message["function_call"]["arguments"])
+                        print("function_call arguments:", func_args)
+                        feedback_text = func_args.get("feedback")
+                        if not feedback_text:
+                            print("function_call 응답에 'feedback' 키가 없습니다.")
+                            feedback_text = "피드백 정보가 제공되지 않았습니다."
+                    except Exception as e:
+                        print("function_call arguments 파싱 에러:", e)
+                        feedback_text = "피드백 정보를 파싱할 수 없습니다."
+                else:
+                    print("message에 function_call 정보가 없습니다.")
+                    feedback_text = "피드백 생성에 실패했습니다."
+
+        if degraded:
+            print("대체 결과가 포함되어 revision을 갱신하지 않습니다:", degraded)
+            return feedback_text, rebalanced_allocation
+        update_revision_data(
+            portfolio_id,
+            rebalanced_allocation,
+            market_conditions,
+            user_info,
+            feedback_text
+        )
+        return feedback_text, rebalanced_allocation
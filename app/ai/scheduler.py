@@ -0,0 +1,310 @@
+"""OpenAI 호출 스케줄러 - 모델별 RPM/TPM 버킷, 우선순위 큐, 재시도"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+
+from app.ai.config import get_client
+from app.ai.resilience import AIUnavailableError, CircuitBreaker, current_deadline
+from app.core.config import settings
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+DEFAULT_LIMITS = {
+    "gpt-4o": (500, 30_000),
+    "text-embedding-3-small": (3_000, 1_000_000),
+}
+FALLBACK_LIMITS = (500, 30_000)
+BURST_SECONDS = 10.0          # 버킷 용량 = 10초 분량 (분 단위 한도를 한 번에 몰아 쓰지 않도록)
+COMPLETION_TOKENS = 1_000     # max_tokens 가 없을 때 응답 토큰 추정치
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+_priority = ContextVar("openai_priority", default=INTERACTIVE)
+
+@contextmanager
+def openai_priority(level: int):
+    """블록 안의 OpenAI 호출 우선순위 지정"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def parse_limits(value: str) -> dict:
+    """'model=rpm:tpm,...' -> {model: (rpm, tpm)} (기본 한도에 덮어씀)"""
+    limits = dict(DEFAULT_LIMITS)
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        model, _, quota = item.partition("=")
+        rpm, _, tpm = quota.partition(":")
+        limits[model.strip()] = (float(rpm), float(tpm))
+    return limits
+
+class TokenBucket:
+    """분당 rate 로 채워지는 버킷 (잔량이 음수면 빚 - 추정보다 많이 쓴 토큰)"""
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)  # 용량보다 큰 요청은 가득 찼을 때 보내고 빚으로 처리
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= amount
+
+    def give_back(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+class ModelQueue:
+    """모델 하나의 대기열 - 우선순위 힙의 맨 앞 호출만 버킷 여유가 생기면 통과"""
+    def __init__(self, model: str, rpm: float, tpm: float):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.heap = []
+        self.cond = threading.Condition()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.breaker = CircuitBreaker()
+        self.stats = {"admitted": 0, "completed": 0, "errors": 0, "retries": 0, "rate_limited": 0,
+                      "deadline_exceeded": 0, "tokens_used": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+    def acquire(self, priority: int, seq: int, tokens: int, deadline: float = None) -> float:
+        """차례가 오고 한도 여유가 생길 때까지 대기 후 버킷 차감 (대기 시간 반환, 기한 안에 못 나가면 AIUnavailableError)"""
+        entry = (priority, seq)
+        enqueued = time.monotonic()
+        with self.cond:
+            heapq.heappush(self.heap, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self.heap[0] != entry:
+                        if deadline is not None and now >= deadline:
+                            raise AIUnavailableError(f"{self.model} 대기열에서 기한 초과")
+                        self.cond.wait(None if deadline is None else deadline - now)
+                        continue
+                    delay = max(self.paused_until - now, self.requests.wait_time(1, now),
+                                self.tokens.wait_time(tokens, now))
+                    if delay <= 0:
+                        break
+                    if deadline is not None and now + delay >= deadline:
+                        # 기다려도 기한 안에 나갈 수 없으면 바로 포기 (대체 결과로 빠르게 응답)
+                        raise AIUnavailableError(f"{self.model} 호출 한도 대기가 기한 초과")
+                    self.cond.wait(delay)
+            except BaseException as e:
+                self.heap.remove(entry)
+                heapq.heapify(self.heap)
+                if isinstance(e, AIUnavailableError):
+                    self.stats["deadline_exceeded"] += 1
+                self.cond.notify_all()
+                raise
+            heapq.heappop(self.heap)
+            self.requests.take(1, now)
+            self.tokens.take(tokens, now)
+            self.in_flight += 1
+            waited = now - enqueued
+            self.stats["admitted"] += 1
+            self.stats["wait_seconds_total"] += waited
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+            self.cond.notify_all()
+        return waited
+
+    def release(self, estimated: int, used: int, ok: bool):
+        with self.cond:
+            self.in_flight -= 1
+            self.tokens.give_back(estimated - used)
+            self.stats["completed" if ok else "errors"] += 1
+            self.stats["tokens_used"] += used
+            self.cond.notify_all()
+
+    def pause(self, seconds: float):
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.stats["rate_limited"] += 1
+
+    def snapshot(self) -> dict:
+        with self.cond:
+            now = time.monotonic()
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self.heap:
+                depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+            self.requests._refill(now)
+            self.tokens._refill(now)
+            admitted = self.stats["admitted"]
+            return {
+                "queue_depth": depth,
+                "in_flight": self.in_flight,
+                "paused_seconds": round(max(0.0, self.paused_until - now), 2),
+                "requests_available": round(self.requests.level, 1),
+                "tokens_available": round(self.tokens.level),
+                "limits": {"rpm": round(self.requests.rate * 60), "tpm": round(self.tokens.rate * 60)},
+                **{key: round(value, 3) if isinstance(value, float) else value for key, value in self.stats.items()},
+                "wait_seconds_mean": round(self.stats["wait_seconds_total"] / admitted, 3) if admitted else 0.0,
+                "breaker": self.breaker.snapshot(),
+            }
+
+class OpenAIScheduler:
+    def __init__(self, limits: dict = None, max_retries: int = None):
+        self.limits = limits if limits is not None else parse_limits(settings.openai_rate_limits)
+        self.max_retries = settings.openai_max_retries if max_retries is None else max_retries
+        self.queues = {}
+        self.lock = threading.Lock()
+        self.sequence = itertools.count()
+
+    def queue(self, model: str) -> ModelQueue:
+        with self.lock:
+            if model not in self.queues:
+                self.queues[model] = ModelQueue(model, *self.limits.get(model, FALLBACK_LIMITS))
+            return self.queues[model]
+
+    def submit(self, model: str, estimated_tokens: int, call, priority: int = None):
+        """
+        call(timeout) 을 한도/우선순위/기한에 맞춰 실행하고 재시도 가능한 오류는 백오프 후 다시 대기열에 넣음
+        브레이커가 열렸거나 기한 안에 끝낼 수 없으면 AIUnavailableError
+        """
+        queue = self.queue(model)
+        priority = _priority.get() if priority is None else priority
+        deadline = current_deadline()
+        seq = next(self.sequence)  # 재시도도 처음 도착 순서를 유지
+        for attempt in range(self.max_retries + 1):
+            if not queue.breaker.allow():
+                raise AIUnavailableError(f"{model} 서킷 브레이커 열림")
+            try:
+                queue.acquire(priority, seq, estimated_tokens, deadline)
+            except BaseException:
+                queue.breaker.abandon()
+                raise
+            timeout = settings.openai_call_timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+            used, ok = estimated_tokens, False
+            try:
+                if timeout <= 0:
+                    queue.breaker.abandon()
+                    raise AIUnavailableError(f"{model} 호출 기한 초과")
+                response = call(timeout)
+                used, ok = usage_tokens(response, estimated_tokens), True
+                queue.breaker.record_success()
+                return response
+            except AIUnavailableError:
+                raise
+            except Exception as e:
+                retryable, retry_after, rate_limited = classify_error(e)
+                if not retryable:
+                    queue.breaker.abandon()  # 잘못된 요청 등 공급자 장애가 아닌 오류는 그대로 전달
+                    raise
+                if rate_limited:
+                    queue.breaker.abandon()  # 한도 초과는 큐 일시 정지로 처리 (장애로 보지 않음)
+                else:
+                    queue.breaker.record_failure()
+                delay = backoff_delay(attempt, retry_after)
+                if attempt == self.max_retries or (deadline is not None and time.monotonic() + delay >= deadline):
+                    raise AIUnavailableError(f"{model} 호출 실패: {e}") from e
+                print(f"OpenAI {model} 호출 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}s 후):", e)
+            finally:
+                queue.release(estimated_tokens, used, ok)
+            queue.stats["retries"] += 1
+            if rate_limited:
+                queue.pause(delay)  # 모델 큐 전체가 대기 - 이 호출은 대기열 맨 앞 순서로 다시 들어감
+            else:
+                time.sleep(delay)
+
+    def metrics(self) -> dict:
+        with self.lock:
+            queues = list(self.queues.values())
+        return {queue.model: queue.snapshot() for queue in queues}
+
+def retry_after_seconds(error):
+    """오류 응답의 retry-after-ms / retry-after 헤더 (초, 없으면 None)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return None
+
+def classify_error(error):
+    """(재시도 여부, Retry-After 초, 429 여부)"""
+    import openai
+    if isinstance(error, openai.RateLimitError):
+        return True, retry_after_seconds(error), True
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):  # APITimeoutError 포함
+        return True, retry_after_seconds(error), False
+    if isinstance(error, openai.APIStatusError) and error.status_code in (408, 409):
+        return True, retry_after_seconds(error), False
+    return False, None, False
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """Retry-After 가 있으면 그 시간 + 약간의 지터, 없으면 지수 백오프 (equal jitter)"""
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_CAP) + random.uniform(0, 0.1 * min(retry_after, BACKOFF_CAP) + 0.05)
+    ceiling = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+def usage_tokens(response, default: int) -> int:
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else default
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 대략 추정 (영문 ~4자/토큰, 한글은 더 촘촘하므로 2자/토큰 기준으로 보수적으로)"""
+    return len(text) // 2 + 1
+
+def estimate_chat_tokens(kwargs: dict) -> int:
+    prompt = 0
+    for message in kwargs.get("messages", []):
+        prompt += 4 + estimate_tokens(str(message.get("content") or "")) \
+            + estimate_tokens(str(message.get("function_call") or ""))
+    if kwargs.get("functions"):
+        prompt += estimate_tokens(str(kwargs["functions"]))
+    return prompt + int(kwargs.get("max_tokens") or COMPLETION_TOKENS)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> OpenAIScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = OpenAIScheduler()
+    return _scheduler
+
+def chat_completion(**kwargs):
+    """client.chat.completions.create 대신 사용 (스케줄러 경유)"""
+    return get_scheduler().submit(
+        kwargs["model"], estimate_chat_tokens(kwargs), lambda timeout: get_client().chat.completions.create(**kwargs, timeout=timeout)
+    )
+
+def create_embedding(**kwargs):
+    """client.embeddings.create 대신 사용 (스케줄러 경유)"""
+    inputs = kwargs["input"] if isinstance(kwargs["input"], list) else [kwargs["input"]]
+    return get_scheduler().submit(
+        kwargs["model"], sum(estimate_tokens(str(text)) for text in inputs),
+        lambda timeout: get_client().embeddings.create(**kwargs, timeout=timeout)
+    )
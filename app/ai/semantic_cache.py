@@ -0,0 +1,135 @@
+"""자연어 추천 결과 캐시 (같은 검색 조건에서 질의 임베딩이 가까우면 재사용)"""
+import copy
+import json
+import threading
+import time
+
+import numpy as np
+
+from app.ai.snapshot import TEXT_VECTOR_DIM
+from app.core.config import settings
+
+def normalize_query(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+def cache_key(snapshot, mode: str, top_k: int, use_gpt_summary: bool, filters, terms=()) -> str:
+    """검색 조건 + ETF 데이터 버전 (스냅샷 updated_at, 없으면 세대) + 키워드 점수 토큰 (vector 모드는 빈 값)"""
+    version = snapshot.updated_at.isoformat() if snapshot.updated_at else snapshot.generation
+    return json.dumps([version, len(snapshot.tickers), mode, top_k, use_gpt_summary, filters, list(terms)],
+                      sort_keys=True, default=str)
+
+class SemanticCache:
+    def __init__(self, max_entries: int, threshold: float, ttl: float, dim: int = TEXT_VECTOR_DIM):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self.embeddings = np.zeros((max_entries, dim), dtype=np.float32)
+        self.expires_at = np.zeros(max_entries, dtype=np.float64)  # 0 = 빈 칸
+        self.last_used = np.zeros(max_entries, dtype=np.float64)
+        self.keys = [None] * max_entries
+        self.texts = [None] * max_entries
+        self.values = [None] * max_entries
+        self.lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.similarities = []  # 최근 의미 적중 유사도 (임계값 조정 참고용)
+
+    def _hit(self, slot: int, now: float):
+        self.last_used[slot] = now
+        return copy.deepcopy(self.values[slot])
+
+    def get_exact(self, key: str, text: str):
+        """같은 조건 + 같은 정규화 질의 (임베딩 전에 확인) - 없으면 None (miss 로 세지 않음)"""
+        text = normalize_query(text)
+        now = time.monotonic()
+        with self.lock:
+            for slot in np.flatnonzero(self.expires_at > now):
+                if self.texts[slot] == text and self.keys[slot] == key:
+                    self.exact_hits += 1
+                    return self._hit(slot, now)
+        return None
+
+    def get_similar(self, key: str, embedding):
+        """같은 조건에서 코사인이 threshold 이상인 가장 가까운 질의의 결과 - 없으면 None"""
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        now = time.monotonic()
+        with self.lock:
+            if norm > 0:
+                live = np.flatnonzero(self.expires_at > now)
+                live = live[[self.keys[slot] == key for slot in live]] if len(live) else live
+                if len(live):
+                    similarities = self.embeddings[live] @ (query / norm)
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.threshold:
+                        self.semantic_hits += 1
+                        self.similarities = (self.similarities + [float(similarities[best])])[-100:]
+                        return self._hit(live[best], now)
+            self.misses += 1
+        return None
+
+    def count_miss(self):
+        with self.lock:
+            self.misses += 1
+
+    def put(self, key: str, text: str, embedding, value):
+        """embedding 이 None 이면 (lexical 모드) 문자열 일치로만 재사용"""
+        now = time.monotonic()
+        with self.lock:
+            free = np.flatnonzero(self.expires_at <= now)
+            if len(free):
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self.last_used))
+                self.evictions += 1
+            vector = np.zeros(self.embeddings.shape[1], dtype=np.float32)
+            if embedding is not None:
+                vector = np.asarray(embedding, dtype=np.float32)
+                norm = np.linalg.norm(vector)
+                vector = vector / norm if norm > 0 else vector
+            self.embeddings[slot] = vector
+            self.expires_at[slot] = now + self.ttl
+            self.last_used[slot] = now
+            self.keys[slot] = key
+            self.texts[slot] = normalize_query(text)
+            self.values[slot] = copy.deepcopy(value)
+
+    def clear(self):
+        with self.lock:
+            self.expires_at[:] = 0
+            self.values = [None] * self.max_entries
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self.lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "size": int(np.count_nonzero(self.expires_at > now)),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "recent_min_similarity": round(min(self.similarities), 4) if self.similarities else None,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_semantic_cache():
+    """프로세스 공용 캐시 (SEMANTIC_CACHE_SIZE=0 이면 None)"""
+    global _cache
+    if settings.semantic_cache_size <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(settings.semantic_cache_size, settings.semantic_cache_threshold,
+                                       settings.semantic_cache_ttl)
+    return _cache
@@ -0,0 +1,239 @@
+"""유사 ETF 사전 계산 (python -m app.ai.similarity [--full])"""
+import argparse
+import functools
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.ai.db import fetch_all
+from app.ai.snapshot import read_snapshot_from_db
+from app.core.cache import invalidate_tables
+from app.crud.etf import SIMILAR_TOP_K
+from app.db.connection import get_connection
+
+DEFAULT_TEXT_WEIGHT = 0.8
+BLOCK_SIZE = 512
+FULL_RECOMPUTE_RATIO = 0.5  # 바뀐 행이 전체의 절반을 넘으면 증분 대신 전체 재계산
+WRITE_BATCH = 1000
+
+def _normalize(matrix) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def build_matrix(snapshot, text_weight: float) -> np.ndarray:
+    """내적이 곧 가중 코사인 유사도가 되는 (N x 1540) 행렬"""
+    return np.ascontiguousarray(np.hstack([
+        np.sqrt(text_weight) * _normalize(snapshot.text_vectors),
+        np.sqrt(1 - text_weight) * _normalize(snapshot.mbti_vectors),
+    ]), dtype=np.float32)
+
+def row_hashes(snapshot, signature: str) -> list:
+    """행별 벡터 해시 (가중치/k가 바뀌면 signature가 달라져 전체가 바뀐 것으로 처리)"""
+    text = np.ascontiguousarray(snapshot.text_vectors, dtype=np.float32)
+    mbti = np.ascontiguousarray(snapshot.mbti_vectors, dtype=np.float32)
+    prefix = signature.encode("utf-8")
+    return [hashlib.sha1(prefix + text[i].tobytes() + mbti[i].tobytes()).hexdigest() for i in range(len(snapshot))]
+
+def _top_k(scores: np.ndarray, indices: np.ndarray, k: int):
+    """행별 점수 상위 k개를 (indices, scores) 로 내림차순 정렬해 반환"""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return indices[:, :0], scores[:, :0]
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    part = np.take_along_axis(part, order, axis=1)
+    return np.take_along_axis(indices, part, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+# --- 블록 계산 (프로세스 풀 워커) ---
+
+_worker_matrix = None
+
+def _init_worker(path):
+    global _worker_matrix
+    _worker_matrix = np.load(path, mmap_mode="r")
+
+def top_k_block(rows, k: int, matrix=None):
+    """rows 행들과 전체 행의 유사도 블록에서 자기 자신을 제외한 top-k"""
+    matrix = _worker_matrix if matrix is None else matrix
+    scores = np.asarray(matrix[rows]) @ np.asarray(matrix).T
+    scores[np.arange(len(rows)), rows] = -np.inf
+    candidates = np.broadcast_to(np.arange(matrix.shape[0]), scores.shape)
+    k = min(k, matrix.shape[0] - 1)
+    return (rows, *_top_k(scores, candidates, k))
+
+def compute_top_k(matrix: np.ndarray, rows, k: int, workers: int, block_size: int = BLOCK_SIZE) -> dict:
+    """rows 각각의 top-k 를 {row: (neighbor indices, scores)} 로 계산"""
+    rows = np.asarray(rows, dtype=np.int64)
+    blocks = [rows[start:start + block_size] for start in range(0, len(rows), block_size)]
+    results = {}
+
+    if workers <= 1 or len(blocks) <= 1:
+        outputs = (top_k_block(block, k, matrix) for block in blocks)
+        for block, indices, scores in outputs:
+            results.update(zip(block.tolist(), zip(indices, scores)))
+        return results
+
+    with tempfile.TemporaryDirectory(prefix="etf-similarity-") as directory:
+        path = os.path.join(directory, "matrix.npy")
+        np.save(path, matrix)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path,)) as executor:
+            for block, indices, scores in executor.map(functools.partial(top_k_block, k=k), blocks):
+                results.update(zip(block.tolist(), zip(indices, scores)))
+    return results
+
+def merge_changed(matrix: np.ndarray, rows, old_lists: dict, changed, k: int, block_size: int = BLOCK_SIZE) -> dict:
+    """
+    기존 목록이 유효한 행에 바뀐 행과의 점수만 합쳐 top-k 갱신
+    old_lists: {row: (neighbor indices, scores)} - 이웃은 모두 바뀌지 않은 행
+    목록이 실제로 달라진 행만 반환
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    changed = np.asarray(changed, dtype=np.int64)
+    results = {}
+    if len(rows) == 0 or len(changed) == 0:
+        return results
+
+    changed_matrix = matrix[changed]
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        new_scores = matrix[block] @ changed_matrix.T
+        width = max(len(old_lists[row][0]) for row in block.tolist())
+        old_indices = np.full((len(block), width), -1, dtype=np.int64)
+        old_scores = np.full((len(block), width), -np.inf, dtype=np.float32)
+        for i, row in enumerate(block.tolist()):
+            indices, scores = old_lists[row]
+            old_indices[i, :len(indices)] = indices
+            old_scores[i, :len(scores)] = scores
+
+        indices, scores = _top_k(
+            np.hstack([old_scores, new_scores]),
+            np.hstack([old_indices, np.broadcast_to(changed, new_scores.shape)]),
+            k,
+        )
+        for i, row in enumerate(block.tolist()):
+            valid = scores[i] > -np.inf
+            if not np.array_equal(indices[i][valid], old_lists[row][0]):
+                results[row] = (indices[i][valid], scores[i][valid])
+    return results
+
+# --- DB 입출력 ---
+
+STATE_HASHES_SQL = "SELECT ticker, vector_hash FROM etf_similarity_state"
+STATE_LISTS_SQL = "SELECT ticker, neighbor_ticker, score FROM etf_similarity ORDER BY ticker, neighbor_rank"
+
+def load_state():
+    """(ticker -> vector_hash, ticker -> [(neighbor_ticker, score), ...] 순위순)"""
+    hashes = {row["ticker"]: row["vector_hash"] for row in fetch_all(STATE_HASHES_SQL)}
+    lists = {}
+    for row in fetch_all(STATE_LISTS_SQL):
+        lists.setdefault(row["ticker"], []).append((row["neighbor_ticker"], row["score"]))
+    return hashes, lists
+
+def save_results(tickers, results: dict, deleted, state_rows):
+    """바뀐 행의 목록을 지우고 다시 적재, 해시 상태 갱신 (하나의 트랜잭션)"""
+    rewrite = [tickers[row] for row in results] + list(deleted)
+    inserts = [
+        (tickers[row], rank, tickers[neighbor], float(score))
+        for row, (neighbors, scores) in results.items()
+        for rank, (neighbor, score) in enumerate(zip(neighbors.tolist(), scores.tolist()), start=1)
+    ]
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            for start in range(0, len(rewrite), WRITE_BATCH):
+                chunk = rewrite[start:start + WRITE_BATCH]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"DELETE FROM etf_similarity WHERE ticker IN ({placeholders})", chunk)
+            deleted = list(deleted)
+            for start in range(0, len(deleted), WRITE_BATCH):
+                chunk = deleted[start:start + WRITE_BATCH]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"DELETE FROM etf_similarity_state WHERE ticker IN ({placeholders})", chunk)
+            for start in range(0, len(inserts), WRITE_BATCH):
+                cursor.executemany(
+                    "INSERT INTO etf_similarity (ticker, neighbor_rank, neighbor_ticker, score) VALUES (%s, %s, %s, %s)",
+                    inserts[start:start + WRITE_BATCH]
+                )
+            for start in range(0, len(state_rows), WRITE_BATCH):
+                cursor.executemany(
+                    "INSERT INTO etf_similarity_state (ticker, vector_hash) VALUES (%s, %s) "
+                    "ON DUPLICATE KEY UPDATE vector_hash = VALUES(vector_hash)",
+                    state_rows[start:start + WRITE_BATCH]
+                )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    invalidate_tables("etf_similarity")
+    return len(inserts)
+
+def plan_incremental(tickers, hashes, state_hashes, state_lists, full: bool):
+    """(전체 재계산 행, 병합 대상 행과 기존 목록, 바뀐 행, 삭제된 ticker)"""
+    index = {ticker: i for i, ticker in enumerate(tickers)}
+    changed = [i for i, ticker in enumerate(tickers) if state_hashes.get(ticker) != hashes[i]]
+    deleted = set(state_hashes).union(state_lists).difference(index)
+
+    if full or not state_hashes or len(changed) > FULL_RECOMPUTE_RATIO * len(tickers):
+        return list(range(len(tickers))), {}, changed, deleted
+
+    dirty = {tickers[i] for i in changed} | deleted
+    recompute, old_lists = set(changed), {}
+    for i, ticker in enumerate(tickers):
+        if i in recompute:
+            continue
+        neighbors = state_lists.get(ticker)
+        if neighbors is None or any(neighbor in dirty for neighbor, _ in neighbors):
+            recompute.add(i)
+            continue
+        old_lists[i] = (
+            np.array([index[neighbor] for neighbor, _ in neighbors], dtype=np.int64),
+            np.array([score for _, score in neighbors], dtype=np.float32),
+        )
+    return sorted(recompute), old_lists, changed, deleted
+
+def run(top_k: int = SIMILAR_TOP_K, text_weight: float = DEFAULT_TEXT_WEIGHT, workers: int = 1,
+        block_size: int = BLOCK_SIZE, full: bool = False) -> dict:
+    started = time.perf_counter()
+    snapshot = read_snapshot_from_db()
+    tickers = snapshot.tickers
+    matrix = build_matrix(snapshot, text_weight)
+    hashes = row_hashes(snapshot, f"{text_weight}:{top_k}")
+    state_hashes, state_lists = load_state()
+
+    recompute, old_lists, changed, deleted = plan_incremental(tickers, hashes, state_hashes, state_lists, full)
+    results = compute_top_k(matrix, recompute, top_k, workers, block_size)
+    merged = merge_changed(matrix, sorted(old_lists), old_lists, changed, top_k, block_size)
+    results.update(merged)
+
+    state_rows = [(tickers[i], hashes[i]) for i in (range(len(tickers)) if len(recompute) == len(tickers) else changed)]
+    inserted = save_results(tickers, results, deleted, state_rows)
+    return {
+        "etfs": len(tickers), "changed": len(changed), "deleted": len(deleted),
+        "recomputed": len(recompute), "merged": len(merged), "rows_written": inserted,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="ETF 유사도 top-k 사전 계산")
+    parser.add_argument("--top-k", type=int, default=SIMILAR_TOP_K)
+    parser.add_argument("--text-weight", type=float, default=DEFAULT_TEXT_WEIGHT,
+                        help="text_vector 가중치 (나머지는 mbti_vector)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--full", action="store_true", help="기존 결과를 무시하고 전체 재계산")
+    args = parser.parse_args()
+
+    stats = run(args.top_k, args.text_weight, args.workers, args.block_size, args.full)
+    print(f"유사 ETF 계산 완료: {stats}")
+
+if __name__ == "__main__":
+    main()
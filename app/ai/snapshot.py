@@ -0,0 +1,236 @@
+"""ETF 벡터 스냅샷 - 프로세스 내 캐시 또는 멀티 워커 공유 mmap (python -m app.ai.snapshot build)"""
+import argparse
+import datetime
+import fcntl
+import json
+import sys
+import os
+import shutil
+import time
+import threading
+
+import numpy as np
+
+from app.ai.db import fetch_all, vector_matrix
+from app.core.cache import cached
+from app.core.config import settings
+
+SNAPSHOT_DIR = settings.vector_snapshot_dir
+SNAPSHOT_CHECK_INTERVAL = settings.vector_snapshot_check_interval
+SNAPSHOT_KEEP_GENERATIONS = 2
+TEXT_VECTOR_DIM = 1536
+MBTI_VECTOR_DIM = 4
+
+class EtfVectorSnapshot:
+    """
+    ETF 벡터 행렬과 ticker 순서 정보 (행 i는 tickers[i])
+    updated_at은 스냅샷에 포함된 etf 행의 max(updated_at) - 내보내기 버전/ETag 기준
+    """
+    def __init__(self, generation, tickers, categories, summaries, text_vectors, text_norms, mbti_vectors,
+                 updated_at=None):
+        self.generation = generation
+        self.updated_at = updated_at
+        self.tickers = tickers
+        self.categories = categories
+        self.summaries = summaries
+        self.text_vectors = text_vectors
+        self.text_norms = text_norms
+        self.mbti_vectors = mbti_vectors
+        self.index = {ticker: i for i, ticker in enumerate(tickers)}
+
+    def __len__(self):
+        return len(self.tickers)
+
+SNAPSHOT_SQL = "SELECT ticker, category, long_business_summary, text_vector, mbti_vector, updated_at FROM etf ORDER BY ticker"
+
+def read_snapshot_from_db(generation=None) -> EtfVectorSnapshot:
+    """etf 테이블 전체를 읽어 벡터 행렬로 변환"""
+    rows = fetch_all(SNAPSHOT_SQL)
+    text_vectors = vector_matrix(rows, "text_vector", TEXT_VECTOR_DIM, np.float32)
+    missing = sum(1 for row in rows if not row["text_vector"])
+    if missing:
+        # 벡터가 없는 ETF는 0 벡터(유사도 0점)로 들어가므로 알려 둠
+        print(f"text_vector 없는 ETF {missing}개 - python -m app.ai.embedding_pipeline run 으로 생성")
+
+    return EtfVectorSnapshot(
+        generation=generation or f"local-{int(time.time())}",
+        tickers=[row["ticker"] for row in rows],
+        categories=[row["category"] for row in rows],
+        summaries=[row["long_business_summary"] or "" for row in rows],
+        text_vectors=text_vectors,
+        text_norms=np.linalg.norm(text_vectors, axis=1),
+        mbti_vectors=vector_matrix(rows, "mbti_vector", MBTI_VECTOR_DIM, np.float32),
+        updated_at=max((row["updated_at"] for row in rows if row["updated_at"] is not None), default=None),
+    )
+
+def write_snapshot(snapshot: EtfVectorSnapshot, directory: str) -> str:
+    """
+    스냅샷을 새 세대 디렉터리에 기록하고 CURRENT 포인터를 원자적으로 교체
+    이미 매핑 중인 워커는 이전 세대 파일을 계속 참조하므로 교체 중에도 안전
+    """
+    os.makedirs(directory, exist_ok=True)
+    generation = f"gen-{time.time_ns():020d}"
+    staging = os.path.join(directory, f".{generation}.tmp")
+    os.makedirs(staging)
+
+    np.save(os.path.join(staging, "text_vector.npy"), np.ascontiguousarray(snapshot.text_vectors, dtype=np.float32))
+    np.save(os.path.join(staging, "text_norm.npy"), np.ascontiguousarray(snapshot.text_norms, dtype=np.float32))
+    np.save(os.path.join(staging, "mbti_vector.npy"), np.ascontiguousarray(snapshot.mbti_vectors, dtype=np.float32))
+    with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"tickers": snapshot.tickers, "categories": snapshot.categories, "summaries": snapshot.summaries,
+                   "updated_at": snapshot.updated_at.isoformat() if snapshot.updated_at else None},
+                  f, ensure_ascii=False)
+
+    os.rename(staging, os.path.join(directory, generation))
+    pointer = os.path.join(directory, ".CURRENT.tmp")
+    with open(pointer, "w") as f:
+        f.write(generation)
+    os.replace(pointer, os.path.join(directory, "CURRENT"))
+
+    _prune_generations(directory, generation)
+    return generation
+
+def _prune_generations(directory, current):
+    generations = sorted(name for name in os.listdir(directory) if name.startswith("gen-") and name != current)
+    for name in generations[:max(0, len(generations) - (SNAPSHOT_KEEP_GENERATIONS - 1))]:
+        # 삭제해도 이미 mmap한 워커의 페이지는 매핑 해제 전까지 유지됨
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+def map_snapshot(directory: str, generation: str) -> EtfVectorSnapshot:
+    """세대 디렉터리의 .npy 파일을 읽기 전용으로 mmap"""
+    path = os.path.join(directory, generation)
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    updated_at = meta.get("updated_at")
+    return EtfVectorSnapshot(
+        generation=generation,
+        tickers=meta["tickers"],
+        categories=meta["categories"],
+        summaries=meta["summaries"],
+        text_vectors=np.load(os.path.join(path, "text_vector.npy"), mmap_mode="r"),
+        text_norms=np.load(os.path.join(path, "text_norm.npy"), mmap_mode="r"),
+        mbti_vectors=np.load(os.path.join(path, "mbti_vector.npy"), mmap_mode="r"),
+        updated_at=datetime.datetime.fromisoformat(updated_at) if updated_at else None,
+    )
+
+class _SharedSnapshot:
+    """CURRENT 포인터를 주기적으로 확인해 세대가 바뀌면 새 파일로 다시 매핑"""
+    def __init__(self, directory):
+        self.directory = directory
+        self.snapshot = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def get(self):
+        """현재 세대 스냅샷 (CURRENT가 아직 없으면 None)"""
+        now = time.monotonic()
+        if self.checked_at and now - self.checked_at < SNAPSHOT_CHECK_INTERVAL:
+            return self.snapshot
+
+        with self.lock:
+            if not self.checked_at or time.monotonic() - self.checked_at >= SNAPSHOT_CHECK_INTERVAL:
+                try:
+                    with open(os.path.join(self.directory, "CURRENT")) as f:
+                        generation = f.read().strip()
+                except FileNotFoundError:
+                    generation = None
+                if generation is None:
+                    if self.snapshot is None:
+                        print(f"[snapshot] {self.directory} 에 스냅샷이 없어 DB에서 읽음")
+                elif self.snapshot is None or self.snapshot.generation != generation:
+                    self.snapshot = map_snapshot(self.directory, generation)
+                self.checked_at = time.monotonic()
+        return self.snapshot
+
+_shared = _SharedSnapshot(SNAPSHOT_DIR) if SNAPSHOT_DIR else None
+
+@cached("etf_snapshot", tables=("etf",))
+def _local_snapshot():
+    return read_snapshot_from_db()
+
+def get_snapshot() -> EtfVectorSnapshot:
+    """현재 ETF 벡터 스냅샷 반환 (공유 mmap, 공유 스냅샷이 아직 없거나 단일 워커면 프로세스 내 캐시)"""
+    snapshot = _shared.get() if _shared is not None else None
+    return snapshot if snapshot is not None else _local_snapshot()
+
+_derived = {}  # 이름 -> (세대, 의존 객체, 값) - 한 번에 읽고 한 번에 교체
+_derived_locks = {}
+
+def per_generation(snapshot, name: str, build, *depends_on):
+    """스냅샷 세대별 파생 객체 (세대나 depends_on 객체가 바뀌면 build(snapshot)로 한 번만 다시 생성)"""
+    def current(entry):
+        return (entry is not None and entry[0] == snapshot.generation and len(entry[1]) == len(depends_on)
+                and all(a is b for a, b in zip(entry[1], depends_on)))
+
+    entry = _derived.get(name)
+    if current(entry):
+        return entry[2]
+    with _derived_locks.setdefault(name, threading.Lock()):
+        entry = _derived.get(name)
+        if not current(entry):
+            entry = _derived[name] = (snapshot.generation, depends_on, build(snapshot))
+        return entry[2]
+
+def build(directory: str) -> str:
+    started = time.perf_counter()
+    snapshot = read_snapshot_from_db()
+    generation = write_snapshot(snapshot, directory)
+    print(f"스냅샷 생성 완료: {generation} ({len(snapshot)}개 ETF, {time.perf_counter() - started:.2f}s)")
+    return generation
+
+def refresh_loop(directory: str, every: float, stop_event: threading.Event):
+    """
+    every초마다 스냅샷을 다시 생성 (앱 lifespan에서 실행)
+    워커마다 실행되지만 디렉터리 잠금을 잡은 워커 하나만 생성하고, 그 워커가 종료되면 다른 워커가 이어받음
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".builder.lock"), "w") as lock_file:
+        holding = False
+        # 기동 시 스냅샷 생성이 실패했다면 첫 주기를 기다리지 않고 바로 시도
+        delay = every if os.path.exists(os.path.join(directory, "CURRENT")) else 0
+        while not stop_event.wait(delay):
+            delay = every
+            try:
+                if not holding:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    holding = True
+                build(directory)
+            except BlockingIOError:
+                pass
+            except Exception as e:
+                print(f"[snapshot] 갱신 실패 (다음 주기에 재시도): {e}")
+
+def export(out: str, export_format: str):
+    """스냅샷을 /etfs/vectors/export 와 같은 바이너리로 파일(또는 '-' 이면 stdout)에 기록"""
+    from app.ai.vector_export import export_stream
+
+    snapshot = read_snapshot_from_db()
+    stream, _, _ = export_stream(snapshot, export_format)
+    target = sys.stdout.buffer if out == "-" else open(out, "wb")
+    try:
+        for chunk in stream:
+            target.write(chunk)
+    finally:
+        if target is not sys.stdout.buffer:
+            target.close()
+    print(f"내보내기 완료: {len(snapshot)}개 ETF (updated_at={snapshot.updated_at})", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="ETF 벡터 스냅샷 생성 (멀티 워커 공유용) / 벡터 내보내기")
+    parser.add_argument("command", choices=["build", "export"])
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="스냅샷 디렉터리 (기본: VECTOR_SNAPSHOT_DIR)")
+    parser.add_argument("--out", default="-", help="export 출력 파일 (기본: stdout)")
+    parser.add_argument("--format", choices=["npy", "arrow"], default="npy", help="export 형식")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export(args.out, args.format)
+        return
+
+    if not args.dir:
+        parser.error("--dir 또는 VECTOR_SNAPSHOT_DIR 가 필요합니다.")
+
+    build(args.dir)
+
+if __name__ == "__main__":
+    main()
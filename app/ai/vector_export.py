@@ -0,0 +1,138 @@
+"""ETF 벡터 일괄 내보내기 (npy tar 또는 Arrow IPC 스트림)"""
+import io
+import json
+import tarfile
+
+import numpy as np
+
+from app.ai.snapshot import EtfVectorSnapshot, TEXT_VECTOR_DIM, MBTI_VECTOR_DIM
+
+EXPORT_CHUNK_BYTES = 1 << 20
+ARROW_BATCH_ROWS = 4096
+MEDIA_TYPES = {"npy": "application/x-tar", "arrow": "application/vnd.apache.arrow.stream"}
+EXTENSIONS = {"npy": "tar", "arrow": "arrow"}
+
+def export_version(snapshot: EtfVectorSnapshot) -> str:
+    updated_at = snapshot.updated_at.strftime("%Y%m%dT%H%M%S") if snapshot.updated_at else "0"
+    return f"{updated_at}-{len(snapshot)}"
+
+def build_manifest(snapshot: EtfVectorSnapshot) -> dict:
+    return {
+        "version": export_version(snapshot),
+        "updated_at": snapshot.updated_at.isoformat() if snapshot.updated_at else None,
+        "count": len(snapshot),
+        "tickers": snapshot.tickers,
+        "categories": snapshot.categories,
+        "files": {
+            "text_vector.npy": {"dtype": "float32", "shape": [len(snapshot), TEXT_VECTOR_DIM]},
+            "mbti_vector.npy": {"dtype": "float32", "shape": [len(snapshot), MBTI_VECTOR_DIM]},
+        },
+    }
+
+def _npy_header(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buffer, np.lib.format.header_data_from_array_1_0(array))
+    return buffer.getvalue()
+
+def _tar_member(name: str, size: int, mtime: float) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = mtime
+    info.mode = 0o644
+    return info.tobuf(format=tarfile.USTAR_FORMAT)
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % tarfile.BLOCKSIZE)
+
+def _iter_array(array: np.ndarray):
+    data = memoryview(array).cast("B")
+    for start in range(0, len(data), EXPORT_CHUNK_BYTES):
+        yield bytes(data[start:start + EXPORT_CHUNK_BYTES])
+
+def npy_tar_stream(snapshot: EtfVectorSnapshot):
+    """(청크 iterator, 전체 바이트 수) - tar 크기는 미리 계산되므로 Content-Length로 사용 가능"""
+    mtime = snapshot.updated_at.timestamp() if snapshot.updated_at else 0
+    manifest = json.dumps(build_manifest(snapshot), ensure_ascii=False).encode("utf-8")
+    arrays = [
+        ("text_vector.npy", np.ascontiguousarray(snapshot.text_vectors, dtype=np.float32)),
+        ("mbti_vector.npy", np.ascontiguousarray(snapshot.mbti_vectors, dtype=np.float32)),
+    ]
+
+    total = tarfile.BLOCKSIZE + len(manifest) + len(_padding(len(manifest)))
+    for _, array in arrays:
+        size = len(_npy_header(array)) + array.nbytes
+        total += tarfile.BLOCKSIZE + size + len(_padding(size))
+    total += 2 * tarfile.BLOCKSIZE
+
+    def stream():
+        yield _tar_member("manifest.json", len(manifest), mtime) + manifest + _padding(len(manifest))
+        for name, array in arrays:
+            header = _npy_header(array)
+            size = len(header) + array.nbytes
+            yield _tar_member(name, size, mtime) + header
+            yield from _iter_array(array)
+            yield _padding(size)
+        yield b"\0" * (2 * tarfile.BLOCKSIZE)
+
+    return stream(), total
+
+class _ChunkSink:
+    """pyarrow 스트림 writer가 쓴 바이트를 모아 두었다가 배치마다 꺼냄"""
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def arrow_stream(snapshot: EtfVectorSnapshot):
+    """(청크 iterator, None) - pyarrow가 없으면 ImportError"""
+    import pyarrow as pa
+
+    schema = pa.schema(
+        [
+            ("ticker", pa.string()),
+            ("category", pa.string()),
+            ("text_vector", pa.list_(pa.float32(), TEXT_VECTOR_DIM)),
+            ("mbti_vector", pa.list_(pa.float32(), MBTI_VECTOR_DIM)),
+        ],
+        metadata={"version": export_version(snapshot), "manifest": json.dumps(build_manifest(snapshot))},
+    )
+
+    def stream():
+        sink = _ChunkSink()
+        with pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema) as writer:
+            for start in range(0, len(snapshot), ARROW_BATCH_ROWS):
+                end = min(start + ARROW_BATCH_ROWS, len(snapshot))
+                text = np.ascontiguousarray(snapshot.text_vectors[start:end], dtype=np.float32)
+                mbti = np.ascontiguousarray(snapshot.mbti_vectors[start:end], dtype=np.float32)
+                writer.write_batch(pa.record_batch([
+                    pa.array(snapshot.tickers[start:end], pa.string()),
+                    pa.array(snapshot.categories[start:end], pa.string()),
+                    pa.FixedSizeListArray.from_arrays(pa.array(text.reshape(-1)), TEXT_VECTOR_DIM),
+                    pa.FixedSizeListArray.from_arrays(pa.array(mbti.reshape(-1)), MBTI_VECTOR_DIM),
+                ], schema=schema))
+                yield sink.drain()
+        yield sink.drain()
+
+    return stream(), None
+
+def export_stream(snapshot: EtfVectorSnapshot, export_format: str = "npy"):
+    """(청크 iterator, 전체 바이트 수 또는 None, media type)"""
+    if export_format == "arrow":
+        stream, total = arrow_stream(snapshot)
+    else:
+        stream, total = npy_tar_stream(snapshot)
+    return stream, total, MEDIA_TYPES[export_format]
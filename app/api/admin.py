@@ -0,0 +1,115 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from app.core.config import settings
+from app.schemas.admin import *
+
+def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    # ADMIN_TOKEN 이 설정되지 않은 환경에서는 관리자 API를 열지 않음
+    if not settings.admin_token or x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["관리자 API"],
+    dependencies=[Depends(require_admin)]
+)
+
+@router.post(
+    "/feedback-jobs",
+    response_model=FeedbackJobResponse,
+    status_code=202,
+    summary="포트폴리오 피드백 일괄 재생성 작업 시작 API"
+)
+def create_feedback_job_api(request: FeedbackJobCreateRequest):
+    from app.ai.feedback_job import claim_job, create_job, market_data_from_indicator, start_in_background
+
+    stale_before = None
+    if request.market_indicator_name:
+        resolved = market_data_from_indicator(request.market_indicator_name)
+        if resolved is None:
+            raise HTTPException(status_code=404, detail="해당 market_indicator가 존재하지 않습니다.")
+        market_data, indicator_updated_at = resolved
+        if request.only_stale:
+            stale_before = indicator_updated_at
+    elif request.market_data is not None:
+        market_data = request.market_data.model_dump()
+    else:
+        raise HTTPException(status_code=400, detail="market_indicator_name 또는 market_data가 필요합니다.")
+
+    selection = {"user_id": request.user_id, "portfolio_ids": request.portfolio_ids, "stale_before": stale_before}
+    job = claim_job(create_job(selection, market_data, request.concurrency)["job_id"])
+    start_in_background(job)
+    return job
+
+@router.get(
+    "/feedback-jobs/{jobId}",
+    response_model=FeedbackJobResponse,
+    summary="피드백 재생성 작업 진행 상황 조회 API"
+)
+def get_feedback_job_api(jobId: int):
+    from app.ai.feedback_job import get_job
+    job = get_job(jobId)
+    if job is None:
+        raise HTTPException(status_code=404, detail="해당 작업이 존재하지 않습니다.")
+    return job
+
+@router.post(
+    "/feedback-jobs/{jobId}/resume",
+    response_model=FeedbackJobResponse,
+    status_code=202,
+    summary="중단된 피드백 재생성 작업 재개 API"
+)
+def resume_feedback_job_api(jobId: int):
+    from app.ai.feedback_job import claim_job, get_job, start_in_background
+    job = claim_job(jobId)
+    if job is None:
+        if get_job(jobId, failures=0) is None:
+            raise HTTPException(status_code=404, detail="해당 작업이 존재하지 않습니다.")
+        raise HTTPException(status_code=409, detail="이미 완료되었거나 다른 프로세스에서 실행 중인 작업입니다.")
+    start_in_background(job)
+    return job
+
+@router.get(
+    "/openai-scheduler",
+    summary="OpenAI 호출 스케줄러 큐/한도 현황 조회 API"
+)
+def get_openai_scheduler_api():
+    from app.ai.scheduler import get_scheduler
+    return get_scheduler().metrics()
+
+@router.get(
+    "/recommendation-cache",
+    summary="자연어 추천 결과 캐시 현황 조회 API"
+)
+def get_recommendation_cache_api():
+    from app.ai.semantic_cache import get_semantic_cache
+    cache = get_semantic_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+@router.delete(
+    "/recommendation-cache",
+    status_code=204,
+    summary="자연어 추천 결과 캐시 비우기 API"
+)
+def clear_recommendation_cache_api():
+    from app.ai.semantic_cache import get_semantic_cache
+    cache = get_semantic_cache()
+    if cache:
+        cache.clear()
+
+@router.get(
+    "/reference-cache",
+    summary="참조 데이터(mbti, etf, market_indicator) 캐시 현황 조회 API"
+)
+def get_reference_cache_api():
+    from app.core.cache import cache_stats
+    return cache_stats()
+
+@router.delete(
+    "/reference-cache",
+    status_code=204,
+    summary="참조 데이터 캐시 비우기 API (임베딩/유사 ETF 배치 작업 후 호출)"
+)
+def clear_reference_cache_api(table: List[str] = Query(..., description="수정된 테이블 (예: etf, etf_similarity)")):
+    from app.core.cache import invalidate_tables
+    invalidate_tables(*table)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, Query
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from app.schemas.etf import *
 from app.crud.etf import *
-from app.ai.embed import query_recommend_etfs
-from app.ai.mbti import fetch_etf_mbti, recommend_etfs_adjusted_for_user
+from app.core.response import AppJSONResponse
+from app.core.http_cache import cache_headers, is_not_modified, not_modified_response
+from app.core.pagination import page_size_query, cursor_query, decode_cursor, split_page
+from app.core.config import settings
 
 router = APIRouter(
     prefix="/etfs",
@@ -14,29 +18,150 @@ router = APIRouter(
         response_model=ETFResponse,
         summary="개별 ETF 상세 정보 조회 API"
 )
-def get_etf_api(ticker: str):
-    etf = get_etf_by_ticker(ticker)
+def get_etf_api(
+        ticker: str,
+        request: Request,
+        fields: str = Query(None, description="응답 필드 (쉼표 구분, 예: ticker,category,nav_price)"),
+        include_vectors: bool = Query(False, alias="includeVectors", description="text_vector, mbti_vector 포함 여부"),
+):
+    requested = parse_etf_fields(fields, include_vectors)
+    # 캐시는 ticker별 두 가지 형태(벡터 제외/포함)만 두고, 요청 필드는 조회 후 잘라 냄
+    columns = tuple(column for column in ETF_COLUMNS if column in requested)
+
+    etf = get_etf_by_ticker(ticker, bool(requested.intersection(ETF_VECTOR_COLUMNS)))
     if not etf:
         raise HTTPException(status_code=404, detail="해당 ETF 데이터가 없습니다.")
-    return etf
+
+    headers = cache_headers(f"etf:{ticker}:{','.join(columns)}", etf.get("updated_at"), "etf")
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    # 요청한 필드만 그대로 응답 (response_model로 빈 필드를 채우지 않음)
+    body = {column: etf[column] for column in columns}
+    return AppJSONResponse(body, headers=headers)
+
+def parse_etf_fields(fields, include_vectors: bool) -> set:
+    """?fields= 값을 컬럼 집합으로 변환 (기본: 벡터 제외 전체, 벡터는 fields에 명시하거나 includeVectors=true)"""
+    if not fields:
+        requested = set(ETF_DEFAULT_COLUMNS)
+    else:
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested.difference(ETF_COLUMNS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"알 수 없는 필드입니다: {', '.join(sorted(unknown))}")
+    if include_vectors:
+        requested.update(ETF_VECTOR_COLUMNS)
+    return requested
+
+@router.get(
+    "/{ticker}/similar",
+    response_model=SimilarETFListResponse,
+    summary="유사 ETF 조회 API (사전 계산 목록)"
+)
+def get_similar_etfs_api(
+        ticker: str,
+        request: Request,
+        limit: int = Query(10, ge=1, le=SIMILAR_TOP_K, description="조회할 유사 ETF 수"),
+):
+    rows = get_similar_etfs(ticker, limit)
+    if not rows:
+        raise HTTPException(status_code=404, detail="해당 ETF의 유사 ETF 데이터가 없습니다.")
+
+    updated_at = max(row["updated_at"] for row in rows)
+    headers = cache_headers(f"etf_similar:{ticker}:{limit}", updated_at, "etf", len(rows))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    similar = [{"ticker": row["ticker"], "category": row["category"], "score": row["score"]} for row in rows]
+    return AppJSONResponse({"ticker": ticker, "similar": similar}, headers=headers)
+
+@router.get(
+    "/vectors/export",
+    summary="ETF 벡터 일괄 내보내기 API (npy tar / Arrow IPC 스트림)",
+    response_class=StreamingResponse,
+)
+def export_etf_vectors_api(
+        request: Request,
+        format: str = Query("npy", pattern="^(npy|arrow)$", description="npy (tar: manifest.json + .npy) 또는 arrow"),
+):
+    from app.ai.snapshot import get_snapshot
+    from app.ai.vector_export import EXTENSIONS, export_stream, export_version
+
+    snapshot = get_snapshot()
+    headers = cache_headers(f"etf_vectors:{format}", snapshot.updated_at, "etf", len(snapshot))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    try:
+        stream, total, media_type = export_stream(snapshot, format)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Arrow 내보내기는 pyarrow 설치가 필요합니다.")
+
+    headers["Content-Disposition"] = f'attachment; filename="etf-vectors-{export_version(snapshot)}.{EXTENSIONS[format]}"'
+    if total is not None:
+        headers["Content-Length"] = str(total)
+    return StreamingResponse(stream, media_type=media_type, headers=headers)
 
 @router.get(
     "/search",
     response_model=SearchETFResponse,
     summary="ETF 검색 API"
 )
-def search_etfs_api(keyword: str = Query(..., description="검색할 키워드")):
-    results = search_etfs(keyword)
-    return {"data": results}
+def search_etfs_api(
+        keyword: str = Query(..., description="검색할 키워드"),
+        cursor: str = cursor_query(),
+        limit: int = page_size_query(6),
+):
+    after = decode_cursor(cursor, "etf_search")
+    results = search_etfs(keyword, limit + 1, after[0] if after else "")
+    page, next_cursor = split_page(results, limit, "etf_search", "ticker")
+    return AppJSONResponse({"data": page, "next_cursor": next_cursor})
+
+def recommendation_filters(
+        category: List[str] = Query(None, description="카테고리 (여러 개면 반복, 예: category=Technology&category=Health)"),
+        min_pe: float = Query(None, alias="minPe", description="trailing_pe 최소"),
+        max_pe: float = Query(None, alias="maxPe", description="trailing_pe 최대"),
+        min_dividend_yield: float = Query(None, alias="minDividendYield", description="trailing_annual_dividend_yield 최소"),
+        max_dividend_yield: float = Query(None, alias="maxDividendYield", description="trailing_annual_dividend_yield 최대"),
+        min_beta: float = Query(None, alias="minBeta", description="beta_3year 최소"),
+        max_beta: float = Query(None, alias="maxBeta", description="beta_3year 최대"),
+        min_total_assets: float = Query(None, alias="minTotalAssets", description="total_assets 최소"),
+        max_total_assets: float = Query(None, alias="maxTotalAssets", description="total_assets 최대"),
+        min_return_3y: float = Query(None, alias="minReturn3y", description="three_year_average_return 최소"),
+        max_return_3y: float = Query(None, alias="maxReturn3y", description="three_year_average_return 최대"),
+        min_return_5y: float = Query(None, alias="minReturn5y", description="five_year_average_return 최소"),
+        max_return_5y: float = Query(None, alias="maxReturn5y", description="five_year_average_return 최대"),
+) -> dict:
+    """추천 검색 필터 쿼리 -> {"categories": [...], "ranges": {컬럼: (최소, 최대)}}"""
+    ranges = {
+        "trailing_pe": (min_pe, max_pe),
+        "trailing_annual_dividend_yield": (min_dividend_yield, max_dividend_yield),
+        "beta_3year": (min_beta, max_beta),
+        "total_assets": (min_total_assets, max_total_assets),
+        "three_year_average_return": (min_return_3y, max_return_3y),
+        "five_year_average_return": (min_return_5y, max_return_5y),
+    }
+    for column, (low, high) in ranges.items():
+        if low is not None and high is not None and low > high:
+            raise HTTPException(status_code=400, detail=f"{column} 최소값이 최대값보다 큽니다.")
+    return {"categories": category, "ranges": ranges}
 
 @router.get(
     "/recommendation",
     response_model=RecommendETFListResponse,
     summary="(자연어) 추천 ETF 리스트 조회 API"
 )
-def recommend_etfs_api(query: str = Query(..., description="사용자 쿼리")):
-    results = query_recommend_etfs(query)
-    return RecommendETFListResponse(recommendations=results)
+def recommend_etfs_api(
+        query: str = Query(..., description="사용자 쿼리"),
+        mode: str = Query("auto", pattern="^(auto|hybrid|lexical|vector)$",
+                          description="검색 방식 (auto: 키워드형 쿼리는 lexical, 그 외 hybrid)"),
+        filters: dict = Depends(recommendation_filters),
+):
+    from app.ai.embed import query_recommend_etfs
+    from app.ai.resilience import openai_deadline, track_degradation
+    with openai_deadline(settings.ai_route_deadline), track_degradation() as degraded:
+        results = query_recommend_etfs(query, mode=mode, filters=filters)
+    return RecommendETFListResponse(recommendations=results, degraded=bool(degraded))
 
 @router.post(
     "/recommendation/initial",
@@ -47,6 +172,20 @@ def recommend_initial_etfs_api(
         userId: str = Query(..., description="사용자 ID"),
         portfolioId: str = Query(..., description="포트폴리오 ID"),
 ):
+    from app.ai.mbti import fetch_etf_mbti, recommend_etfs_adjusted_for_user
     etf_data = fetch_etf_mbti()
     results = recommend_etfs_adjusted_for_user(userId, etf_data, portfolioId)
     return RecommendInitialETFResponse(etfs=results)
+
+@router.post(
+    "/recommendation/initial/batch",
+    response_model=RecommendInitialBatchResponse,
+    summary="추천 투자종목 최초구성 일괄 API (여러 사용자/포트폴리오)"
+)
+def recommend_initial_etfs_batch_api(request: RecommendInitialBatchRequest):
+    from app.ai.mbti import recommend_etfs_adjusted_for_users
+    targets = [(target.user_id, target.portfolio_id) for target in request.targets]
+    etfs = recommend_etfs_adjusted_for_users(targets, top_n=request.top_n)
+    results = [{"user_id": user_id, "portfolio_id": portfolio_id, "etfs": tickers}
+               for (user_id, portfolio_id), tickers in zip(targets, etfs)]
+    return AppJSONResponse({"results": results})
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from app.core.response import AppJSONResponse
+from app.core.warmup import state
+
+router = APIRouter(
+    prefix="/health",
+    tags=["상태 확인 API"]
+)
+
+@router.get(
+    "/live",
+    summary="프로세스 생존 확인 API"
+)
+def liveness_api():
+    return {"status": "ok"}
+
+@router.get(
+    "/ready",
+    summary="워밍업 완료 여부 확인 API"
+)
+def readiness_api():
+    # 워밍업(ETF 카탈로그/벡터 로드)이 끝나기 전에는 503으로 트래픽을 받지 않음
+    return AppJSONResponse(state.as_dict(), status_code=200 if state.ready else 503)
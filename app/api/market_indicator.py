@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.schemas.market_indicator import MarketIndicatorResponse, MarketIndicatorsResponse
 from app.crud.market_indicator import get_market_indicator_by_name, get_market_indicators
+from app.core.response import AppJSONResponse
+from app.core.http_cache import cache_headers, is_not_modified, not_modified_response
+from app.core.pagination import optional_page_size_query, cursor_query, decode_cursor, resolve_page_size, split_page
 
 router = APIRouter(
     prefix="/markets",
@@ -12,22 +15,40 @@ router = APIRouter(
     response_model=MarketIndicatorResponse,
     summary="시장 지표 조회 API"
 )
-def get_market_indicator_api(name: str):
+def get_market_indicator_api(name: str, request: Request):
     market_data = get_market_indicator_by_name(name)
 
     if not market_data:
         raise HTTPException(status_code=404, detail="해당 시장 지표 데이터가 없습니다.")
 
-    return market_data
+    headers = cache_headers(f"markets:{name}", market_data["updated_at"], "markets")
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    return AppJSONResponse(market_data, headers=headers)
 
 @router.get(
     "",
     response_model=MarketIndicatorsResponse,
     summary="시장 지표 전체 조회 API")
-def get_markets_api():
+def get_markets_api(request: Request, cursor: str = cursor_query(), limit: int = optional_page_size_query()):
+    # 지표 목록은 작으므로 전체를 한 번만 캐시하고 페이지는 커서 이후에서 잘라 냄 (캐시 키가 커서별로 늘지 않음)
+    after = decode_cursor(cursor, "markets")
     market_data = get_market_indicators()
 
     if not market_data:
         raise HTTPException(status_code=404, detail="시장 지표 데이터가 없습니다.")
 
-    return {"data": market_data}
+    # cursor/limit 을 모두 생략한 기존 클라이언트에는 전체 목록
+    page_size = resolve_page_size(cursor, limit)
+    rows = [row for row in market_data if row["market_indicator_id"] > after[0]] if after else market_data
+    page, next_cursor = (rows, None) if page_size is None else \
+        split_page(rows, page_size, "markets", "market_indicator_id")
+
+    # 행 삭제도 ETag에 반영되도록 개수 포함 (페이지별로 구분되도록 커서/크기 포함)
+    updated_at = max(row["updated_at"] for row in market_data)
+    headers = cache_headers(f"markets:{cursor or ''}:{page_size or ''}", updated_at, "markets", len(market_data))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    return AppJSONResponse({"data": page, "next_cursor": next_cursor}, headers=headers)
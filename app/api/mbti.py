@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.schemas.mbti import MbtiResponse
 from app.crud.mbti import get_mbti_etfs
+from app.core.response import AppJSONResponse
+from app.core.http_cache import cache_headers, is_not_modified, not_modified_response
 
 router = APIRouter(
     prefix="/mbti",
@@ -12,8 +14,15 @@ router = APIRouter(
     response_model=MbtiResponse,
     summary="MBTI 별 추천 ETF 조회 API"
 )
-def get_mbti_etfs_api(mbtiCode: str):
+def get_mbti_etfs_api(mbtiCode: str, request: Request):
     mbti = get_mbti_etfs(mbtiCode)
     if not mbti:
         raise HTTPException(status_code=404, detail="해당 MBTI 데이터가 없습니다.")
-    return mbti
+
+    # 캐시된 행의 updated_at으로 검증값을 만들어야 본문과 ETag가 어긋나지 않음
+    headers = cache_headers(f"mbti:{mbtiCode}", mbti["updated_at"], "mbti")
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    body = {key: value for key, value in mbti.items() if key != "updated_at"}
+    return AppJSONResponse(body, headers=headers)
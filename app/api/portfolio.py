@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Query, Body
-from app.ai.revision import generate_feedback
+from fastapi import APIRouter, Query, Body, Response
 from app.crud.portfolio import *
 from app.schemas.portfolio import *
+from app.core.response import AppJSONResponse
+from app.core.pagination import optional_page_size_query, cursor_query, decode_cursor, resolve_page_size
+from app.core.config import settings
 
 router = APIRouter(
     prefix="/portfolios",
@@ -26,13 +28,15 @@ def create_portfolio_api(request: PortfolioCreateRequest):
     response_model=PortfolioLogsResponse,
     summary="특정 context_id에 대한 포트폴리오 로그 조회 API"
 )
-def get_portfolio_logs_api(contextId: int):
-    logs = get_portfolio_logs(contextId)
+def get_portfolio_logs_api(contextId: int, cursor: str = cursor_query(), limit: int = optional_page_size_query()):
+    # revision의 JSON 컬럼을 디코딩/재직렬화하지 않고 그대로 응답 (revision_id 내림차순 키셋 페이지, cursor/limit 모두 생략 시 전체)
+    before = decode_cursor(cursor, LOGS_CURSOR_SCOPE)
+    body = get_portfolio_logs_json(contextId, before[0] if before else None, resolve_page_size(cursor, limit))
 
-    if logs.name is None and not logs.data:
+    if body is None:
         raise HTTPException(status_code=404, detail="해당 context_id에 대한 포트폴리오 로그 데이터가 없습니다.")
 
-    return logs
+    return Response(content=body, media_type="application/json")
 
 @router.put(
     "/{portfolioId}/custom",
@@ -78,17 +82,21 @@ def decision_portfolio_api(contextId: int, request: DecisionPortfolioRequest):
     response_model=FeedbackPortfolioResponse,
     summary="사용자 포트폴리오 피드백 생성 API"
 )
-async def create_feedback_api(
+def create_feedback_api(
     portfolioId: int,
     user_id: int = Query(..., alias="userId", description="사용자 ID"),
     market_data: MarketData = Body(..., description="시장 데이터")
 ):
     print("==== Received market_data ====")
     print(market_data.dict())
-    feedback, ai_etfs = generate_feedback(portfolioId, user_id, market_data)
+    from app.ai.revision import generate_feedback
+    from app.ai.resilience import openai_deadline, track_degradation
+    with openai_deadline(settings.ai_route_deadline), track_degradation() as degraded:
+        feedback, ai_etfs = generate_feedback(portfolioId, user_id, market_data)
     if feedback is None:
         raise HTTPException(status_code=404, detail="해당 feedback이 존재하지 않습니다.")
-    return FeedbackPortfolioResponse(feedback=feedback, ai_etfs=ai_etfs, market_data=market_data)
+    return FeedbackPortfolioResponse(feedback=feedback, ai_etfs=ai_etfs, market_data=market_data,
+                                     degraded=bool(degraded))
 
 @router.put(
     "/{portfolioId}/etfs",
@@ -101,4 +109,62 @@ def update_portfolio_etfs_api(portfolioId: int, request: UpdatePortfolioEtfsRequ
     if response is None:
         raise HTTPException(status_code=404, detail="해당 portfolioId가 존재하지 않습니다.")
 
-    return response
+    return AppJSONResponse(response)
+
+@router.get(
+    "/{portfolioId}/analytics",
+    response_model=PortfolioAnalyticsResponse,
+    summary="포트폴리오 분석 API (가중 지표, 카테고리 비중, 집중도)"
+)
+def get_portfolio_analytics_api(
+        portfolioId: int,
+        revision_id: Optional[int] = Query(None, alias="revisionId", description="분석할 revision ID (기본: 최신)"),
+):
+    from app.ai.analytics import analyze_portfolio
+    result = analyze_portfolio(portfolioId, revision_id)
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="해당 포트폴리오의 revision이 존재하지 않습니다.")
+
+    return AppJSONResponse(result)
+
+@router.get(
+    "/{portfolioId}/backtest",
+    response_model=PortfolioBacktestResponse,
+    summary="포트폴리오 백테스트 API (로컬 가격 데이터, 사용자 리밸런싱 주기)"
+)
+def get_portfolio_backtest_api(
+        portfolioId: int,
+        years: Optional[float] = Query(None, gt=0, le=30, description="백테스트 기간 (기본: 사용자 투자 기간)"),
+        rebalancing_months: Optional[int] = Query(None, alias="rebalancingMonths", ge=0, le=60,
+                                                  description="리밸런싱 주기 개월 (기본: 사용자 설정, 0은 리밸런싱 없음)"),
+):
+    from app.ai.backtest import backtest_portfolio
+    try:
+        result = backtest_portfolio(portfolioId, years, rebalancing_months)
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="백테스트용 가격 데이터가 없습니다.")
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="해당 포트폴리오의 revision이 존재하지 않습니다.")
+
+    return AppJSONResponse(result)
+
+@router.get(
+    "/{portfolioId}/projection",
+    response_model=PortfolioProjectionResponse,
+    summary="목표 달성 몬테카를로 시뮬레이션 API"
+)
+def get_portfolio_projection_api(
+        portfolioId: int,
+        paths: int = Query(20000, ge=1000, le=100000, description="시뮬레이션 경로 수"),
+        monthly_contribution: float = Query(0, alias="monthlyContribution", ge=0, description="월 적립 금액"),
+        seed: Optional[int] = Query(None, description="난수 시드 (재현용)"),
+):
+    from app.ai.projection import project_portfolio
+    result = project_portfolio(portfolioId, paths, monthly_contribution, seed)
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="해당 포트폴리오의 revision이 존재하지 않습니다.")
+
+    return AppJSONResponse(result)
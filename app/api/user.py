@@ -2,6 +2,8 @@ from fastapi import APIRouter, Query, HTTPException
 from typing import List
 from app.schemas.user import UserResponse, UserLog
 from app.crud.user import get_user_by_id, get_user_logs
+from app.core.response import AppJSONResponse
+from app.core.pagination import optional_page_size_query, cursor_query, decode_cursor, resolve_page_size, split_page
 
 router = APIRouter(
     prefix="/users",
@@ -17,12 +19,24 @@ def get_user_api(userId: int):
     user = get_user_by_id(userId)
     if not user:
         raise HTTPException(status_code=404, detail="해당 사용자 정보가 없습니다.")
-    return user
+    return AppJSONResponse(user)
 
 @router.get(
     "/mypage/logs",
     response_model=List[UserLog],
     summary="사용자 context 리스트 조회 API"
 )
-def get_user_logs_api(userId: int = Query(..., description="사용자 ID")):
-    return get_user_logs(userId)
+def get_user_logs_api(
+        userId: int = Query(..., description="사용자 ID"),
+        cursor: str = cursor_query(),
+        limit: int = optional_page_size_query(),
+):
+    # 응답 본문이 리스트이므로 다음 페이지 커서는 X-Next-Cursor 헤더로 전달 (cursor/limit 모두 생략 시 전체)
+    after = decode_cursor(cursor, "user_logs")
+    page_size = resolve_page_size(cursor, limit)
+    logs = get_user_logs(userId, after[0] if after else 0, None if page_size is None else page_size + 1)
+    page, next_cursor = [log.model_dump() for log in logs], None
+    if page_size is not None:
+        page, next_cursor = split_page(page, page_size, "user_logs", "context_id")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return AppJSONResponse(page, headers=headers)
@@ -0,0 +1,165 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+
+# 참조 데이터(mbti, etf, market_indicator) 캐시 기본값 (초)
+# soft TTL이 지나면 기존 값을 응답하면서 백그라운드로 갱신, hard TTL이 지나면 호출자가 직접 다시 조회
+REFERENCE_CACHE_TTL = settings.reference_cache_ttl
+REFERENCE_CACHE_SOFT_TTL = settings.reference_cache_soft_ttl
+# 캐시별 최대 키 수 (넘으면 가장 오래 쓰이지 않은 키부터 제거) - 키가 URL에서 오므로 상한 필요
+REFERENCE_CACHE_MAX_ENTRIES = settings.reference_cache_max_entries
+# 키별 락 대신 키 해시로 고르는 고정 개수 락 (요청된 키마다 락이 쌓이지 않음)
+LOCK_STRIPES = 64
+
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+_caches = {}
+
+def _is_empty(value) -> bool:
+    return value is None or (hasattr(value, "__len__") and len(value) == 0)
+
+class _Entry:
+    __slots__ = ("value", "soft_expires_at", "expires_at")
+
+    def __init__(self, value, soft_ttl, ttl):
+        now = time.monotonic()
+        self.value = value
+        self.soft_expires_at = now + soft_ttl
+        self.expires_at = now + ttl
+
+class ReadThroughCache:
+    """
+    키별 TTL + soft 만료 백그라운드 갱신 + 키 해시별 락(LOCK_STRIPES 개)을 가진 read-through 캐시
+    만료된 키는 한 호출자만 다시 채우고 나머지는 그 결과를 기다림 (stampede 방지)
+    키 수는 max_entries 로 제한 (LRU)
+    """
+    def __init__(self, name: str, tables, ttl: float, soft_ttl: float,
+                 max_entries: int = REFERENCE_CACHE_MAX_ENTRIES):
+        self.name = name
+        self.tables = set(tables)
+        self.ttl = ttl
+        self.soft_ttl = min(soft_ttl, ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._guard = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def _lock_for(self, key) -> threading.Lock:
+        return self._locks[hash(key) % LOCK_STRIPES]
+
+    def _store(self, key, entry):
+        with self._guard:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _touch(self, key):
+        with self._guard:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def _load(self, key, loader):
+        generation = self._generation
+        value = loader()
+        # 빈 결과(없는 키, 조회 오류로 인한 [])는 저장하지 않고, 조회 중 invalidate가 호출됐다면 이전 값도 저장하지 않음
+        if not _is_empty(value) and generation == self._generation:
+            self._store(key, _Entry(value, self.soft_ttl, self.ttl))
+        return value
+
+    def _refresh(self, key, loader):
+        lock = self._lock_for(key)
+        if not lock.acquire(blocking=False):
+            return  # 같은 락을 쓰는 키가 이미 갱신 중 (다음 soft 만료 적중 때 다시 시도)
+        try:
+            self.refreshes += 1
+            self._load(key, loader)
+        except Exception as e:
+            print(f"[cache:{self.name}] 백그라운드 갱신 실패 {key}: {e}")
+        finally:
+            lock.release()
+
+    def get(self, key, loader):
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and now < entry.expires_at:
+            self.hits += 1
+            self._touch(key)
+            if now >= entry.soft_expires_at:
+                _refresh_executor.submit(self._refresh, key, loader)
+            return entry.value
+
+        with self._lock_for(key):
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry.expires_at:
+                self.hits += 1
+                self._touch(key)
+                return entry.value
+            self.misses += 1
+            return self._load(key, loader)
+
+    def invalidate(self, key=None):
+        with self._guard:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses,
+                "refreshes": self.refreshes, "evictions": self.evictions}
+
+def cached(name: str, tables, ttl: float = REFERENCE_CACHE_TTL, soft_ttl: float = REFERENCE_CACHE_SOFT_TTL,
+           max_entries: int = REFERENCE_CACHE_MAX_ENTRIES):
+    """
+    CRUD 조회 함수에 read-through 캐시를 적용하는 데코레이터
+    캐시 키는 기본값까지 채운 인자 튜플 (f(t), f(t, False), f(ticker=t) 는 같은 키)
+    반환값은 캐시에 공유되므로 호출자는 수정하지 말 것
+    """
+    def decorator(func):
+        cache = _caches[name] = ReadThroughCache(name, tables, ttl, soft_ttl, max_entries)
+        signature = inspect.signature(func)
+
+        def bind(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return bound
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = bind(*args, **kwargs)
+            return cache.get(tuple(bound.arguments.values()), lambda: func(*bound.args, **bound.kwargs))
+
+        cache.make_key = lambda *args, **kwargs: tuple(bind(*args, **kwargs).arguments.values())
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+def invalidate(name: str, *args, **kwargs):
+    """특정 캐시의 키(인자 생략 시 전체) 무효화 - 인자는 캐시된 함수 호출과 같은 형태"""
+    cache = _caches.get(name)
+    if cache is not None:
+        cache.invalidate(cache.make_key(*args, **kwargs) if args or kwargs else None)
+
+def invalidate_tables(*tables: str):
+    """
+    주어진 테이블에서 읽는 모든 캐시 무효화 (현재 프로세스)
+    쓰기 경로(embedding_pipeline.write_vectors, similarity.save_results)에서 호출
+    별도 프로세스에서 실행한 배치 작업 뒤에는 DELETE /admin/reference-cache 로 비우거나 TTL 만료를 기다림
+    """
+    for cache in _caches.values():
+        if cache.tables.intersection(tables):
+            cache.invalidate()
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
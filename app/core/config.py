@@ -1,21 +1,80 @@
-import pymysql
 import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 
-# .env 파일 로드
-env_file = ".env"
-load_dotenv(env_file)
-
-# 환경 변수에서 DB 설정 불러오기
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "port": int(os.getenv("DB_PORT")),
-    "cursorclass": pymysql.cursors.DictCursor  # 결과를 딕셔너리 형태로 반환
-}
-
-# DB 연결 함수
-def get_connection():
-    return pymysql.connect(**DB_CONFIG)
+# .env 파일은 여기서 한 번만 로드 (프로젝트 루트 기준)
+env_path = Path(__file__).resolve().parents[2] / ".env"
+load_dotenv(dotenv_path=env_path)
+
+def _env(name: str, default: Optional[str] = None):
+    return field(default_factory=lambda: os.getenv(name, default))
+
+def _env_float(name: str, default: str):
+    return field(default_factory=lambda: float(os.getenv(name, default)))
+
+def _env_int(name: str, default: str):
+    return field(default_factory=lambda: int(os.getenv(name, default)))
+
+@dataclass(frozen=True)
+class Settings:
+    """앱 전체 환경 설정 (DB, OpenAI, 캐시, 벡터 스냅샷, 워밍업, 백테스트 가격 데이터, 관리자 API, 페이지네이션)"""
+    env: Optional[str] = _env("ENV")
+    api_url: Optional[str] = _env("API_URL")
+    web_url: Optional[str] = _env("WEB_URL")
+
+    # DB 설정
+    db_host: Optional[str] = _env("DB_HOST")
+    db_user: Optional[str] = _env("DB_USER")
+    db_password: Optional[str] = _env("DB_PASSWORD")
+    db_name: Optional[str] = _env("DB_NAME")
+    db_port: int = _env_int("DB_PORT", "3306")
+
+    # OpenAI 설정 (호출 한도: "모델=RPM:TPM,..." 형식, 재시도는 스케줄러가 담당)
+    gpt_api_key: Optional[str] = _env("GPT_API_KEY")
+    openai_rate_limits: Optional[str] = _env("OPENAI_RATE_LIMITS")
+    openai_max_retries: int = _env_int("OPENAI_MAX_RETRIES", "6")
+    openai_call_timeout: float = _env_float("OPENAI_CALL_TIMEOUT", "20")
+    openai_breaker_failures: int = _env_int("OPENAI_BREAKER_FAILURES", "5")
+    openai_breaker_cooldown: float = _env_float("OPENAI_BREAKER_COOLDOWN", "30")
+    # AI 의존 API 라우트의 OpenAI 호출 전체 기한 (초과 시 대체 결과로 응답)
+    ai_route_deadline: float = _env_float("AI_ROUTE_DEADLINE", "25")
+
+    # 참조 데이터 캐시 (초)
+    reference_cache_ttl: float = _env_float("REFERENCE_CACHE_TTL", "3600")
+    reference_cache_soft_ttl: float = _env_float("REFERENCE_CACHE_SOFT_TTL", "600")
+    reference_cache_max_entries: int = _env_int("REFERENCE_CACHE_MAX_ENTRIES", "1024")
+
+    # 멀티 워커 ETF 벡터 스냅샷
+    vector_snapshot_dir: Optional[str] = _env("VECTOR_SNAPSHOT_DIR")
+    vector_snapshot_check_interval: float = _env_float("VECTOR_SNAPSHOT_CHECK_INTERVAL", "5")
+    # 0보다 크면 앱이 이 주기(초)로 스냅샷을 다시 생성 (워커 중 하나만)
+    vector_snapshot_refresh_seconds: float = _env_float("SNAPSHOT_REFRESH_SECONDS", "0")
+
+    # 자연어 추천 벡터 근사 검색 (차원 축소/int8 후 상위 후보만 정확 재정렬) - 둘 다 끄면 전체 정확 계산
+    vector_search_dims: int = _env_int("VECTOR_SEARCH_DIMS", "0")
+    vector_search_method: str = _env("VECTOR_SEARCH_METHOD", "matryoshka")
+    vector_search_int8: bool = field(default_factory=lambda: os.getenv("VECTOR_SEARCH_INT8", "false").lower() == "true")
+    vector_search_rerank: int = _env_int("VECTOR_SEARCH_RERANK", "100")
+
+    # 자연어 추천 결과 캐시 (질의 임베딩 코사인이 threshold 이상이면 재사용, 크기 0이면 사용 안 함)
+    semantic_cache_size: int = _env_int("SEMANTIC_CACHE_SIZE", "1024")
+    semantic_cache_threshold: float = _env_float("SEMANTIC_CACHE_THRESHOLD", "0.93")
+    semantic_cache_ttl: float = _env_float("SEMANTIC_CACHE_TTL", "3600")
+
+    # 기동 시 워밍업 (ETF 카탈로그/벡터 미리 로드)
+    warmup_enabled: bool = field(default_factory=lambda: os.getenv("WARMUP_ENABLED", "true").lower() == "true")
+    warmup_retry_interval: float = _env_float("WARMUP_RETRY_INTERVAL", "5")
+
+    # 백테스트 가격 데이터 (CSV/Parquet 디렉터리)
+    price_data_dir: Optional[str] = _env("PRICE_DATA_DIR")
+
+    # 관리자 API (X-Admin-Token 헤더) - 설정하지 않으면 관리자 API 비활성화
+    admin_token: Optional[str] = _env("ADMIN_TOKEN")
+
+    # 목록 API 페이지 크기
+    page_size_default: int = _env_int("PAGE_SIZE_DEFAULT", "50")
+    page_size_max: int = _env_int("PAGE_SIZE_MAX", "200")
+
+settings = Settings()
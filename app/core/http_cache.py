@@ -0,0 +1,66 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+# 라우트별 Cache-Control 정책 (CDN/모바일 클라이언트는 만료 후 ETag로 재검증)
+CACHE_CONTROL = {
+    "mbti": "public, max-age=3600, stale-while-revalidate=86400",
+    "markets": "public, max-age=300, stale-while-revalidate=3600",
+    "etf": "public, max-age=3600, stale-while-revalidate=86400",
+}
+
+def _to_utc(value: datetime.datetime) -> datetime.datetime:
+    """DB의 naive datetime은 UTC로 간주"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+def cache_headers(key: str, last_modified: Optional[datetime.datetime], policy: str, *version) -> dict:
+    """
+    updated_at 기반 ETag / Last-Modified / Cache-Control 헤더 생성
+    key는 리소스 식별자, version은 행 수 등 updated_at 외에 응답을 바꾸는 값
+    """
+    headers = {"Cache-Control": CACHE_CONTROL[policy]}
+    if last_modified is None:
+        return headers
+
+    last_modified = _to_utc(last_modified)
+    digest = hashlib.sha1(
+        "|".join([key, last_modified.isoformat(), *map(str, version)]).encode("utf-8")
+    ).hexdigest()[:20]
+    headers["ETag"] = f'W/"{digest}"'
+    headers["Last-Modified"] = format_datetime(last_modified.replace(microsecond=0), usegmt=True)
+    return headers
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def is_not_modified(request: Request, headers: dict) -> bool:
+    """If-None-Match 우선, 없으면 If-Modified-Since로 클라이언트 사본이 최신인지 판단"""
+    etag = headers.get("ETag")
+    if etag is None:
+        return False
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _strip_weak(etag) in {_strip_weak(tag) for tag in if_none_match.split(",")}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = _to_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(headers["Last-Modified"]) <= since
+
+    return False
+
+def not_modified_response(headers: dict) -> Response:
+    """본문 없이 304 응답"""
+    return Response(status_code=304, headers=headers)
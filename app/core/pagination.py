@@ -0,0 +1,54 @@
+import base64
+import json
+
+from fastapi import HTTPException, Query
+
+from app.core.config import settings
+
+# --- 키셋(keyset) 페이지네이션 ---
+# 커서는 "마지막으로 내려준 행의 정렬 키"를 base64url로 감싼 불투명 토큰
+# 다음 페이지는 OFFSET 없이 WHERE key > 커서 (또는 <) 로 인덱스 범위만 읽으므로 이력 길이와 무관하게 O(page)
+
+def page_size_query(default: int = None):
+    """라우터용 limit 쿼리 파라미터 (기본값/최대값은 설정값)"""
+    return Query(default or settings.page_size_default, ge=1, le=settings.page_size_max, description="페이지 크기")
+
+def optional_page_size_query():
+    """limit 쿼리 파라미터 (생략 가능) - 원래 전체 목록을 주던 API용, resolve_page_size 와 함께 사용"""
+    return Query(None, ge=1, le=settings.page_size_max, description="페이지 크기 (cursor/limit 모두 생략 시 전체)")
+
+def resolve_page_size(cursor, limit):
+    """cursor와 limit을 모두 생략하면 None (기존 클라이언트용 전체 목록), 커서만 주면 기본 페이지 크기"""
+    if cursor is None and limit is None:
+        return None
+    return limit or settings.page_size_default
+
+def cursor_query():
+    return Query(None, description="이전 응답의 next_cursor (첫 페이지는 생략)")
+
+def encode_cursor(scope: str, *values) -> str:
+    payload = json.dumps([scope, *values], separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def decode_cursor(token, scope: str, size: int = 1):
+    """커서를 정렬 키 리스트로 복원 (없으면 None). 다른 API의 커서거나 손상된 경우 400"""
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        payload = None
+    if not isinstance(payload, list) or len(payload) != size + 1 or payload[0] != scope:
+        raise HTTPException(status_code=400, detail="유효하지 않은 cursor 입니다.")
+    return payload[1:]
+
+def split_page(rows, limit: int, scope: str, *key_columns):
+    """
+    limit + 1 행으로 조회한 결과를 (현재 페이지, next_cursor) 로 분리
+    다음 행이 없으면 next_cursor는 None
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(scope, *(last[column] for column in key_columns))
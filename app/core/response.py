@@ -0,0 +1,33 @@
+import datetime
+import decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def json_default(obj):
+    """orjson/json이 기본으로 처리하지 못하는 타입 변환 (Decimal, numpy, Pydantic 모델 등)"""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # numpy 배열/스칼라 (numpy를 import하지 않고 처리)
+        return obj.tolist()
+    raise TypeError(f"Type not serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """앱 공통 JSON 직렬화 (orjson 기반)"""
+    return orjson.dumps(content, default=json_default, option=ORJSON_OPTIONS)
+
+class AppJSONResponse(JSONResponse):
+    """
+    orjson으로 직렬화하는 앱 기본 응답 클래스
+    CRUD 결과(dict, Decimal, datetime, numpy)를 그대로 넘기면 response_model 재검증 없이 바로 직렬화됨
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
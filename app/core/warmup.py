@@ -0,0 +1,77 @@
+import threading
+import time
+
+class WarmupState:
+    """기동 워밍업 진행 상태 (readiness 판단용)"""
+    def __init__(self):
+        self.ready = False
+        self.started_at = None
+        self.finished_at = None
+        self.attempts = 0
+        self.last_error = None
+        self.steps = {}
+
+    def as_dict(self) -> dict:
+        duration = None
+        if self.started_at is not None and self.finished_at is not None:
+            duration = round(self.finished_at - self.started_at, 3)
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "duration_seconds": duration,
+            "steps": self.steps,
+            "last_error": self.last_error,
+        }
+
+state = WarmupState()
+
+def _step(name, func):
+    started = time.perf_counter()
+    func()
+    state.steps[name] = round(time.perf_counter() - started, 3)
+
+def _load_ai_stack():
+    # numpy/openai를 포함한 AI 모듈 import 및 OpenAI 클라이언트 생성
+    import app.ai.ai
+    import app.ai.embed
+    import app.ai.mbti
+    import app.ai.revision
+    from app.ai.config import get_client
+    get_client()
+
+def _load_etf_catalog():
+    # ETF 벡터 스냅샷(text_vector/mbti_vector) 미리 로드 - 멀티 워커 모드에서는 공유 mmap 페이지를 미리 읽음
+    from app.ai.snapshot import get_snapshot
+    snapshot = get_snapshot()
+    float(snapshot.text_norms.sum())
+
+def _load_reference_data():
+    from app.crud.market_indicator import get_market_indicators
+    get_market_indicators()
+
+def run_warmup(retry_interval: float, stop_event: threading.Event = None, max_attempts: int = None):
+    """성공할 때까지(또는 max_attempts회까지) 워밍업을 재시도 (DB가 늦게 뜨는 경우 대비)"""
+    state.started_at = time.perf_counter()
+    while not state.ready and not (stop_event and stop_event.is_set()):
+        if max_attempts is not None and state.attempts >= max_attempts:
+            break
+        state.attempts += 1
+        try:
+            _step("ai_stack", _load_ai_stack)
+            _step("etf_catalog", _load_etf_catalog)
+            _step("reference_data", _load_reference_data)
+            state.finished_at = time.perf_counter()
+            state.last_error = None
+            state.ready = True
+            print(f"[warmup] 완료: {state.as_dict()}")
+        except Exception as e:
+            state.last_error = str(e)
+            print(f"[warmup] 실패 (재시도 {retry_interval}s 후): {e}")
+            if stop_event:
+                stop_event.wait(retry_interval)
+            else:
+                time.sleep(retry_interval)
+
+def mark_ready():
+    """워밍업을 끈 경우 즉시 ready 처리"""
+    state.ready = True
@@ -1,33 +1,71 @@
 from app.db.connection import get_connection
+from app.core.cache import cached
 import pymysql
 
-def get_etf_by_ticker(ticker: str):
+# etf 테이블 컬럼 (응답 필드 순서)
+ETF_COLUMNS = (
+    "ticker", "long_business_summary", "category", "trailing_pe", "trailing_annual_dividend_yield", "beta_3year",
+    "total_assets", "three_year_average_return", "five_year_average_return", "nav_price",
+    "text_vector", "mbti_vector", "mbti_code", "created_at", "updated_at",
+)
+# 1536차원 문자열 임베딩 등 - 명시적으로 요청한 경우에만 조회
+ETF_VECTOR_COLUMNS = ("text_vector", "mbti_vector")
+ETF_DEFAULT_COLUMNS = tuple(column for column in ETF_COLUMNS if column not in ETF_VECTOR_COLUMNS)
+ETF_BY_TICKER_SQL = "SELECT {} FROM etf WHERE ticker = %s"
+ETF_DEFAULT_SQL = ETF_BY_TICKER_SQL.format(", ".join(ETF_DEFAULT_COLUMNS))
+ETF_WITH_VECTORS_SQL = ETF_BY_TICKER_SQL.format(", ".join(ETF_COLUMNS))
+
+@cached("etf", tables=("etf",))
+def get_etf_by_ticker(ticker: str, include_vectors: bool = False):
+    """
+    ETF 한 행 조회 - 벡터 제외 전체 컬럼 또는 벡터 포함 전체 컬럼 (ticker당 캐시 항목은 최대 2개)
+    ?fields= 필드 선택은 라우터에서 조회 결과를 잘라 냄
+    """
     conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            sql = """
-            SELECT 
-                *
-            FROM etf 
-            WHERE ticker = %s
-            """
-            cursor.execute(sql, (ticker,))
+            cursor.execute(ETF_WITH_VECTORS_SQL if include_vectors else ETF_DEFAULT_SQL, (ticker,))
             result = cursor.fetchone()
             return result
     finally:
         conn.close()
 
-def search_etfs(keyword: str, limit: int = 6):
-    """ETF 데이터를 LIKE 검색 후 반환"""
+# app.ai.similarity 가 ETF별로 저장하는 유사 ETF 수 (조회 limit 상한)
+SIMILAR_TOP_K = 20
+
+SIMILAR_ETFS_SQL = """
+    SELECT s.neighbor_ticker AS ticker, e.category, s.score, s.updated_at
+    FROM etf_similarity s
+    JOIN etf e ON e.ticker = s.neighbor_ticker
+    WHERE s.ticker = %s
+    ORDER BY s.neighbor_rank ASC
+    LIMIT %s
+"""
+
+@cached("etf_similar", tables=("etf_similarity", "etf"))
+def get_similar_etfs(ticker: str, limit: int):
+    """오프라인 작업(app.ai.similarity)이 계산해 둔 유사 ETF 목록을 순위순으로 조회"""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SIMILAR_ETFS_SQL, (ticker, limit))
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+SEARCH_ETFS_SQL = """
+    SELECT ticker FROM etf
+    WHERE LOWER(ticker) LIKE LOWER(%s) AND ticker > %s
+    ORDER BY ticker ASC
+    LIMIT %s
+"""
+
+def search_etfs(keyword: str, limit: int = 6, after_ticker: str = ""):
+    """ETF 데이터를 LIKE 검색 후 ticker 순으로 반환 (after_ticker 이후부터)"""
     connection = get_connection()
     try:
         with connection.cursor(pymysql.cursors.DictCursor) as cursor:
-            sql = """
-            SELECT ticker FROM etf
-            WHERE LOWER(ticker) LIKE LOWER(%s)
-            LIMIT %s
-            """
-            cursor.execute(sql, (f"%{keyword}%", limit))
+            cursor.execute(SEARCH_ETFS_SQL, (f"%{keyword}%", after_ticker, limit))
             results = cursor.fetchall()
 
     except Exception as e:
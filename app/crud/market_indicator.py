@@ -1,16 +1,24 @@
 from app.db.connection import get_connection
+from app.core.cache import cached
 
+MARKET_INDICATOR_BY_NAME_SQL = """
+    SELECT market_indicator_id, name, interest_rate, inflation_rate, exchange_rate, created_at, updated_at
+    FROM market_indicator
+    WHERE name = %s
+"""
+
+MARKET_INDICATORS_SQL = """
+    SELECT market_indicator_id, name, interest_rate, inflation_rate, exchange_rate, created_at, updated_at
+    FROM market_indicator
+    ORDER BY market_indicator_id ASC
+"""
+
+@cached("market_indicator", tables=("market_indicator",))
 def get_market_indicator_by_name(name: str):
     connection = get_connection()
     try:
         with connection.cursor() as cursor:
-            sql = """
-                SELECT market_indicator_id, name, interest_rate, inflation_rate, exchange_rate, 
-                       created_at, updated_at
-                FROM market_indicator
-                WHERE name = %s
-            """
-            cursor.execute(sql, (name,))
+            cursor.execute(MARKET_INDICATOR_BY_NAME_SQL, (name,))
             market_data = cursor.fetchone()
 
         if not market_data:
@@ -25,18 +33,14 @@ def get_market_indicator_by_name(name: str):
     finally:
         connection.close()
 
+@cached("market_indicators", tables=("market_indicator",))
 def get_market_indicators():
-    """ market_indicator 테이블의 모든 데이터를 조회 """
+    """ market_indicator 테이블의 모든 데이터를 id 순으로 조회 (페이지는 라우터에서 잘라 냄) """
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        query = """
-            SELECT market_indicator_id, name, interest_rate, inflation_rate, exchange_rate, created_at, updated_at
-            FROM market_indicator
-            ORDER BY market_indicator_id ASC
-        """
-        cursor.execute(query)
+        cursor.execute(MARKET_INDICATORS_SQL)
         market_data = cursor.fetchall()
 
         if not market_data:
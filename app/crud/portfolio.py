@@ -1,8 +1,11 @@
 from app.db.connection import get_connection
 from fastapi import HTTPException
+import heapq
 import json
 import decimal
+from itertools import islice
 from app.schemas.portfolio import *
+from app.core.pagination import split_page
 
 def convert_decimal_to_float(data):
     """딕셔너리 내부의 Decimal 값을 float으로 변환"""
@@ -14,6 +17,14 @@ def convert_decimal_to_float(data):
         return [convert_decimal_to_float(i) for i in data]
     return data
 
+UPDATE_USER_MBTI_SQL = "UPDATE user SET mbti_code = %s, mbti_vector = %s WHERE user_id = %s"
+
+MBTI_ALLOCATION_SQL = """
+    SELECT etf1, allocation1, etf2, allocation2, etf3, allocation3, etf4, allocation4, etf5, allocation5
+    FROM mbti
+    WHERE mbti_code = %s
+"""
+
 def create_portfolio_with_context(user_id: int, mbti_code: str, mbti_vector: str):
     """
     1. context 생성 후 ID 가져오기
@@ -26,10 +37,7 @@ def create_portfolio_with_context(user_id: int, mbti_code: str, mbti_vector: str
 
     try:
         # user 테이블의 mbti_code 및 mbti_vector 업데이트
-        cursor.execute(
-            "UPDATE user SET mbti_code = %s, mbti_vector = %s WHERE user_id = %s",
-            (mbti_code, mbti_vector, user_id)
-        )
+        cursor.execute(UPDATE_USER_MBTI_SQL, (mbti_code, mbti_vector, user_id))
         conn.commit()
 
         # context 테이블에 새로운 행 추가
@@ -59,14 +67,7 @@ def create_portfolio_with_context(user_id: int, mbti_code: str, mbti_vector: str
         revision_id = cursor.fetchone()["LAST_INSERT_ID()"]
 
         # mbti 테이블에서 ETF 배분 정보 조회
-        cursor.execute(
-            """
-            SELECT etf1, allocation1, etf2, allocation2, etf3, allocation3, etf4, allocation4, etf5, allocation5 
-            FROM mbti 
-            WHERE mbti_code = %s
-            """,
-            (mbti_code,)
-        )
+        cursor.execute(MBTI_ALLOCATION_SQL, (mbti_code,))
         mbti_data = cursor.fetchone()
 
         if not mbti_data:
@@ -88,63 +89,133 @@ def create_portfolio_with_context(user_id: int, mbti_code: str, mbti_vector: str
         cursor.close()
         conn.close()
 
-def get_portfolio_logs(context_id: int) -> PortfolioLogsResponse:
-    """ 특정 context_id에 속한 모든 포트폴리오의 revision 로그 조회 및 context name 포함 """
+# cursor/limit 없는 전체 조회 - context, portfolio, revision 한 번의 JOIN
+PORTFOLIO_LOGS_ALL_SQL = """
+    SELECT c.name, r.portfolio_id, r.revision_id, r.etfs, r.market_indicators, r.user_indicators, r.ai_feedback
+    FROM context c
+    LEFT JOIN portfolio p ON p.context_id = c.context_id
+    LEFT JOIN revision r ON r.portfolio_id = p.portfolio_id
+    WHERE c.context_id = %s
+    ORDER BY r.revision_id DESC
+"""
+
+PORTFOLIO_LOGS_CONTEXT_SQL = """
+    SELECT c.name, p.portfolio_id
+    FROM context c
+    LEFT JOIN portfolio p ON p.context_id = c.context_id
+    WHERE c.context_id = %s
+"""
+
+# portfolio별 (portfolio_id, revision_id) 인덱스 역순 범위 탐색 - 최대 limit 행만 읽음 (filesort 없음)
+PORTFOLIO_LOGS_SQL = """
+    SELECT portfolio_id, revision_id, etfs, market_indicators, user_indicators, ai_feedback
+    FROM revision
+    WHERE portfolio_id = %s AND revision_id < %s
+    ORDER BY revision_id DESC
+    LIMIT %s
+"""
+
+LOG_JSON_COLUMNS = ("etfs", "market_indicators", "user_indicators", "ai_feedback")
+LOGS_CURSOR_SCOPE = "portfolio_logs"
+# 첫 페이지 (커서 없음)
+MAX_REVISION_ID = 2 ** 63 - 1
+
+def fetch_portfolio_log_rows(context_id: int, before_revision_id: int = None, limit: int = None):
+    """
+    limit이 없으면 한 번의 JOIN으로 전체 이력 조회
+    limit이 있으면 portfolio별로 before_revision_id 미만 revision을 최신순 최대 limit개씩 읽어
+    revision_id 내림차순으로 병합해 상위 limit개 반환 (페이지 비용은 portfolio 수 x limit, 이력 길이와 무관)
+    context가 없으면 None, 있으면 (name, rows)
+    """
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        # context 테이블에서 name 조회
-        cursor.execute("SELECT name FROM context WHERE context_id = %s", (context_id,))
-        context_row = cursor.fetchone()
-
-        if not context_row:
-            raise HTTPException(status_code=404, detail=f"해당 context_id에 대한 포트폴리오 로그 데이터가 없습니다.")
-
-        context_name = context_row.get("name") if context_row else None
-
-        # context_id에 해당하는 portfolio_id 목록 조회
-        cursor.execute("SELECT portfolio_id FROM portfolio WHERE context_id = %s", (context_id,))
-        rows = cursor.fetchall()
-        portfolio_ids = [row["portfolio_id"] if isinstance(row, dict) else row[0] for row in rows]
-
-        if not portfolio_ids:
-            return PortfolioLogsResponse(name=context_name, data=[])
-
-        print(f"Found portfolio_ids: {portfolio_ids}")
-
-        # 해당 portfolio_id들의 revision 로그 조회
-        query = f"""
-            SELECT portfolio_id, revision_id, etfs, market_indicators, user_indicators, ai_feedback
-            FROM revision
-            WHERE portfolio_id IN ({','.join(['%s'] * len(portfolio_ids))})
-            ORDER BY revision_id DESC
-        """
-        cursor.execute(query, portfolio_ids)
-        logs = cursor.fetchall()
-
-        # JSON 변환 후 데이터 리스트 생성
-        result = []
-        for log in logs:
-            result.append({
-                "portfolio_id": log["portfolio_id"],
-                "revision_id": log["revision_id"],
-                "etfs": json.loads(log["etfs"]),
-                "market_indicators": json.loads(log["market_indicators"]),
-                "user_indicators": json.loads(log["user_indicators"]),
-                "ai_feedback": json.loads(log["ai_feedback"]),
-            })
-
-        return PortfolioLogsResponse(name=context_name, data=result)
+        if limit is None:
+            cursor.execute(PORTFOLIO_LOGS_ALL_SQL, (context_id,))
+            rows = cursor.fetchall()
+            if not rows:
+                return None
+            return rows[0]["name"], [row for row in rows if row["revision_id"] is not None]
+
+        cursor.execute(PORTFOLIO_LOGS_CONTEXT_SQL, (context_id,))
+        context_rows = cursor.fetchall()
+        if not context_rows:
+            return None
 
-    except Exception as e:
-        print(f"DB 조회 오류: {e}")  # 기존 코드
-        return PortfolioLogsResponse(name=None, data=[])
+        per_portfolio = []
+        for portfolio_id in sorted({row["portfolio_id"] for row in context_rows if row["portfolio_id"] is not None}):
+            cursor.execute(PORTFOLIO_LOGS_SQL, (portfolio_id, before_revision_id or MAX_REVISION_ID, limit))
+            per_portfolio.append(cursor.fetchall())
+
+        rows = list(islice(heapq.merge(*per_portfolio, key=lambda row: -row["revision_id"]), limit))
+        return context_rows[0]["name"], rows
 
     finally:
         cursor.close()
         conn.close()
 
+def portfolio_logs_body(context_name, rows, next_cursor=None) -> bytes:
+    """
+    포트폴리오 로그 응답(PortfolioLogsResponse 형식) JSON bytes 구성
+    revision의 JSON 컬럼은 디코딩하지 않고 저장된 문자열을 그대로 이어 붙임
+    """
+    parts = []
+    for row in rows:
+        columns = ",".join(f'"{column}":{row[column] or "{}"}' for column in LOG_JSON_COLUMNS)
+        parts.append(f'{{"portfolio_id":{int(row["portfolio_id"])},"revision_id":{int(row["revision_id"])},{columns}}}')
+
+    body = (f'{{"name":{json.dumps(context_name, ensure_ascii=False)},"data":[{",".join(parts)}],'
+            f'"next_cursor":{json.dumps(next_cursor)}}}')
+    return body.encode("utf-8")
+
+def get_portfolio_logs_json(context_id: int, before_revision_id: int = None, limit: int = None):
+    """
+    특정 context_id에 속한 모든 포트폴리오의 revision 로그와 context name을 JSON bytes로 반환
+    limit이 있으면 한 행을 더 읽어 다음 페이지 여부를 판단하고 next_cursor 포함
+    로그가 없으면 None 반환
+    """
+    try:
+        fetched = fetch_portfolio_log_rows(context_id, before_revision_id, None if limit is None else limit + 1)
+    except Exception as e:
+        print(f"DB 조회 오류: {e}")
+        return None
+
+    if fetched is None:
+        return None
+
+    context_name, logs = fetched
+
+    if context_name is None and not logs and before_revision_id is None:
+        return None
+
+    next_cursor = None
+    if limit is not None:
+        logs, next_cursor = split_page(logs, limit, LOGS_CURSOR_SCOPE, "revision_id")
+
+    return portfolio_logs_body(context_name, logs, next_cursor)
+
+UPDATE_USER_INVESTMENT_SQL = """
+    UPDATE user
+    SET investment_period = %s, investment_goal = %s, investment_amount = %s, rebalancing_frequency = %s
+    WHERE user_id = %s
+"""
+
+MARKET_INDICATOR_RATES_SQL = "SELECT interest_rate, inflation_rate, exchange_rate FROM market_indicator WHERE name = %s"
+
+# (portfolio_id, revision_id) 인덱스 역순 탐색 1행
+LATEST_REVISION_ID_SQL = """
+    SELECT revision_id FROM revision
+    WHERE portfolio_id = %s
+    ORDER BY revision_id DESC LIMIT 1
+"""
+
+UPDATE_REVISION_SQL = """
+    UPDATE revision
+    SET etfs = %s, market_indicators = %s, user_indicators = %s
+    WHERE revision_id = %s
+"""
+
 def update_custom_portfolio(portfolio_id: int, data: CustomPortfolioRequest):
     """ 사용자가 직접 설정한 포트폴리오 정보를 업데이트 """
     conn = get_connection()
@@ -153,12 +224,7 @@ def update_custom_portfolio(portfolio_id: int, data: CustomPortfolioRequest):
     try:
         # 사용자 정보 업데이트 (investment_period, investment_goal, investment_amount, rebalancing_frequency)
         if data.investment_period or data.investment_goal or data.investment_amount or data.rebalancing_frequency:
-            query = """
-                UPDATE user 
-                SET investment_period = %s, investment_goal = %s, investment_amount = %s, rebalancing_frequency = %s
-                WHERE user_id = %s
-            """
-            cursor.execute(query, (
+            cursor.execute(UPDATE_USER_INVESTMENT_SQL, (
                 data.investment_period,
                 data.investment_goal,
                 data.investment_amount,
@@ -170,8 +236,7 @@ def update_custom_portfolio(portfolio_id: int, data: CustomPortfolioRequest):
         # 선택한 market_indicator 데이터 가져오기 (옵션)
         market_indicators = None
         if data.market_indicator_name:
-            query = "SELECT interest_rate, inflation_rate, exchange_rate FROM market_indicator WHERE name = %s"
-            cursor.execute(query, (data.market_indicator_name,))
+            cursor.execute(MARKET_INDICATOR_RATES_SQL, (data.market_indicator_name,))
             market_indicator_data = cursor.fetchone()
 
             if market_indicator_data:
@@ -188,12 +253,7 @@ def update_custom_portfolio(portfolio_id: int, data: CustomPortfolioRequest):
         })
 
         # 최신 revision 찾기 (해당 portfolio의 가장 최신 revision_id)
-        query = """
-            SELECT revision_id FROM revision 
-            WHERE portfolio_id = %s 
-            ORDER BY revision_id DESC LIMIT 1
-        """
-        cursor.execute(query, (portfolio_id,))
+        cursor.execute(LATEST_REVISION_ID_SQL, (portfolio_id,))
         latest_revision = cursor.fetchone()
 
         if not latest_revision:
@@ -203,12 +263,7 @@ def update_custom_portfolio(portfolio_id: int, data: CustomPortfolioRequest):
         revision_id = latest_revision["revision_id"]
 
         # revision 테이블 업데이트 (필수: etfs, 옵션: market_indicators, user_indicators)
-        query = """
-            UPDATE revision 
-            SET etfs = %s, market_indicators = %s, user_indicators = %s 
-            WHERE revision_id = %s
-        """
-        cursor.execute(query, (
+        cursor.execute(UPDATE_REVISION_SQL, (
             json.dumps(data.etfs, ensure_ascii=False),  # etfs 값 그대로 저장
             market_indicators if market_indicators else "{}",  # market_indicators (선택)
             user_indicators,  # user_indicators (user 정보 + market_indicator 선택 정보)
@@ -270,6 +325,10 @@ def decision_investment(context_id: int) -> DecisionInvestmentResponse:
         cursor.close()
         conn.close()
 
+CONTEXT_BY_ID_SQL = "SELECT context_id, name, user_id, created_at, updated_at FROM context WHERE context_id = %s"
+
+UPDATE_CONTEXT_NAME_SQL = "UPDATE context SET name = %s, updated_at = NOW() WHERE context_id = %s"
+
 def decision_portfolio(context_id: int, data: DecisionPortfolioRequest) -> DecisionPortfolioResponse:
     """
     주어진 context_id로 context 테이블의 name을 업데이트하고 변경된 데이터를 반환
@@ -279,10 +338,7 @@ def decision_portfolio(context_id: int, data: DecisionPortfolioRequest) -> Decis
 
     try:
         # context_id로 기존 레코드 조회
-        cursor.execute(
-            "SELECT context_id, name, user_id, created_at, updated_at FROM context WHERE context_id = %s",
-            (context_id,)
-        )
+        cursor.execute(CONTEXT_BY_ID_SQL, (context_id,))
         existing_context = cursor.fetchone()
 
         if not existing_context:
@@ -290,10 +346,7 @@ def decision_portfolio(context_id: int, data: DecisionPortfolioRequest) -> Decis
             return None  # 존재하지 않는 경우 None 반환
 
         # name 업데이트 실행
-        cursor.execute(
-            "UPDATE context SET name = %s, updated_at = NOW() WHERE context_id = %s",
-            (data.name, context_id)
-        )
+        cursor.execute(UPDATE_CONTEXT_NAME_SQL, (data.name, context_id))
         conn.commit()
 
         # 업데이트된 행이 있는지 확인
@@ -301,10 +354,7 @@ def decision_portfolio(context_id: int, data: DecisionPortfolioRequest) -> Decis
             print(f"[Warning] No rows were updated. Possible duplicate name or already updated.")
 
         # 업데이트된 데이터 가져오기
-        cursor.execute(
-            "SELECT context_id, name, user_id, created_at, updated_at FROM context WHERE context_id = %s",
-            (context_id,)
-        )
+        cursor.execute(CONTEXT_BY_ID_SQL, (context_id,))
         updated_context = cursor.fetchone()
 
         if updated_context is None:
@@ -324,6 +374,23 @@ def decision_portfolio(context_id: int, data: DecisionPortfolioRequest) -> Decis
         cursor.close()
         conn.close()
 
+PORTFOLIO_REVISION_ID_SQL = """
+    SELECT revision_id FROM revision
+    WHERE portfolio_id = %s
+"""
+
+UPDATE_REVISION_ETFS_SQL = """
+    UPDATE revision
+    SET etfs = %s
+    WHERE revision_id = %s
+"""
+
+REVISION_BY_ID_SQL = """
+    SELECT portfolio_id, revision_id, etfs, market_indicators, user_indicators, ai_feedback
+    FROM revision
+    WHERE revision_id = %s
+"""
+
 def update_portfolio_etfs(portfolio_id: int, data: UpdatePortfolioEtfsRequest):
     """
     주어진 portfolio_id로 revision 테이블의 etfs를 업데이트하고 revision 데이터를 반환
@@ -333,11 +400,7 @@ def update_portfolio_etfs(portfolio_id: int, data: UpdatePortfolioEtfsRequest):
 
     try:
         # revision 찾기
-        query = """
-            SELECT revision_id FROM revision
-            WHERE portfolio_id = %s
-        """
-        cursor.execute(query, (portfolio_id,))
+        cursor.execute(PORTFOLIO_REVISION_ID_SQL, (portfolio_id,))
         latest_revision = cursor.fetchone()
 
         if not latest_revision:
@@ -353,21 +416,11 @@ def update_portfolio_etfs(portfolio_id: int, data: UpdatePortfolioEtfsRequest):
             etfs_dict = data.etfs
 
         # revision 테이블 업데이트 (etfs 필드 업데이트)
-        query = """
-            UPDATE revision
-            SET etfs = %s
-            WHERE revision_id = %s
-        """
-        cursor.execute(query, (json.dumps(etfs_dict, ensure_ascii=False), revision_id))
+        cursor.execute(UPDATE_REVISION_ETFS_SQL, (json.dumps(etfs_dict, ensure_ascii=False), revision_id))
         conn.commit()
 
         # 업데이트된 revision 데이터 가져오기
-        query = """
-            SELECT portfolio_id, revision_id, etfs, market_indicators, user_indicators, ai_feedback
-            FROM revision
-            WHERE revision_id = %s
-        """
-        cursor.execute(query, (revision_id,))
+        cursor.execute(REVISION_BY_ID_SQL, (revision_id,))
         updated_revision = cursor.fetchone()
 
         if not updated_revision:
@@ -2,30 +2,41 @@ from app.db.connection import get_connection
 from app.schemas.user import UserLog
 from typing import List
 
+USER_BY_ID_SQL = "SELECT user_id, name, age, investment_period, investment_goal, investment_amount, rebalancing_frequency, mbti_code, mbti_vector FROM user WHERE user_id = %s"
+
+# (user_id, context_id) 인덱스 범위 탐색 - 페이지 조회 시 USER_LOGS_LIMIT 을 붙임
+USER_LOGS_SQL = """
+    SELECT context_id, name, user_id, created_at, updated_at
+    FROM context
+    WHERE user_id = %s AND context_id > %s
+    ORDER BY context_id ASC
+"""
+USER_LOGS_LIMIT = " LIMIT %s"
+
 def get_user_by_id(user_id: int):
     conn = get_connection()
     try:
         with conn.cursor() as cursor:
-            sql = "SELECT user_id, name, age, investment_period, investment_goal, investment_amount, rebalancing_frequency, mbti_code, mbti_vector FROM user WHERE user_id = %s"
-            cursor.execute(sql, (user_id,))
+            cursor.execute(USER_BY_ID_SQL, (user_id,))
             result = cursor.fetchone()
             return result
     finally:
         conn.close()
 
-def get_user_logs(user_id: int) -> List[UserLog]:
+def get_user_logs(user_id: int, after_context_id: int = 0, limit: int = None) -> List[UserLog]:
     """
     특정 사용자의 로그 데이터를 조회하는 함수
+    after_context_id 이후의 context를 context_id 순으로 최대 limit개 조회 (limit이 없으면 전체)
     """
     connection = get_connection()
     try:
         with connection.cursor() as cursor:
-            sql = """
-            SELECT context_id, name, user_id, created_at, updated_at
-            FROM context
-            WHERE user_id = %s
-            """
-            cursor.execute(sql, (user_id,))
+            sql = USER_LOGS_SQL
+            params = (user_id, after_context_id)
+            if limit is not None:
+                sql += USER_LOGS_LIMIT
+                params += (limit,)
+            cursor.execute(sql, params)
             result = cursor.fetchall()
             return [UserLog(**row) for row in result]
     finally:
@@ -1,17 +1,12 @@
 import pymysql
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-print("Loaded DB_PORT:", os.getenv("DB_PORT"))
+from app.core.config import settings
 
 DB_CONFIG = {
-    "host": os.getenv("DB_HOST"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "port": int(os.getenv("DB_PORT")),
+    "host": settings.db_host,
+    "user": settings.db_user,
+    "password": settings.db_password,
+    "database": settings.db_name,
+    "port": settings.db_port,
     "cursorclass": pymysql.cursors.DictCursor  # 결과를 딕셔너리 형태로 반환
 }
 
@@ -0,0 +1,204 @@
+"""app/crud, app/ai SQL 문의 실행 계획 점검 (python -m app.db.explain_check)"""
+import argparse
+import sys
+
+from app.db.connection import get_connection
+from app.ai import ai, analytics, backtest, embed, embedding_pipeline, feedback_job, mbti, projection, revision, \
+    similarity, snapshot
+from app.crud import etf, market_indicator, portfolio, user
+from app.crud import mbti as crud_mbti
+
+# 시드 데이터에서 실제 존재하는 값을 뽑아 파라미터로 사용 (없는 키는 옵티마이저가 계획을 생략하므로)
+SAMPLES = {
+    "user_id": "SELECT user_id FROM user ORDER BY user_id LIMIT 1",
+    "context_id": "SELECT context_id FROM context ORDER BY context_id LIMIT 1",
+    "portfolio_id": "SELECT portfolio_id FROM portfolio ORDER BY portfolio_id LIMIT 1",
+    "revision_id": "SELECT revision_id FROM revision ORDER BY revision_id LIMIT 1",
+    "ticker": "SELECT ticker FROM etf ORDER BY ticker LIMIT 1",
+    "mbti_code": "SELECT mbti_code FROM mbti ORDER BY mbti_code LIMIT 1",
+    "market_name": "SELECT name FROM market_indicator ORDER BY market_indicator_id LIMIT 1",
+}
+SORT_EXTRAS = ("Using filesort", "Using temporary")
+
+class Statement:
+    def __init__(self, source, sql, params=(), allow_full_scan=None, keyset=False, hot_path=False):
+        self.source = source
+        self.sql = sql
+        self.params = params
+        self.allow_full_scan = allow_full_scan
+        self.keyset = keyset
+        self.hot_path = hot_path
+
+def targets_where(selection: dict):
+    """feedback_job 대상 조건 -> (WHERE 절, 파라미터)"""
+    clauses, params = feedback_job.selection_filter(selection)
+    return " AND ".join(clauses), tuple(params)
+
+COUNT_TARGETS_WHERE, COUNT_TARGETS_PARAMS = targets_where({"stale_before": "2100-01-01"})
+TARGETS_WHERE, TARGETS_PARAMS = targets_where({"user_id": "user_id", "stale_before": "2100-01-01"})
+
+# 새 SQL은 모듈 상수로 두고 여기에도 등록
+STATEMENTS = [
+    # app/crud/etf.py
+    Statement("crud.etf.get_etf_by_ticker", etf.ETF_DEFAULT_SQL, ("ticker",), hot_path=True),
+    Statement("crud.etf.get_etf_by_ticker (vectors)", etf.ETF_WITH_VECTORS_SQL, ("ticker",), hot_path=True),
+    Statement("crud.etf.get_similar_etfs", etf.SIMILAR_ETFS_SQL, ("ticker", 10), hot_path=True),
+    Statement("crud.etf.search_etfs", etf.SEARCH_ETFS_SQL, ("%V%", "", 7), keyset=True),
+    # app/crud/market_indicator.py
+    Statement("crud.market_indicator.get_market_indicator_by_name", market_indicator.MARKET_INDICATOR_BY_NAME_SQL,
+              ("market_name",), hot_path=True),
+    Statement("crud.market_indicator.get_market_indicators", market_indicator.MARKET_INDICATORS_SQL,
+              allow_full_scan="지표 전체 목록 1회 캐시 (작은 테이블)"),
+    # app/crud/mbti.py
+    Statement("crud.mbti.get_mbti_etfs", crud_mbti.MBTI_ETFS_SQL, ("mbti_code",), hot_path=True),
+    # app/crud/portfolio.py
+    Statement("crud.portfolio.create_portfolio_with_context (user)", portfolio.UPDATE_USER_MBTI_SQL,
+              ("ISTJ", "[0,0,0,0]", "user_id")),
+    Statement("crud.portfolio.create_portfolio_with_context (mbti)", portfolio.MBTI_ALLOCATION_SQL, ("mbti_code",)),
+    Statement("crud.portfolio.get_portfolio_logs_json (all)", portfolio.PORTFOLIO_LOGS_ALL_SQL, ("context_id",)),
+    Statement("crud.portfolio.get_portfolio_logs_json (context)", portfolio.PORTFOLIO_LOGS_CONTEXT_SQL, ("context_id",),
+              hot_path=True),
+    Statement("crud.portfolio.get_portfolio_logs_json", portfolio.PORTFOLIO_LOGS_SQL,
+              ("portfolio_id", portfolio.MAX_REVISION_ID, 51), keyset=True),
+    Statement("crud.portfolio.update_custom_portfolio (user)", portfolio.UPDATE_USER_INVESTMENT_SQL,
+              (12, "goal", 1000, 3, "user_id")),
+    Statement("crud.portfolio.update_custom_portfolio (market_indicator)", portfolio.MARKET_INDICATOR_RATES_SQL,
+              ("market_name",)),
+    Statement("crud.portfolio.update_custom_portfolio (latest revision)", portfolio.LATEST_REVISION_ID_SQL,
+              ("portfolio_id",), hot_path=True),
+    Statement("crud.portfolio.update_custom_portfolio (revision)", portfolio.UPDATE_REVISION_SQL,
+              ("{}", "{}", "{}", "revision_id")),
+    Statement("crud.portfolio.decision_portfolio (select)", portfolio.CONTEXT_BY_ID_SQL, ("context_id",)),
+    Statement("crud.portfolio.decision_portfolio (update)", portfolio.UPDATE_CONTEXT_NAME_SQL, ("name", "context_id")),
+    Statement("crud.portfolio.update_portfolio_etfs (revision)", portfolio.PORTFOLIO_REVISION_ID_SQL,
+              ("portfolio_id",)),
+    Statement("crud.portfolio.update_portfolio_etfs (update)", portfolio.UPDATE_REVISION_ETFS_SQL,
+              ("{}", "revision_id")),
+    Statement("crud.portfolio.update_portfolio_etfs (reload)", portfolio.REVISION_BY_ID_SQL, ("revision_id",)),
+    # app/crud/user.py
+    Statement("crud.user.get_user_by_id", user.USER_BY_ID_SQL, ("user_id",), hot_path=True),
+    Statement("crud.user.get_user_logs", user.USER_LOGS_SQL + user.USER_LOGS_LIMIT, ("user_id", 0, 51), keyset=True),
+    # app/ai/ai.py, app/ai/mbti.py
+    Statement("ai.fetch_user_info", ai.USER_INFO_SQL, ("user_id",), hot_path=True),
+    Statement("ai.mbti.fetch_user_info", mbti.USER_MBTI_SQL, ("user_id",), hot_path=True),
+    Statement("ai.mbti.fetch_user_target_vector", mbti.USER_MBTI_VECTOR_SQL, ("user_id",), hot_path=True),
+    Statement("ai.fetch_etf_data", ai.ETF_DATA_SQL, allow_full_scan="ETF 카탈로그 전체 로드"),
+    Statement("ai.fetch_mbti_recommendation", ai.MBTI_RECOMMENDATION_SQL, ("mbti_code",), hot_path=True),
+    Statement("ai.mbti.fetch_default_portfolio", mbti.DEFAULT_PORTFOLIO_SQL, ("mbti_code",), hot_path=True),
+    Statement("ai.mbti.fetch_users_info", mbti.USERS_INFO_SQL.format(mbti.in_placeholders(2)), (1, 2),
+              hot_path=True),
+    Statement("ai.mbti.fetch_latest_revision_etfs", mbti.LATEST_REVISION_ETFS_SQL.format(mbti.in_placeholders(2)),
+              (1, 2), hot_path=True),
+    Statement("ai.mbti.fetch_default_portfolios", mbti.DEFAULT_PORTFOLIOS_SQL.format(mbti.in_placeholders(2)),
+              ("ESTJ", "INFP"), hot_path=True),
+    # app/ai/embed.py, app/ai/snapshot.py
+    Statement("ai.embed.fetch_etf_text_vectors", embed.ETF_TEXT_VECTORS_SQL,
+              allow_full_scan="ETF 카탈로그 전체 로드"),
+    Statement("ai.snapshot.read_snapshot_from_db", snapshot.SNAPSHOT_SQL, allow_full_scan="ETF 카탈로그 전체 로드"),
+    # app/ai/analytics.py
+    Statement("ai.analytics.get_metric_catalog", analytics.METRIC_CATALOG_SQL,
+              allow_full_scan="ETF 카탈로그 전체 로드"),
+    Statement("ai.analytics.analyze_portfolio (latest)", analytics.LATEST_REVISION_SQL, ("portfolio_id",),
+              hot_path=True),
+    Statement("ai.analytics.analyze_portfolio (revision)", analytics.REVISION_SQL, ("portfolio_id", "revision_id"),
+              hot_path=True),
+    Statement("ai.analytics.iter_revision_batches", analytics.REVISION_BATCH_SQL, (0, 10000), keyset=True),
+    # app/ai/backtest.py
+    Statement("ai.backtest.backtest_portfolio", backtest.PORTFOLIO_BACKTEST_SQL, ("portfolio_id",), hot_path=True),
+    Statement("ai.backtest.main", backtest.ALL_PORTFOLIOS_BACKTEST_SQL,
+              allow_full_scan="전체 포트폴리오 일괄 백테스트 (오프라인 작업)"),
+    # app/ai/projection.py
+    Statement("ai.projection.project_portfolio", projection.PORTFOLIO_PROJECTION_SQL, ("portfolio_id",),
+              hot_path=True),
+    Statement("ai.projection.main", projection.ALL_PORTFOLIOS_PROJECTION_SQL,
+              allow_full_scan="전체 포트폴리오 일괄 시뮬레이션 (오프라인 작업)"),
+    # app/ai/similarity.py (오프라인 작업)
+    Statement("ai.similarity.load_state (hash)", similarity.STATE_HASHES_SQL,
+              allow_full_scan="전체 상태 로드 (오프라인 작업)"),
+    Statement("ai.similarity.load_state (lists)", similarity.STATE_LISTS_SQL,
+              allow_full_scan="전체 목록 로드 (오프라인 작업)"),
+    # app/ai/feedback_job.py
+    Statement("ai.feedback_job.count_targets", feedback_job.COUNT_TARGETS_SQL.format(COUNT_TARGETS_WHERE),
+              COUNT_TARGETS_PARAMS, allow_full_scan="작업 생성 시 대상 수 집계 1회 (관리자 작업)"),
+    Statement("ai.feedback_job.iter_targets", feedback_job.TARGETS_SQL.format(TARGETS_WHERE),
+              (0, *TARGETS_PARAMS, feedback_job.SELECT_BATCH), keyset=True),
+    Statement("ai.feedback_job.get_job", feedback_job.JOB_SQL, (1,)),
+    Statement("ai.feedback_job.get_job (failures)", feedback_job.JOB_FAILURES_SQL, (1, feedback_job.RECENT_FAILURES)),
+    Statement("ai.feedback_job.claim_job", feedback_job.CLAIM_JOB_SQL,
+              (1, *feedback_job.RESUMABLE_STATUSES, feedback_job.LEASE_SECONDS)),
+    Statement("ai.feedback_job._checkpoint", feedback_job.CHECKPOINT_SQL, (0, 0, 0, "{}", None, None, None, 1)),
+    # app/ai/embedding_pipeline.py (오프라인 작업)
+    Statement("ai.embedding_pipeline.scan", embedding_pipeline.SCAN_SQL,
+              allow_full_scan="전체 ETF 임베딩 상태 점검 (오프라인 작업)"),
+    Statement("ai.embedding_pipeline.write_vectors", embedding_pipeline.write_vectors_sql(1),
+              ("ticker", "[0]", "ticker", "0" * 64, "ticker")),
+    # app/ai/revision.py
+    Statement("ai.revision.fetch_revision_by_portfolio", revision.LATEST_REVISION_SQL, ("portfolio_id",),
+              hot_path=True),
+    Statement("ai.revision.update_revision_data (latest)", revision.LATEST_REVISION_ID_SQL, ("portfolio_id",),
+              hot_path=True),
+    Statement("ai.revision.update_revision_data", revision.UPDATE_REVISION_FEEDBACK_SQL,
+              ("{}", "{}", "{}", "portfolio_id", "revision_id")),
+]
+
+def resolve_samples(cursor) -> dict:
+    samples = {}
+    for name, query in SAMPLES.items():
+        cursor.execute(query)
+        row = cursor.fetchone()
+        if row is None:
+            raise RuntimeError(f"샘플 값을 찾을 수 없습니다: {name} (시드 데이터를 먼저 적재하세요)")
+        samples[name] = next(iter(row.values()))
+    return samples
+
+def explain(cursor, statement, samples):
+    params = tuple(samples.get(param, param) if isinstance(param, str) else param for param in statement.params)
+    cursor.execute("EXPLAIN " + statement.sql, params)
+    return cursor.fetchall()
+
+def plan_status(statement, plan):
+    """실행 계획 -> (상태 문자열, 실패 여부)"""
+    full_scans = [row["table"] for row in plan if row.get("type") == "ALL"]
+    sorts = sorted({extra for row in plan for extra in SORT_EXTRAS if extra in (row.get("Extra") or "")}) \
+        if statement.keyset or statement.hot_path else []
+    if full_scans and not statement.allow_full_scan:
+        return f"FULL SCAN: {', '.join(full_scans)}", True
+    if sorts:
+        return f"{'KEYSET' if statement.keyset else 'HOT PATH'}: {', '.join(sorts)}", True
+    if full_scans:
+        return f"ALLOWED ({statement.allow_full_scan})", False
+    return "OK", False
+
+def format_plan(plan) -> str:
+    return "\n".join(f"    table={row.get('table')} type={row.get('type')} key={row.get('key')} "
+                     f"rows={row.get('rows')} extra={row.get('Extra')}" for row in plan)
+
+def main():
+    parser = argparse.ArgumentParser(description="app/crud, app/ai SQL 실행 계획 점검")
+    parser.add_argument("--verbose", action="store_true", help="모든 실행 계획 출력")
+    args = parser.parse_args()
+
+    connection = get_connection()
+    failures = []
+    try:
+        with connection.cursor() as cursor:
+            samples = resolve_samples(cursor)
+            for statement in STATEMENTS:
+                plan = explain(cursor, statement, samples)
+                status, failed = plan_status(statement, plan)
+                if failed:
+                    failures.append(statement.source)
+                print(f"[{status}] {statement.source}")
+                if args.verbose or failed:
+                    print(format_plan(plan))
+    finally:
+        connection.rollback()
+        connection.close()
+
+    if failures:
+        print(f"\n전체 테이블 스캔 / 정렬 임시 작업 {len(failures)}건: {failures}")
+        sys.exit(1)
+    print(f"\n{len(STATEMENTS)}개 문장 모두 인덱스를 사용합니다.")
+
+if __name__ == "__main__":
+    main()
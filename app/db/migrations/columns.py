@@ -0,0 +1,11 @@
+"""마이그레이션 공용 컬럼 정의"""
+import sqlalchemy as sa
+
+
+def timestamps():
+    """created_at / updated_at (DB가 채우고 갱신)"""
+    return [
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.Column("updated_at", sa.DateTime, nullable=False,
+                  server_default=sa.text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")),
+    ]
@@ -0,0 +1,111 @@
+"""baseline schema
+
+앱 코드가 사용하는 테이블(user, context, portfolio, revision, etf, mbti, market_indicator) 생성
+이미 테이블이 있는 운영 DB에서는 실행하지 않고 `alembic stamp 0001_baseline` 으로 기준점만 기록
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2025-03-01 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from app.db.migrations.columns import timestamps
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user",
+        sa.Column("user_id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("age", sa.Integer, nullable=False),
+        sa.Column("investment_period", sa.Integer),
+        sa.Column("investment_goal", sa.String(255)),
+        sa.Column("investment_amount", sa.BigInteger),
+        sa.Column("rebalancing_frequency", sa.Integer),
+        sa.Column("mbti_code", sa.String(4)),
+        sa.Column("mbti_vector", sa.String(255)),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+    op.create_table(
+        "context",
+        sa.Column("context_id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.BigInteger, sa.ForeignKey("user.user_id"), nullable=False),
+        sa.Column("name", sa.String(255)),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+    op.create_table(
+        "portfolio",
+        sa.Column("portfolio_id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("context_id", sa.BigInteger, sa.ForeignKey("context.context_id"), nullable=False),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+    op.create_table(
+        "revision",
+        sa.Column("revision_id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("portfolio_id", sa.BigInteger, sa.ForeignKey("portfolio.portfolio_id"), nullable=False),
+        sa.Column("etfs", sa.JSON),
+        sa.Column("market_indicators", sa.JSON),
+        sa.Column("user_indicators", sa.JSON),
+        sa.Column("ai_feedback", sa.JSON),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+    op.create_table(
+        "etf",
+        sa.Column("ticker", sa.String(20), primary_key=True),
+        sa.Column("long_business_summary", sa.Text),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("trailing_pe", sa.Float(precision=53)),
+        sa.Column("trailing_annual_dividend_yield", sa.Float(precision=53)),
+        sa.Column("beta_3year", sa.Float(precision=53)),
+        sa.Column("total_assets", sa.BigInteger),
+        sa.Column("three_year_average_return", sa.Float(precision=53)),
+        sa.Column("five_year_average_return", sa.Float(precision=53)),
+        sa.Column("nav_price", sa.Float(precision=53)),
+        sa.Column("text_vector", mysql.MEDIUMTEXT),
+        sa.Column("mbti_vector", sa.String(255)),
+        sa.Column("mbti_code", sa.String(4)),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+    op.create_table(
+        "mbti",
+        sa.Column("mbti_code", sa.String(4), primary_key=True),
+        sa.Column("description", sa.Text, nullable=False),
+        *[column for i in range(1, 6) for column in (
+            sa.Column(f"etf{i}", sa.String(20)),
+            sa.Column(f"allocation{i}", sa.Integer),
+        )],
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+    op.create_table(
+        "market_indicator",
+        sa.Column("market_indicator_id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("interest_rate", sa.Numeric(10, 4), nullable=False),
+        sa.Column("inflation_rate", sa.Numeric(10, 4), nullable=False),
+        sa.Column("exchange_rate", sa.Numeric(12, 4), nullable=False),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+
+
+def downgrade() -> None:
+    for table in ["market_indicator", "mbti", "etf", "revision", "portfolio", "context", "user"]:
+        op.drop_table(table)
@@ -0,0 +1,68 @@
+"""performance indexes for hot lookups
+
+- revision (portfolio_id, revision_id): WHERE portfolio_id ORDER BY revision_id DESC LIMIT 1 을 인덱스 역순 탐색 1회로 처리
+- portfolio (context_id, portfolio_id): context별 portfolio 조회/조인
+- context (user_id, context_id): 사용자별 context 목록 (context_id 순 정렬까지 인덱스로 처리)
+- market_indicator (name): 이름 조회
+- etf (ticker), mbti (mbti_code): 기본키가 아닌 운영 스키마를 위한 보조 인덱스
+
+운영 DB는 0001 이전부터 존재했으므로, 같은 컬럼 구성으로 시작하는 인덱스(기본키 포함)가 이미 있으면 건너뜀
+
+Revision ID: 0002_performance_indexes
+Revises: 0001_baseline
+Create Date: 2025-03-01 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_performance_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_revision_portfolio_revision", "revision", ["portfolio_id", "revision_id"], False),
+    ("ix_portfolio_context", "portfolio", ["context_id", "portfolio_id"], False),
+    ("ix_context_user", "context", ["user_id", "context_id"], False),
+    ("ix_market_indicator_name", "market_indicator", ["name"], False),
+    ("ix_etf_ticker", "etf", ["ticker"], False),
+    ("ix_mbti_code", "mbti", ["mbti_code"], False),
+]
+
+
+# 오프라인(--sql) 모드에서는 DB를 조회할 수 없으므로 0001 기준 스키마의 기본키로 판단
+BASELINE_PRIMARY_KEYS = {"etf": ["ticker"], "mbti": ["mbti_code"]}
+
+
+def _covered(inspector, table, columns) -> bool:
+    """기존 인덱스/기본키가 columns를 선두 컬럼으로 포함하면 True"""
+    if inspector is None:
+        return BASELINE_PRIMARY_KEYS.get(table, [])[:len(columns)] == columns
+    existing = [inspector.get_pk_constraint(table).get("constrained_columns", [])]
+    existing += [index["column_names"] for index in inspector.get_indexes(table)]
+    existing += [constraint["column_names"] for constraint in inspector.get_unique_constraints(table)]
+    return any(cols[:len(columns)] == columns for cols in existing)
+
+
+def upgrade() -> None:
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+    for name, table, columns, unique in INDEXES:
+        if _covered(inspector, table, columns):
+            continue
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+    for name, table, columns, _ in reversed(INDEXES):
+        if inspector is None:
+            if BASELINE_PRIMARY_KEYS.get(table) == columns:
+                continue
+        elif name not in {index["name"] for index in inspector.get_indexes(table)}:
+            continue
+        op.drop_index(name, table_name=table)
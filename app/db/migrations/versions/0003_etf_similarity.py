@@ -0,0 +1,47 @@
+"""etf similarity neighbour lists
+
+- etf_similarity: ETF별 유사 ETF 상위 k개 (오프라인 작업 `python -m app.ai.similarity` 가 기록)
+- etf_similarity_state: 마지막 계산에 사용한 벡터 해시 - 벡터가 바뀐 행만 다시 계산하기 위함
+
+Revision ID: 0003_etf_similarity
+Revises: 0002_performance_indexes
+Create Date: 2025-03-15 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations.columns import timestamps
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_etf_similarity"
+down_revision: Union[str, None] = "0002_performance_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "etf_similarity",
+        sa.Column("ticker", sa.String(20), primary_key=True),
+        sa.Column("neighbor_rank", sa.SmallInteger, primary_key=True, autoincrement=False),
+        sa.Column("neighbor_ticker", sa.String(20), nullable=False),
+        sa.Column("score", sa.Float(precision=53), nullable=False),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+    op.create_table(
+        "etf_similarity_state",
+        sa.Column("ticker", sa.String(20), primary_key=True),
+        sa.Column("vector_hash", sa.String(40), nullable=False),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("etf_similarity_state")
+    op.drop_table("etf_similarity")
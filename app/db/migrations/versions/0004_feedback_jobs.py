@@ -0,0 +1,60 @@
+"""feedback regeneration jobs
+
+- feedback_job: 피드백 일괄 재생성 작업 (대상 조건, 시장 데이터, 체크포인트, 진행 현황/통계)
+  last_portfolio_id 는 "이 id 이하는 모두 처리 완료" 지점 - 중단된 작업은 여기서부터 이어서 실행
+  heartbeat_at 이 오래된 running 작업은 실행 프로세스가 죽은 것으로 보고 다시 가져갈 수 있음
+- feedback_job_failure: 작업별 실패한 포트폴리오와 오류 메시지
+
+Revision ID: 0004_feedback_jobs
+Revises: 0003_etf_similarity
+Create Date: 2025-03-22 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.migrations.columns import timestamps
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_feedback_jobs"
+down_revision: Union[str, None] = "0003_etf_similarity"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feedback_job",
+        sa.Column("job_id", sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("selection", sa.JSON, nullable=False),
+        sa.Column("market_data", sa.JSON, nullable=False),
+        sa.Column("concurrency", sa.Integer, nullable=False),
+        sa.Column("total", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("processed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_portfolio_id", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("stats", sa.JSON),
+        sa.Column("error", sa.Text),
+        sa.Column("heartbeat_at", sa.DateTime),
+        sa.Column("started_at", sa.DateTime),
+        sa.Column("finished_at", sa.DateTime),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+    op.create_table(
+        "feedback_job_failure",
+        sa.Column("job_id", sa.BigInteger, sa.ForeignKey("feedback_job.job_id"), primary_key=True),
+        sa.Column("portfolio_id", sa.BigInteger, primary_key=True, autoincrement=False),
+        sa.Column("error", sa.Text, nullable=False),
+        *timestamps(),
+        mysql_charset="utf8mb4",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("feedback_job_failure")
+    op.drop_table("feedback_job")
@@ -0,0 +1,29 @@
+"""etf text_vector content hash
+
+- etf.text_vector_hash: text_vector 를 만든 입력(임베딩 모델 + long_business_summary)의 sha256
+  현재 설명으로 계산한 해시와 다르거나 비어 있으면 다시 임베딩할 대상 (python -m app.ai.embedding_pipeline)
+
+Revision ID: 0005_etf_text_vector_hash
+Revises: 0004_feedback_jobs
+Create Date: 2025-03-29 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_etf_text_vector_hash"
+down_revision: Union[str, None] = "0004_feedback_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("etf", sa.Column("text_vector_hash", sa.String(64)))
+
+
+def downgrade() -> None:
+    op.drop_column("etf", "text_vector_hash")
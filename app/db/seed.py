@@ -0,0 +1,275 @@
+"""규모별 합성 데이터 생성기 (python -m app.db.seed --tier small --seed 42)"""
+import argparse
+import datetime
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import pymysql
+
+from app.db.connection import DB_CONFIG
+
+TIERS = {
+    "small": {"users": 1_000, "etfs": 100},
+    "medium": {"users": 100_000, "etfs": 10_000},
+    "large": {"users": 1_000_000, "etfs": 10_000},
+}
+
+CATEGORIES = [
+    "Large Blend", "Large Growth", "Large Value", "Technology", "Health", "Financial", "Real Estate",
+    "Intermediate Core Bond", "Long Government", "High Yield Bond", "Diversified Emerging Mkts",
+    "Foreign Large Blend", "Commodities Broad Basket", "Korea Equity", "Dividend Income",
+]
+INDEX_NAMES = ["S&P 500", "NASDAQ-100", "KOSPI 200", "KOSDAQ 150", "MSCI World", "Russell 2000", "Dow Jones"]
+SUMMARY_WORDS = [
+    "fund", "invests", "index", "dividend", "growth", "value", "bond", "treasury", "equity", "semiconductor",
+    "technology", "healthcare", "energy", "emerging", "markets", "small-cap", "large-cap", "income", "yield",
+    "volatility", "sector", "exposure", "global", "domestic", "companies", "securities", "benchmark", "tracks",
+]
+MBTI_CODES = [a + b + c + d for a in "EI" for b in "SN" for c in "TF" for d in "JP"]
+BATCH_SIZE = 1000
+BASE_TIME = datetime.datetime(2024, 1, 1)
+
+def ticker_for(i: int) -> str:
+    letters = ""
+    i += 26 ** 2  # 최소 3글자
+    while i:
+        i, r = divmod(i, 26)
+        letters = chr(ord("A") + r) + letters
+    return letters
+
+def vector_text(vector) -> str:
+    return "[" + ",".join(f"{v:.6f}" for v in vector) + "]"
+
+def timestamp(rng: random.Random) -> str:
+    return (BASE_TIME + datetime.timedelta(seconds=rng.randrange(365 * 24 * 3600))).strftime("%Y-%m-%d %H:%M:%S")
+
+# --- 테이블별 행 생성기 ---
+
+def gen_market_indicators(rng):
+    for i in range(1, 21):
+        created = timestamp(rng)
+        yield (i, f"scenario-{i:02d}", round(rng.uniform(0.5, 6), 4), round(rng.uniform(0.5, 8), 4),
+               round(rng.uniform(1100, 1500), 4), created, created)
+
+def gen_etfs(rng, nprng, count):
+    # 카테고리별 중심 벡터 + 잡음 -> 유사도 검색이 의미 있는 분포
+    centroids = nprng.normal(size=(len(CATEGORIES), 1536)).astype(np.float32)
+    for i in range(count):
+        cat_idx = i % len(CATEGORIES)
+        vector = centroids[cat_idx] + 0.6 * nprng.normal(size=1536).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+        index_name = rng.choice(INDEX_NAMES)
+        words = " ".join(rng.choice(SUMMARY_WORDS) for _ in range(rng.randint(30, 90)))
+        summary = f"The fund seeks to track the {index_name} index in {CATEGORIES[cat_idx]}. {words}."
+        created = timestamp(rng)
+        yield (
+            ticker_for(i), summary, CATEGORIES[cat_idx],
+            round(rng.lognormvariate(3.0, 0.3), 4), round(rng.uniform(0, 0.06), 4),
+            round(rng.uniform(0.3, 1.6), 4), int(rng.lognormvariate(20, 1.5)),
+            round(rng.gauss(0.07, 0.08), 4), round(rng.gauss(0.08, 0.06), 4), round(rng.uniform(10, 600), 4),
+            vector_text(vector), vector_text(nprng.uniform(0, 1, size=4)), rng.choice(MBTI_CODES),
+            created, created,
+        )
+
+def gen_mbti(rng, tickers):
+    for code in MBTI_CODES:
+        picks = rng.sample(tickers, 5)
+        cuts = sorted(rng.sample(range(1, 100), 4))
+        allocations = [b - a for a, b in zip([0] + cuts, cuts + [100])]
+        created = timestamp(rng)
+        row = [code, f"{code} 성향 투자자를 위한 기본 포트폴리오"]
+        for ticker, allocation in zip(picks, allocations):
+            row += [ticker, allocation]
+        yield tuple(row + [created, created])
+
+def gen_user_tree(rng, nprng, user_count, tickers, start_ids):
+    """user, context, portfolio, revision 행을 (테이블명, 행) 으로 순서대로 생성"""
+    context_id, portfolio_id, revision_id = start_ids["context"], start_ids["portfolio"], start_ids["revision"]
+    for offset in range(user_count):
+        user_id = start_ids["user"] + offset
+        created = timestamp(rng)
+        yield "user", (user_id, f"user{user_id}", rng.randint(20, 70), rng.choice([6, 12, 24, 36, 60]),
+                       str(rng.choice([10, 50, 100, 500]) * 1_000_000), rng.choice([1, 5, 10, 50]) * 1_000_000,
+                       rng.choice([1, 3, 6, 12]), rng.choice(MBTI_CODES), vector_text(nprng.uniform(0, 1, size=4)),
+                       created, created)
+
+        power_user = rng.random() < 0.01
+        for _ in range(rng.randint(20, 40) if power_user else rng.choice([0, 1, 1, 2, 3])):
+            yield "context", (context_id, user_id, f"포트폴리오 {context_id}", created, created)
+            for _ in range(rng.randint(1, 3)):
+                yield "portfolio", (portfolio_id, context_id, created, created)
+                for _ in range(rng.randint(3, 8) if power_user else rng.randint(1, 3)):
+                    picks = rng.sample(tickers, rng.randint(2, 6))
+                    weights = [rng.random() for _ in picks]
+                    total = sum(weights)
+                    etfs = [{"ticker": t, "allocation": round(w / total * 100, 2)} for t, w in zip(picks, weights)]
+                    feedback = {"feedback": "1. 포트폴리오 평가 " + " ".join(rng.choice(SUMMARY_WORDS) for _ in range(60)),
+                                "ai_etfs": etfs}
+                    yield "revision", (
+                        revision_id, portfolio_id, json.dumps({"etfs": etfs}),
+                        json.dumps({"interest_rate": 3.5, "inflation_rate": 2.1, "exchange_rate": 1350.0}),
+                        json.dumps({"investment_period": "12", "rebalancing_frequency": "3"}),
+                        json.dumps(feedback, ensure_ascii=False), created, created,
+                    )
+                    revision_id += 1
+                portfolio_id += 1
+            context_id += 1
+
+COLUMNS = {
+    "market_indicator": ["market_indicator_id", "name", "interest_rate", "inflation_rate", "exchange_rate",
+                         "created_at", "updated_at"],
+    "etf": ["ticker", "long_business_summary", "category", "trailing_pe", "trailing_annual_dividend_yield",
+            "beta_3year", "total_assets", "three_year_average_return", "five_year_average_return", "nav_price",
+            "text_vector", "mbti_vector", "mbti_code", "created_at", "updated_at"],
+    "mbti": ["mbti_code", "description"] + [f"{c}{i}" for i in range(1, 6) for c in ("etf", "allocation")]
+            + ["created_at", "updated_at"],
+    "user": ["user_id", "name", "age", "investment_period", "investment_goal", "investment_amount",
+             "rebalancing_frequency", "mbti_code", "mbti_vector", "created_at", "updated_at"],
+    "context": ["context_id", "user_id", "name", "created_at", "updated_at"],
+    "portfolio": ["portfolio_id", "context_id", "created_at", "updated_at"],
+    "revision": ["revision_id", "portfolio_id", "etfs", "market_indicators", "user_indicators", "ai_feedback",
+                 "created_at", "updated_at"],
+}
+
+# --- 적재기 ---
+
+class InsertLoader:
+    """batch_size 행씩 다중 행 INSERT (pymysql executemany가 하나의 INSERT ... VALUES (...),(...) 로 묶음)"""
+    def __init__(self, connection, batch_size):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, table, row):
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in ([table] if table else list(self.buffers)):
+            rows = self.buffers.get(name)
+            if not rows:
+                continue
+            columns = COLUMNS[name]
+            sql = (f"INSERT INTO `{name}` ({', '.join(columns)}) "
+                   f"VALUES ({', '.join(['%s'] * len(columns))})")
+            with self.connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+            self.connection.commit()
+            self.counts[name] = self.counts.get(name, 0) + len(rows)
+            self.buffers[name] = []
+
+class LoadDataLoader:
+    """테이블별 TSV 임시 파일에 쓴 뒤 LOAD DATA LOCAL INFILE 로 한 번에 적재"""
+    def __init__(self, connection):
+        self.connection = connection
+        self.directory = tempfile.mkdtemp(prefix="seed-")
+        self.files = {}
+        self.counts = {}
+
+    @staticmethod
+    def _field(value):
+        if value is None:
+            return "\\N"
+        return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+    def add(self, table, row):
+        f = self.files.get(table)
+        if f is None:
+            f = self.files[table] = open(os.path.join(self.directory, f"{table}.tsv"), "w", encoding="utf-8")
+        f.write("\t".join(self._field(value) for value in row) + "\n")
+        self.counts[table] = self.counts.get(table, 0) + 1
+
+    def flush(self, table=None):
+        for name in ([table] if table else list(self.files)):
+            f = self.files.pop(name, None)
+            if f is None:
+                continue
+            f.close()
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE `{name}` CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(COLUMNS[name])})",
+                    (f.name,)
+                )
+            self.connection.commit()
+            os.remove(f.name)
+
+def next_ids(connection) -> dict:
+    ids = {}
+    with connection.cursor() as cursor:
+        for table in ["user", "context", "portfolio", "revision"]:
+            cursor.execute(f"SELECT COALESCE(MAX({table}_id), 0) + 1 AS next_id FROM `{table}`")
+            ids[table] = cursor.fetchone()["next_id"]
+    return ids
+
+def main():
+    parser = argparse.ArgumentParser(description="규모별 합성 데이터 생성/적재")
+    parser.add_argument("--tier", choices=TIERS, default="small")
+    parser.add_argument("--users", type=int, help="tier의 사용자 수 대신 사용")
+    parser.add_argument("--etfs", type=int, help="tier의 ETF 수 대신 사용")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--method", choices=["insert", "load-data"], default="insert")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--truncate", action="store_true", help="적재 전 대상 테이블 비우기")
+    args = parser.parse_args()
+
+    users = args.users or TIERS[args.tier]["users"]
+    etf_count = args.etfs or TIERS[args.tier]["etfs"]
+    rng = random.Random(args.seed)
+    nprng = np.random.default_rng(args.seed)
+
+    connection = pymysql.connect(**DB_CONFIG, local_infile=args.method == "load-data")
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            cursor.execute("SET UNIQUE_CHECKS = 0")
+            if args.truncate:
+                for table in ["revision", "portfolio", "context", "user", "mbti", "etf", "market_indicator"]:
+                    cursor.execute(f"TRUNCATE TABLE `{table}`")
+
+        loader = LoadDataLoader(connection) if args.method == "load-data" else InsertLoader(connection, args.batch_size)
+
+        if args.truncate:
+            tickers = [ticker_for(i) for i in range(etf_count)]
+            for row in gen_market_indicators(rng):
+                loader.add("market_indicator", row)
+            for row in gen_etfs(rng, nprng, etf_count):
+                loader.add("etf", row)
+            for row in gen_mbti(rng, tickers):
+                loader.add("mbti", row)
+            loader.flush()
+        else:
+            # 기존 참조 데이터(etf, mbti, market_indicator)를 그대로 두고 사용자 데이터만 추가
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT ticker FROM etf")
+                tickers = [row["ticker"] for row in cursor.fetchall()]
+            if len(tickers) < 6:
+                parser.error("etf 테이블이 비어 있습니다. --truncate 로 참조 데이터부터 생성하세요.")
+
+        for i, (table, row) in enumerate(gen_user_tree(rng, nprng, users, tickers, next_ids(connection))):
+            loader.add(table, row)
+            if i and i % 500_000 == 0:
+                print(f"  ... {i:,} rows ({time.perf_counter() - started:.1f}s)")
+        loader.flush()
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            cursor.execute("SET UNIQUE_CHECKS = 1")
+    finally:
+        connection.close()
+
+    elapsed = time.perf_counter() - started
+    total = sum(loader.counts.values())
+    print(f"적재 완료 ({args.method}, seed={args.seed}): {loader.counts} / {total:,} rows, "
+          f"{elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
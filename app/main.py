@@ -1,16 +1,45 @@
-import os
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from app.core.config import settings
+from app.core.response import AppJSONResponse
+from app.core import warmup
 from app.api.user import router as user_router
 from app.api.etf import router as etf_router
 from app.api.mbti import router as mbti_router
 from app.api.market_indicator import router as market_indicator_router
 from app.api.portfolio import router as portfolio_router
+from app.api.health import router as health_router
+from app.api.admin import router as admin_router
 
-load_dotenv()
-API_URL = os.getenv("API_URL")
-WEB_URL = os.getenv("WEB_URL")
+API_URL = settings.api_url
+WEB_URL = settings.web_url
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 워밍업은 백그라운드에서 진행하고, 완료 전까지 /health/ready 는 503 응답
+    stop_event = threading.Event()
+    task = None
+    if settings.warmup_enabled:
+        task = asyncio.create_task(
+            asyncio.to_thread(warmup.run_warmup, settings.warmup_retry_interval, stop_event)
+        )
+    else:
+        warmup.mark_ready()
+    # 멀티 워커 스냅샷 주기 갱신 (uvicorn이 워커를 관리하므로 별도 백그라운드 프로세스 없음)
+    refresher = None
+    if settings.vector_snapshot_dir and settings.vector_snapshot_refresh_seconds > 0:
+        from app.ai.snapshot import refresh_loop
+        refresher = asyncio.create_task(asyncio.to_thread(
+            refresh_loop, settings.vector_snapshot_dir, settings.vector_snapshot_refresh_seconds, stop_event
+        ))
+    yield
+    stop_event.set()
+    for background in (task, refresher):
+        if background is not None:
+            await background
 
 app = FastAPI(
     title="Match your ETF Server API",
@@ -18,7 +47,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    root_path=""
+    root_path="",
+    default_response_class=AppJSONResponse,
+    lifespan=lifespan
 )
 
 origins = [
@@ -46,3 +77,5 @@ app.include_router(etf_router)
 app.include_router(mbti_router)
 app.include_router(market_indicator_router)
 app.include_router(portfolio_router)
+app.include_router(health_router)
+app.include_router(admin_router)
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from app.schemas.portfolio import MarketData
+
+class FeedbackJobCreateRequest(BaseModel):
+    market_indicator_name: Optional[str] = None  # 지정하면 해당 지표 값으로 피드백 생성
+    market_data: Optional[MarketData] = None     # market_indicator_name 대신 직접 지정
+    user_id: Optional[int] = None
+    portfolio_ids: Optional[List[int]] = None
+    only_stale: bool = True  # market_indicator_name 사용 시, 지표 갱신 이후 피드백이 갱신되지 않은 포트폴리오만
+    concurrency: int = Field(4, ge=1, le=32)
+
+class FeedbackJobFailure(BaseModel):
+    portfolio_id: int
+    error: str
+    updated_at: datetime
+
+class FeedbackJobResponse(BaseModel):
+    job_id: int
+    status: str
+    selection: Dict[str, Any]
+    market_data: Dict[str, Any]
+    concurrency: int
+    total: int
+    processed: int
+    failed: int
+    progress: float
+    last_portfolio_id: int
+    stats: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+    recent_failures: List[FeedbackJobFailure] = []
@@ -1,11 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
 class ETFResponse(BaseModel):
     ticker: str
     long_business_summary: Optional[str] = None
-    category: str
+    category: Optional[str] = None
     trailing_pe: Optional[float] = None
     trailing_annual_dividend_yield: Optional[float] = None
     beta_3year: Optional[float] = None
@@ -24,6 +24,16 @@ class ETFItem(BaseModel):
 
 class SearchETFResponse(BaseModel):
     data: List[ETFItem]
+    next_cursor: Optional[str] = None
+
+class SimilarETF(BaseModel):
+    ticker: str
+    category: Optional[str] = None
+    score: float
+
+class SimilarETFListResponse(BaseModel):
+    ticker: str
+    similar: List[SimilarETF]
 
 class ETFRecommendation(BaseModel):
     ticker: str
@@ -32,6 +42,23 @@ class ETFRecommendation(BaseModel):
 
 class RecommendETFListResponse(BaseModel):
     recommendations: List[ETFRecommendation]
+    degraded: bool = False  # AI 백엔드 장애로 키워드(BM25) 점수/절삭 요약으로 대체됨
 
 class RecommendInitialETFResponse(BaseModel):
     etfs: List[str]
+
+class InitialRecommendationTarget(BaseModel):
+    user_id: int
+    portfolio_id: int
+
+class RecommendInitialBatchRequest(BaseModel):
+    targets: List[InitialRecommendationTarget] = Field(..., min_length=1, max_length=10_000)
+    top_n: int = Field(4, ge=1, le=20)
+
+class InitialRecommendationResult(BaseModel):
+    user_id: int
+    portfolio_id: int
+    etfs: List[str]  # 기본 포트폴리오도 없으면 빈 리스트
+
+class RecommendInitialBatchResponse(BaseModel):
+    results: List[InitialRecommendationResult]
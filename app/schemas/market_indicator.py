@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -13,3 +13,4 @@ class MarketIndicatorResponse(BaseModel):
 
 class MarketIndicatorsResponse(BaseModel):
     data: List[MarketIndicatorResponse]
+    next_cursor: Optional[str] = None
@@ -33,6 +33,7 @@ class PortfolioLog(BaseModel):
 class PortfolioLogsResponse(BaseModel):
     name: Optional[str] = None
     data: List[PortfolioLog]
+    next_cursor: Optional[str] = None
 
 class CustomPortfolioRequest(BaseModel):
     user_id: int
@@ -75,6 +76,63 @@ class FeedbackPortfolioResponse(BaseModel):
     feedback: str
     ai_etfs: List[ETF]
     market_data: MarketData
+    degraded: bool = False  # AI 백엔드 장애로 대체 결과가 포함됨 (revision에는 저장되지 않음)
 
 class UpdatePortfolioEtfsRequest(BaseModel):
     etfs: List[ETF]
+
+class PortfolioAnalyticsResponse(BaseModel):
+    portfolio_id: int
+    revision_id: int
+    holdings: int
+    metrics: Dict[str, Optional[float]]
+    coverage: Dict[str, float]
+    category_exposure: Dict[str, float]
+    hhi: float
+    effective_holdings: float
+    max_weight: float
+    unmatched_tickers: List[str]
+
+class EquityPoint(BaseModel):
+    date: str
+    value: float
+
+class PortfolioBacktestResponse(BaseModel):
+    portfolio_id: int
+    revision_id: int
+    start_date: str
+    end_date: str
+    rebalancing_months: int
+    total_return: float
+    cagr: float
+    volatility: float
+    max_drawdown: float
+    sharpe: float
+    equity_curve: List[EquityPoint]
+    unmatched_tickers: List[str]
+
+class ProjectionPoint(BaseModel):
+    month: int
+    p5: float
+    p50: float
+    p95: float
+
+class ProjectionAssumptions(BaseModel):
+    expected_return: float
+    beta: float
+    volatility: float
+
+class PortfolioProjectionResponse(BaseModel):
+    portfolio_id: int
+    revision_id: int
+    paths: int
+    months: int
+    initial_amount: float
+    monthly_contribution: float
+    goal: Optional[float] = None
+    probability_of_goal: Optional[float] = None
+    expected_value: float
+    percentiles: Dict[str, float]
+    timeline: List[ProjectionPoint]
+    assumptions: ProjectionAssumptions
+    unmatched_tickers: List[str]
@@ -0,0 +1,76 @@
+"""백테스트 엔진 벤치마크 - 합성 가격 (python -m benchmarks.backtest)"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from app.ai.backtest import PriceMatrix, TRADING_DAYS, backtest_many, cumulative_growth, rebalance_points
+
+def synthetic_prices(etfs: int, days: int, seed: int) -> PriceMatrix:
+    rng = np.random.default_rng(seed)
+    drift = rng.normal(0.07, 0.04, etfs) / TRADING_DAYS
+    vol = rng.uniform(0.05, 0.35, etfs) / np.sqrt(TRADING_DAYS)
+    log_returns = drift + vol * rng.standard_normal((days - 1, etfs))
+    prices = 100 * np.exp(np.vstack([np.zeros(etfs), np.cumsum(log_returns, axis=0)]))
+    dates = np.busday_offset("2015-01-01", np.arange(days), roll="forward")
+    return PriceMatrix(dates.astype("datetime64[D]"), [f"ETF{i:03d}" for i in range(etfs)], prices)
+
+def synthetic_portfolios(count: int, tickers, seed: int):
+    rng = np.random.default_rng(seed + 1)
+    portfolios = []
+    for _ in range(count):
+        picks = rng.choice(len(tickers), rng.integers(3, 9), replace=False)
+        portfolios.append([(tickers[i], float(rng.integers(5, 50))) for i in picks])
+    months = rng.choice([0, 1, 3, 6, 12], count)
+    return portfolios, months
+
+def loop_backtest(portfolio, months, matrix: PriceMatrix) -> float:
+    """포트폴리오 하나를 일 단위로 보유 수량을 갱신하며 시뮬레이션 (비교 기준) - 최종 평가금액"""
+    growth = cumulative_growth(matrix.prices)
+    points = set(rebalance_points(matrix.dates, months).tolist())
+    columns = [matrix.index[ticker] for ticker, _ in portfolio]
+    weights = np.array([allocation for _, allocation in portfolio])
+    weights = weights / weights.sum()
+    value = 1.0
+    holdings = [w * value / growth[0, c] for w, c in zip(weights, columns)]
+    for t in range(1, len(matrix.dates)):
+        value = sum(h * growth[t, c] for h, c in zip(holdings, columns))
+        if t in points:
+            holdings = [w * value / growth[t, c] for w, c in zip(weights, columns)]
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description="백테스트 엔진 벤치마크")
+    parser.add_argument("--portfolios", type=int, default=10_000)
+    parser.add_argument("--etfs", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--loop-sample", type=int, default=50, help="루프 방식으로 측정할 표본 수")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    matrix = synthetic_prices(args.etfs, args.years * TRADING_DAYS, args.seed)
+    portfolios, months = synthetic_portfolios(args.portfolios, matrix.tickers, args.seed)
+    print(f"{args.portfolios:,} portfolios x {len(matrix.dates):,} days x {args.etfs} ETFs")
+
+    results = {}
+    for workers in sorted({1, args.workers}):
+        started = time.perf_counter()
+        metrics, _ = backtest_many(portfolios, months, matrix, workers)
+        elapsed = time.perf_counter() - started
+        results[workers] = metrics
+        print(f"  vectorized (workers={workers}): {elapsed:.2f}s ({args.portfolios / elapsed:,.0f} portfolios/s)")
+
+    sample = range(min(args.loop_sample, args.portfolios))
+    started = time.perf_counter()
+    finals = [loop_backtest(portfolios[i], int(months[i]), matrix) for i in sample]
+    elapsed = time.perf_counter() - started
+    print(f"  per-portfolio loop: {elapsed:.2f}s for {len(finals)} "
+          f"(~{elapsed / len(finals) * args.portfolios:.0f}s for {args.portfolios:,})")
+
+    expected = results[1]["total_return"][:len(finals)] + 1
+    print(f"  loop vs vectorized max abs diff: {np.max(np.abs(np.array(finals) - expected)):.2e}")
+
+if __name__ == "__main__":
+    main()
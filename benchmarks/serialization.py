@@ -0,0 +1,110 @@
+"""라우트별 응답 직렬화 비용 벤치마크 (python -m benchmarks.serialization)"""
+import argparse
+import datetime
+import decimal
+import json
+import random
+import timeit
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.response import AppJSONResponse
+from app.crud.portfolio import portfolio_logs_body
+from app.schemas.etf import ETFResponse, SearchETFResponse
+from app.schemas.market_indicator import MarketIndicatorsResponse
+from app.schemas.mbti import MbtiResponse
+from app.schemas.portfolio import PortfolioLogsResponse
+from app.schemas.user import UserLog
+
+NOW = datetime.datetime(2025, 3, 1, 12, 0, 0)
+
+def sample_etf(rng):
+    vector = "[" + ",".join(f"{rng.uniform(-0.1, 0.1):.8f}" for _ in range(1536)) + "]"
+    return {
+        "ticker": "VOO", "long_business_summary": "The fund tracks the S&P 500 index. " * 20,
+        "category": "Large Blend", "trailing_pe": decimal.Decimal("24.31"),
+        "trailing_annual_dividend_yield": decimal.Decimal("0.0123"), "beta_3year": decimal.Decimal("1.00"),
+        "total_assets": 1_300_000_000_000, "three_year_average_return": decimal.Decimal("0.1052"),
+        "five_year_average_return": decimal.Decimal("0.1521"), "nav_price": decimal.Decimal("512.33"),
+        "text_vector": vector, "mbti_vector": "[0.1,0.2,0.3,0.4]", "mbti_code": "ISTJ",
+        "created_at": NOW, "updated_at": NOW,
+    }
+
+def sample_markets(n):
+    return {"data": [{
+        "market_indicator_id": i, "name": f"scenario-{i}", "interest_rate": decimal.Decimal("3.50"),
+        "inflation_rate": decimal.Decimal("2.10"), "exchange_rate": decimal.Decimal("1350.25"),
+        "created_at": NOW, "updated_at": NOW,
+    } for i in range(n)]}
+
+def sample_mbti():
+    row = {"description": "안정 추구형 투자자"}
+    for i in range(1, 6):
+        row[f"etf{i}"] = f"ETF{i}"
+        row[f"allocation{i}"] = 20
+    return row
+
+def sample_revision_rows(n):
+    etfs = json.dumps({"etfs": [{"ticker": f"ETF{i}", "allocation": 20} for i in range(5)]})
+    market = json.dumps({"interest_rate": 3.5, "inflation_rate": 2.1, "exchange_rate": 1350.25})
+    user = json.dumps({"investment_period": "12", "investment_goal": "10000000", "investment_amount": "1000000",
+                       "rebalancing_frequency": "3", "market_indicator_name": "base"})
+    feedback = json.dumps({"feedback": "포트폴리오 평가 ... " * 40,
+                           "ai_etfs": [{"ticker": f"ETF{i}", "allocation": 20.0} for i in range(5)]},
+                          ensure_ascii=False)
+    return [{"portfolio_id": i // 3, "revision_id": n - i, "etfs": etfs, "market_indicators": market,
+             "user_indicators": user, "ai_feedback": feedback} for i in range(n)]
+
+def default_path(model):
+    adapter = TypeAdapter(model)
+
+    def render(content):
+        value = adapter.validate_python(content)
+        return JSONResponse(jsonable_encoder(adapter.dump_python(value, mode="json"))).body
+    return render
+
+def fast_path(content):
+    return AppJSONResponse(content).body
+
+def portfolio_logs_default(rows):
+    data = [{
+        "portfolio_id": row["portfolio_id"], "revision_id": row["revision_id"],
+        "etfs": json.loads(row["etfs"]), "market_indicators": json.loads(row["market_indicators"]),
+        "user_indicators": json.loads(row["user_indicators"]), "ai_feedback": json.loads(row["ai_feedback"]),
+    } for row in rows]
+    return default_path(PortfolioLogsResponse)(PortfolioLogsResponse(name="내 포트폴리오", data=data))
+
+def main():
+    parser = argparse.ArgumentParser(description="라우트별 JSON 직렬화 비용 비교")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    user_logs = [{"context_id": i, "name": f"context-{i}", "user_id": 1, "created_at": NOW, "updated_at": NOW}
+                 for i in range(200)]
+    revision_rows = sample_revision_rows(300)
+
+    cases = [
+        ("GET /etfs/detail/{ticker}", ETFResponse, sample_etf(rng)),
+        ("GET /etfs/search", SearchETFResponse, {"data": [{"ticker": f"ETF{i}"} for i in range(6)]}),
+        ("GET /markets", MarketIndicatorsResponse, sample_markets(50)),
+        ("GET /mbti/{mbtiCode}", MbtiResponse, sample_mbti()),
+        ("GET /users/mypage/logs", List[UserLog], user_logs),
+    ]
+
+    print(f"{'route':<34}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, model, content in cases:
+        before_fn = default_path(model)
+        before = timeit.timeit(lambda: before_fn(content), number=args.repeat) / args.repeat * 1e6
+        after = timeit.timeit(lambda: fast_path(content), number=args.repeat) / args.repeat * 1e6
+        print(f"{name:<34}{before:>14.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+    before = timeit.timeit(lambda: portfolio_logs_default(revision_rows), number=args.repeat) / args.repeat * 1e6
+    after = timeit.timeit(lambda: portfolio_logs_body("내 포트폴리오", revision_rows), number=args.repeat) / args.repeat * 1e6
+    print(f"{'GET /portfolios/{contextId}/logs':<34}{before:>14.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
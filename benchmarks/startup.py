@@ -0,0 +1,58 @@
+"""기동 시간 벤치마크 (python -m benchmarks.startup [--warmup])"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["pandas", "numpy", "openai"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+if {eager}:
+    import app.ai.embed, app.ai.mbti, app.ai.revision
+    from app.ai.config import get_client
+    get_client()
+    elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy} if m in sys.modules]}}))
+"""
+
+WARMUP_SCRIPT = """
+import json
+from app.core import warmup
+warmup.run_warmup(retry_interval=0, max_attempts=1)
+print(json.dumps(warmup.state.as_dict()))
+"""
+
+def measure(eager: bool, runs: int):
+    timings, loaded = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT.format(eager=eager, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        timings.append(result["seconds"])
+        loaded = result["loaded"]
+    return timings, loaded
+
+def main():
+    parser = argparse.ArgumentParser(description="import/워밍업 시간 측정")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true", help="워밍업 단계 시간도 측정 (DB 필요)")
+    args = parser.parse_args()
+
+    for label, eager in [("lazy (현재)", False), ("eager AI stack", True)]:
+        timings, loaded = measure(eager, args.runs)
+        print(f"{label:<16} median {statistics.median(timings) * 1000:8.1f} ms  "
+              f"min {min(timings) * 1000:8.1f} ms  heavy modules loaded: {loaded or '-'}")
+
+    if args.warmup:
+        output = subprocess.run([sys.executable, "-c", WARMUP_SCRIPT], capture_output=True, text=True, check=True)
+        print("warmup:", output.stdout.strip().splitlines()[-1])
+
+if __name__ == "__main__":
+    main()
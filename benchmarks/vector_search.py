@@ -0,0 +1,89 @@
+"""ETF 벡터 근사 검색 벤치마크 - 합성 임베딩 (python -m benchmarks.vector_search)"""
+import argparse
+import time
+
+import numpy as np
+
+from app.ai.quantize import ApproximateVectorIndex, normalize_rows
+from app.ai.snapshot import TEXT_VECTOR_DIM
+
+CONFIGS = [
+    ("int8 1536", 0, "matryoshka", True),
+    ("matryoshka 512", 512, "matryoshka", False),
+    ("matryoshka 256", 256, "matryoshka", False),
+    ("matryoshka 256 int8", 256, "matryoshka", True),
+    ("pca 256", 256, "pca", False),
+    ("pca 256 int8", 256, "pca", True),
+]
+
+def synthetic_embeddings(count: int, seed: int, clusters: int = 256, dim: int = TEXT_VECTOR_DIM) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    spectrum = (np.arange(1, dim + 1, dtype=np.float32) ** -0.5)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32) * spectrum
+    vectors = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 10_000):
+        size = min(10_000, count - start)
+        labels = rng.integers(0, clusters, size)
+        noise = rng.standard_normal((size, dim), dtype=np.float32) * spectrum * 0.8
+        vectors[start:start + size] = centers[labels] + noise
+    return normalize_rows(vectors)
+
+def synthetic_queries(vectors: np.ndarray, count: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed + 1)
+    base = vectors[rng.choice(len(vectors), count, replace=False)]
+    return normalize_rows(base + rng.standard_normal(base.shape, dtype=np.float32) * 0.02)
+
+def exact_top_k(vectors, norms, query, k):
+    dots = vectors @ query
+    scores = np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+def recall(found, expected) -> float:
+    return len(set(found.tolist()) & set(expected.tolist())) / len(expected)
+
+def run_size(count: int, queries: int, k: int, rerank: int, seed: int):
+    vectors = synthetic_embeddings(count, seed)
+    query_matrix = synthetic_queries(vectors, queries, seed)
+    norms = np.linalg.norm(vectors, axis=1)
+    print(f"{count:,} ETFs x {TEXT_VECTOR_DIM} dims, {queries} queries, recall@{k}, rerank {rerank}")
+
+    started = time.perf_counter()
+    expected = [exact_top_k(vectors, norms, query, k) for query in query_matrix]
+    exact_ms = (time.perf_counter() - started) / queries * 1000
+    print(f"  {'exact float32':<22} {vectors.nbytes / 2**20:8.1f} MB  {exact_ms:7.2f} ms/query  "
+          f"(float64: {count * TEXT_VECTOR_DIM * 8 / 2**20:.1f} MB)")
+
+    for name, dims, method, int8 in CONFIGS:
+        started = time.perf_counter()
+        index = ApproximateVectorIndex(vectors, dims, method, int8)
+        build = time.perf_counter() - started
+
+        approximate_recall, reranked_recall = [], []
+        started = time.perf_counter()
+        for query, exact in zip(query_matrix, expected):
+            scores = index.scores(query, k, rerank)
+            top = np.argpartition(-scores, k)[:k]
+            reranked_recall.append(recall(top, exact))
+        latency = (time.perf_counter() - started) / queries * 1000
+        for query, exact in zip(query_matrix, expected):
+            approximate_recall.append(recall(np.argpartition(-index.approximate_scores(query), k)[:k], exact))
+
+        print(f"  {name:<22} {index.nbytes / 2**20:8.1f} MB  {latency:7.2f} ms/query  "
+              f"recall@{k} {np.mean(approximate_recall):.3f} -> {np.mean(reranked_recall):.3f} (reranked)  "
+              f"memory x{vectors.nbytes / index.nbytes:.1f}, speed x{exact_ms / latency:.1f}, build {build:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="ETF 벡터 근사 검색 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=100, help="정확 재정렬 후보 수")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        run_size(count, args.queries, args.k, args.rerank, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+#!/bin/sh
+# FastAPI 서버 실행 스크립트
+# WEB_CONCURRENCY > 1 이면 멀티 워커 모드: ETF 벡터 스냅샷을 공유 메모리(/dev/shm)에 한 번 생성하고
+# 모든 워커가 읽기 전용 mmap으로 공유 (SNAPSHOT_REFRESH_SECONDS 주기로 앱이 새 세대로 교체)
+# 스냅샷 생성에 실패해도 서버는 뜨고, 스냅샷이 생길 때까지 각 워커가 DB에서 읽음
+set -e
+
+WORKERS="${WEB_CONCURRENCY:-1}"
+PORT="${PORT:-8000}"
+
+if [ "$WORKERS" -gt 1 ]; then
+  export VECTOR_SNAPSHOT_DIR="${VECTOR_SNAPSHOT_DIR:-/dev/shm/etf-snapshot}"
+  python -m app.ai.snapshot build || echo "스냅샷 생성 실패 - 워커가 DB에서 읽음 (SNAPSHOT_REFRESH_SECONDS 설정 시 앱이 재시도)"
+fi
+
+exec uvicorn app.main:app --host 0.0.0.0 --port "$PORT" --workers "$WORKERS"
@@ -0,0 +1,109 @@
+"""
+app.core.cache read-through 캐시 (키 정규화, stampede 방지, soft 만료 갱신, 세대 검사)
+"""
+import threading
+import time
+
+from app.core import cache as cache_module
+from app.core.cache import ReadThroughCache, cached, invalidate, invalidate_tables
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timeout")
+        time.sleep(0.005)
+
+def test_key_includes_defaults_and_keywords():
+    calls = []
+
+    @cached("test_key_normalization", tables=("etf",))
+    def lookup(ticker, include_vectors=False):
+        calls.append((ticker, include_vectors))
+        return {"ticker": ticker, "include_vectors": include_vectors}
+
+    assert lookup("SPY") is lookup("SPY", False) is lookup(ticker="SPY", include_vectors=False)
+    assert lookup("SPY", True)["include_vectors"] is True
+    assert calls == [("SPY", False), ("SPY", True)]
+
+    invalidate("test_key_normalization", "SPY")
+    lookup(ticker="SPY")
+    lookup("SPY", include_vectors=True)
+    assert calls == [("SPY", False), ("SPY", True), ("SPY", False)]
+
+    invalidate_tables("etf")
+    lookup("SPY", True)
+    assert calls[-1] == ("SPY", True)
+
+def test_concurrent_misses_load_once():
+    cache = ReadThroughCache("test_stampede", (), ttl=60, soft_ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("key", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.wait(2)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 7
+
+def test_soft_expired_entry_is_served_and_refreshed_in_background():
+    cache = ReadThroughCache("test_soft_refresh", (), ttl=60, soft_ttl=0)
+    values = iter(["old", "new"])
+    assert cache.get("key", lambda: next(values)) == "old"
+
+    # soft 만료된 값은 바로 응답하고 갱신은 백그라운드에서
+    assert cache.get("key", lambda: next(values)) == "old"
+    wait_until(lambda: cache._entries["key"].value == "new")
+    assert cache.stats()["refreshes"] == 1
+
+def test_hard_expired_entry_is_reloaded_by_caller():
+    cache = ReadThroughCache("test_hard_expiry", (), ttl=0, soft_ttl=0)
+    values = iter(["old", "new"])
+    assert cache.get("key", lambda: next(values)) == "old"
+    assert cache.get("key", lambda: next(values)) == "new"
+
+def test_load_racing_invalidate_is_not_stored():
+    cache = ReadThroughCache("test_generation", (), ttl=60, soft_ttl=60)
+
+    def loader():
+        cache.invalidate()  # 조회 중 쓰기 경로가 무효화
+        return "stale"
+
+    assert cache.get("key", loader) == "stale"
+    assert "key" not in cache._entries
+    assert cache.get("key", lambda: "fresh") == "fresh"
+    assert cache._entries["key"].value == "fresh"
+
+def test_empty_results_are_not_cached():
+    cache = ReadThroughCache("test_empty", (), ttl=60, soft_ttl=60)
+    assert cache.get("key", lambda: []) == []
+    assert cache.get("key", lambda: ["row"]) == ["row"]
+
+def test_lru_eviction():
+    cache = ReadThroughCache("test_lru", (), ttl=60, soft_ttl=60, max_entries=2)
+    cache.get("a", lambda: "a")
+    cache.get("b", lambda: "b")
+    cache.get("a", lambda: "unused")
+    cache.get("c", lambda: "c")
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+def teardown_module():
+    for name in list(cache_module._caches):
+        if name.startswith("test_"):
+            del cache_module._caches[name]
@@ -0,0 +1,49 @@
+"""
+app.db.explain_check 의 STATEMENTS 실행 계획 점검
+DB 점검은 마이그레이션 + app.db.seed 로 적재한 DB가 있을 때만 (EXPLAIN_CHECK_DB=1, CI의 test 작업)
+"""
+import os
+
+import pytest
+
+from app.db.explain_check import STATEMENTS, Statement, explain, format_plan, plan_status, resolve_samples
+
+requires_db = pytest.mark.skipif(os.getenv("EXPLAIN_CHECK_DB") != "1", reason="시드된 DB 필요 (EXPLAIN_CHECK_DB=1)")
+
+@pytest.fixture(scope="module")
+def cursor_and_samples():
+    from app.db.connection import get_connection
+    connection = get_connection()
+    try:
+        with connection.cursor() as cursor:
+            yield cursor, resolve_samples(cursor)
+    finally:
+        connection.rollback()
+        connection.close()
+
+@requires_db
+@pytest.mark.parametrize("statement", STATEMENTS, ids=lambda statement: statement.source)
+def test_statement_plan(cursor_and_samples, statement):
+    cursor, samples = cursor_and_samples
+    plan = explain(cursor, statement, samples)
+    status, failed = plan_status(statement, plan)
+    print(f"[{status}] {statement.source}\n{format_plan(plan)}")
+    assert not failed, f"{status}\n{format_plan(plan)}"
+
+def row(type_="ref", extra="Using where"):
+    return {"table": "revision", "type": type_, "key": "ix", "rows": 1, "Extra": extra}
+
+def test_full_scan_fails_unless_allowed():
+    assert plan_status(Statement("s", "SELECT 1"), [row("ALL")]) == ("FULL SCAN: revision", True)
+    assert plan_status(Statement("s", "SELECT 1", allow_full_scan="사유"), [row("ALL")]) == ("ALLOWED (사유)", False)
+
+def test_sort_fails_only_for_keyset_and_hot_path():
+    plan = [row(extra="Using where; Using temporary; Using filesort")]
+    assert plan_status(Statement("s", "SELECT 1"), plan) == ("OK", False)
+    assert plan_status(Statement("s", "SELECT 1", keyset=True), plan) == \
+        ("KEYSET: Using filesort, Using temporary", True)
+    assert plan_status(Statement("s", "SELECT 1", hot_path=True), [row(extra=None)]) == ("OK", False)
+
+def test_statement_placeholders_match_params():
+    for statement in STATEMENTS:
+        assert statement.sql.count("%s") == len(statement.params), statement.source
@@ -0,0 +1,51 @@
+"""
+app.core.pagination 커서 인코딩/디코딩과 split_page
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor, split_page
+
+def rows(*revision_ids):
+    return [{"revision_id": revision_id} for revision_id in revision_ids]
+
+def test_cursor_round_trip():
+    token = encode_cursor("portfolio_logs", 42)
+    assert "=" not in token
+    assert decode_cursor(token, "portfolio_logs") == [42]
+    assert decode_cursor(encode_cursor("etfs", "SPY", 7), "etfs", size=2) == ["SPY", 7]
+
+def test_empty_cursor_is_first_page():
+    assert decode_cursor(None, "portfolio_logs") is None
+    assert decode_cursor("", "portfolio_logs") is None
+
+def test_cursor_scope_mismatch_is_rejected():
+    token = encode_cursor("user_logs", 42)
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(token, "portfolio_logs")
+    assert error.value.status_code == 400
+
+@pytest.mark.parametrize("token", [
+    "not-base64!!",
+    encode_cursor("portfolio_logs", 42)[:-3],
+    encode_cursor("portfolio_logs", 42, 43),
+    "eyJhIjoxfQ",  # {"a":1}
+])
+def test_tampered_cursor_is_rejected(token):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(token, "portfolio_logs")
+    assert error.value.status_code == 400
+
+def test_split_page_with_next_row():
+    page, next_cursor = split_page(rows(9, 8, 7, 6), 3, "portfolio_logs", "revision_id")
+    assert page == rows(9, 8, 7)
+    assert decode_cursor(next_cursor, "portfolio_logs") == [7]
+
+def test_split_page_of_exactly_limit_is_last_page():
+    page, next_cursor = split_page(rows(9, 8, 7), 3, "portfolio_logs", "revision_id")
+    assert page == rows(9, 8, 7)
+    assert next_cursor is None
+
+def test_split_page_last_page():
+    assert split_page(rows(2), 3, "portfolio_logs", "revision_id") == (rows(2), None)
+    assert split_page([], 3, "portfolio_logs", "revision_id") == ([], None)